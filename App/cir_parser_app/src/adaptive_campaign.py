@@ -0,0 +1,130 @@
+"""adaptive_campaign.py contiene el modo de campaña adaptativa de Monte Carlo:
+        run_adaptive_campaign(cir_dict, input_file_name, target_width=0.01, ...): Simula por bloques,
+        actualiza la media y varianza de las salidas en la malla uniforme con online_statistics.RunningMoments
+        y se detiene cuando el intervalo de confianza de la media es más angosto que target_width,
+        reportando cuántas muestras hicieron falta. Las muestras salen de una campaign.Campaign con la
+        semilla dada, que se entrega junto al resultado para guardarla y repetir la campaña.
+    """
+import numpy as np
+import file_operations as fileopr
+import ltspice_converter as spceconvrt
+from campaign import Campaign
+from resampling import uniform_time_grid, resample_results
+from online_statistics import RunningMoments
+from simulation import iter_netlist_simulations
+from instrumentation import stage, count
+
+def _worst_width(moments, confidence, relative):
+    """Mayor ancho del intervalo de confianza entre los timesteps, relativo al pico de la media si se pide."""
+    width = float(np.nanmax(moments.ci_width(confidence)))
+    if not relative:
+        return width
+    peak = float(np.abs(moments.mean).max())
+    if peak == 0:
+        return 0.0 if width == 0 else np.inf
+    return width / peak
+
+def run_adaptive_campaign(cir_dict, input_file_name, target_width=0.01, relative=True, confidence=0.95,
+                          outputs=None, num_timesteps=200, batch_size=32, min_samples=64, max_samples=10000,
+                          sampling_method='random', simulate=None, sink=None, new_filename="new_cir",
+                          update_callback=None, seed=None):
+    """
+    Ejecuta una campaña de Monte Carlo que se detiene al alcanzar la precisión pedida.
+
+    Las filas de cada bloque se toman en orden de una Campaign de max_samples muestras, así con
+    'sobol', 'halton' o 'lhs' cada prefijo conserva la cobertura del método, y con la misma semilla
+    la campaña se repite exactamente.
+    La malla de tiempo se fija con el primer bloque y después cada bloque se interpola sobre ella.
+
+    Args:
+        cir_dict (dict): Diccionario producido por read_cir_file.
+        input_file_name (str): Ruta del netlist original.
+        target_width (float, optional): Ancho objetivo del intervalo de confianza de la media. Defaults to 0.01.
+        relative (bool, optional): Si es True, target_width es relativo al mayor valor absoluto de la media
+        de cada salida (0.01 es el 1 %). Defaults to True.
+        confidence (float, optional): Nivel de confianza del intervalo. Defaults to 0.95.
+        outputs (list, optional): Salidas a seguir. Defaults to None (todas las del primer bloque).
+        num_timesteps (int, optional): Puntos de la malla uniforme. Defaults to 200.
+        batch_size (int, optional): Muestras por bloque de simulación. Defaults to 32.
+        min_samples (int, optional): Mínimo de muestras antes de evaluar la convergencia. Defaults to 64.
+        max_samples (int, optional): Máximo de muestras de la campaña. Defaults to 10000.
+        sampling_method (str, optional): Método de sample_parameter_matrix. Defaults to 'random'.
+        simulate (callable, optional): Recibe un diccionario {nombre: contenido} y entrega pares
+        (nombre, resultados), por ejemplo functools.partial(simulation.iter_isolated_simulations, n_workers=4).
+        Defaults to None (simulation.iter_netlist_simulations).
+        sink (object, optional): Sumidero con append(name, results, parameters), por ejemplo un
+        result_store.ColumnarResultStore. Defaults to None.
+        new_filename (str, optional): Prefijo del nombre de cada muestra. Defaults to "new_cir".
+        update_callback (callable, optional): Recibe (muestras, ancho actual) después de cada bloque. Defaults to None.
+        seed (int, optional): Semilla raíz de la campaña. Defaults to None (entropía del sistema).
+
+    Returns:
+        dict: Diccionario con:
+              - 'n_samples': Muestras simuladas con éxito.
+              - 'converged': True si se alcanzó target_width antes de max_samples.
+              - 'time_grid': Malla uniforme de tiempo.
+              - 'statistics': {salida: RunningMoments}.
+              - 'ci_width': {salida: mayor ancho (relativo si relative) del intervalo entre los timesteps}.
+              - 'history': Lista de tuples (muestras, mayor ancho entre las salidas) después de cada bloque.
+              - 'campaign': Campaign con la semilla, las muestras terminadas y stop al final del último bloque,
+                lista para guardarse con Campaign.save junto a los resultados.
+    """
+    simulate = simulate or iter_netlist_simulations
+    campaign = Campaign(cir_dict, input_file_name, max_samples, seed=seed, sampling_method=sampling_method,
+                        new_filename=new_filename)
+    template = fileopr.compile_cir_template(cir_dict, input_file_name)
+
+    time_grid, statistics, widths, history = None, {}, {}, []
+    converged = False
+    for start in range(0, max_samples, batch_size):
+        indices = range(start, min(start + batch_size, max_samples))
+        with stage('sample_parameters'):
+            lines, block = campaign.sample_rows(indices)
+        names = [campaign.sample_name(i) for i in indices]
+        # Las muestras posteriores no se simularon, la campaña guardada termina en este bloque
+        campaign.stop = indices.stop
+        with stage('render_netlists'):
+            formatted = spceconvrt.float_to_LTSpice_array(block)
+            netlists = {name: fileopr.render_cir_template(template, dict(zip(lines, row)))
+                        for name, row in zip(names, formatted.tolist())}
+        parameters = dict(zip(names, block))
+
+        results = {}
+        for name, result in simulate(netlists):
+            results[name] = result
+            campaign.mark_completed(name)
+            count('samples')
+            if sink is not None:
+                sink.append(name, result, parameters=parameters[name])
+        if not results:
+            continue
+
+        if time_grid is None:
+            time_grid = uniform_time_grid(results, num_timesteps)
+            if outputs is None:
+                outputs = [key for key in next(iter(results.values())) if key != 'time']
+            statistics = {output: RunningMoments(num_timesteps) for output in outputs}
+
+        for output in outputs:
+            _, matrix, _ = resample_results(results, output=output, time_grid=time_grid)
+            statistics[output].update(matrix)
+            widths[output] = _worst_width(statistics[output], confidence, relative)
+
+        n_samples = statistics[outputs[0]].count
+        worst = max(widths.values())
+        history.append((n_samples, worst))
+        if update_callback:
+            update_callback(n_samples, worst)
+        if n_samples >= min_samples and worst <= target_width:
+            converged = True
+            break
+
+    return {
+        'n_samples': history[-1][0] if history else 0,
+        'converged': converged,
+        'time_grid': time_grid,
+        'statistics': statistics,
+        'ci_width': widths,
+        'history': history,
+        'campaign': campaign
+    }
@@ -0,0 +1,113 @@
+"""benchmark_imports.py mide el tiempo de arranque en frío de los módulos de la aplicación, importando
+cada uno en un intérprete nuevo con python -X importtime, y revisa que los módulos que usan los procesos
+trabajadores y la ejecución sin pantalla no carguen paquetes pesados (matplotlib, seaborn, scipy,
+PySpice, tkinter) hasta que se usan.
+
+    El tiempo de cada módulo es la mediana de --repeat intérpretes. Se reporta también el costo por
+    encima de NumPy, que todos los módulos necesitan. Los resultados se guardan con --save y se
+    comparan con --compare como en benchmark_pipeline.py; el script termina con código 1 si un módulo
+    vigilado carga un paquete pesado o se volvió más lento que --threshold veces la referencia.
+
+    Uso, desde src:
+        python benchmarks/benchmark_imports.py --save arranque.json
+        python benchmarks/benchmark_imports.py --compare arranque.json
+    """
+import sys
+import os
+import json
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+from statistics import median
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.abspath(os.path.join(current_dir, '..'))
+
+# Módulos cuyo arranque se vigila: los importan los procesos trabajadores y cli.py
+GUARDED = ('simulation', 'parameter_perturbation', 'campaign', 'plotting', 'cli')
+MODULES = GUARDED + ('ui',)
+HEAVY = ('matplotlib', 'seaborn', 'scipy', 'PySpice', 'tkinter')
+
+_PROBE = "import sys, json, {module}; print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({heavy!r}))))"
+
+def import_time(module):
+    """
+    Importa module en un intérprete nuevo.
+
+    Args:
+        module (str): Nombre del módulo, relativo a src.
+
+    Returns:
+        tuple: (microsegundos acumulados de la importación según -X importtime, paquetes pesados cargados).
+    """
+    code = _PROBE.format(module=module, heavy=HEAVY)
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=src_dir,
+                             capture_output=True, text=True, check=True)
+    cumulative = 0
+    for line in process.stderr.splitlines():
+        # Las importaciones de nivel superior no llevan sangría en la última columna
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module and not fields[2][1:].startswith(' '):
+            cumulative = int(fields[1])
+    return cumulative, json.loads(process.stdout.strip().splitlines()[-1])
+
+def measure(module, repeat=5):
+    """Mediana de repeat arranques en frío de module, en milisegundos, y los paquetes pesados que carga."""
+    times, heavy = [], []
+    for _ in range(repeat):
+        microseconds, heavy = import_time(module)
+        times.append(microseconds / 1000)
+    return {'ms': median(times), 'heavy': heavy}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el tiempo de importación de los módulos.")
+    parser.add_argument('--modules', nargs='+', default=list(MODULES), help="Módulos a medir.")
+    parser.add_argument('--repeat', type=int, default=5, help="Intérpretes nuevos por módulo.")
+    parser.add_argument('--save', help="Guarda los resultados en este JSON.")
+    parser.add_argument('--compare', help="JSON de referencia contra el cual comparar.")
+    parser.add_argument('--threshold', type=float, default=1.5, help="Razón de tiempo considerada regresión.")
+    args = parser.parse_args(argv)
+
+    numpy_ms = measure('numpy', args.repeat)['ms']
+    print(f"{'numpy':24} {numpy_ms:8.1f} ms")
+    results, problems = {}, []
+    for module in args.modules:
+        results[module] = measure(module, args.repeat)
+        heavy = results[module]['heavy']
+        print(f"{module:24} {results[module]['ms']:8.1f} ms  (+{results[module]['ms'] - numpy_ms:6.1f} sobre numpy)"
+              + (f"  carga {', '.join(heavy)}" if heavy else ""))
+        if module in GUARDED and heavy:
+            problems.append(f"{module} carga {', '.join(heavy)} al importarse.")
+
+    if args.save:
+        report = {
+            'meta': {
+                'date': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'numpy_ms': numpy_ms
+            },
+            'results': results
+        }
+        with open(args.save, 'w', encoding='UTF-8') as out_file:
+            json.dump(report, out_file, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='UTF-8') as in_file:
+            reference = json.load(in_file)['results']
+        for module, current in results.items():
+            before = reference.get(module)
+            if before is None or before['ms'] <= 0:
+                continue
+            ratio = current['ms'] / before['ms']
+            print(f"{module:24} {ratio:6.2f}x la referencia" + ("  <-- regresión" if ratio > args.threshold else ""))
+            if ratio > args.threshold:
+                problems.append(f"{module} tarda {ratio:.2f}x la referencia.")
+
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
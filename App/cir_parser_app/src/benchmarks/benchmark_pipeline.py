@@ -0,0 +1,252 @@
+"""benchmark_pipeline.py mide el tiempo y la memoria de las etapas del flujo de la aplicación con los
+netlists de archivos_cir (LINEAL, sum, el puente de Wien y la neurona leaky integrate and fire):
+        read_cir_file, parameter_perturbator, Campaign.sample_rows (el muestreo reproducible por índice de
+        las campañas), run_simulations, estimate_distribution y plot_density, a 10, 1000 y 10000 muestras
+        por defecto.
+
+    Cada etapa se cronometra con time.perf_counter (el mínimo de --repeat repeticiones) y se repite una
+    vez más bajo tracemalloc para medir el pico de memoria de Python. Los resultados se guardan en JSON
+    con --save y se comparan contra una corrida anterior con --compare, que termina con código 1 si
+    alguna etapa se volvió más lenta que --threshold veces la referencia.
+
+    run_simulations se limita a --sim-limit muestras porque NgSpice domina el tiempo; si libngspice no
+    está disponible la etapa se omite y las etapas de análisis usan formas de onda sintéticas sobre la
+    malla del .TRAN de cada netlist.
+
+    Uso, desde src:
+        python benchmarks/benchmark_pipeline.py --sizes 10 1000 --save referencia.json
+        python benchmarks/benchmark_pipeline.py --sizes 10 1000 --compare referencia.json
+    """
+import sys
+import os
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Agregar la ruta del directorio 'src' al path de Python
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(src_dir)
+
+import ltspice_converter as spceconvrt
+from file_operations import read_cir_file
+from parameter_perturbation import parameter_perturbator
+from campaign import Campaign
+from plotting import estimate_distribution, plot_density
+
+cir_dir = os.path.abspath(os.path.join(src_dir, '..', 'archivos_cir'))
+
+SCENARIOS = {
+    'lineal': 'LINEAL.cir',
+    'sum': 'sum.cir',
+    'wien': 'WIEN- BRIDGE OSCILLATOR STARTED WITH PS.cir',
+    'lif': 'LEAKY INTEGRATE AND FIRE WITH ADAPTATION FINAL3.cir'
+}
+
+STAGES = ('read_cir_file', 'parameter_perturbator', 'campaign_sample_rows', 'run_simulations', 'estimate_distribution', 'plot_density')
+
+# Escala de las perturbaciones, los netlists de ejemplo vienen con escala 0
+SCALE = 0.05
+# Puntos de la malla uniforme de las etapas de análisis
+NUM_TIMESTEPS = 200
+
+def measure(function, repeat=3):
+    """
+    Mide una etapa del flujo.
+
+    Args:
+        function (callable): Etapa a medir, sin argumentos.
+        repeat (int, optional): Repeticiones cronometradas. Defaults to 3.
+
+    Returns:
+        dict: {'seconds': mínimo de las repeticiones, 'peak_kib': pico de memoria bajo tracemalloc}.
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    # tracemalloc vuelve lenta la ejecución, por eso la memoria se mide en una corrida aparte
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': best, 'peak_kib': peak / 1024}
+
+def tran_grid(file_name):
+    """Malla de tiempo del .TRAN del netlist, con a lo más 2000 puntos."""
+    with open(file_name, 'r', encoding='UTF-8', errors='replace') as cir_file:
+        for line in cir_file:
+            fields = line.split()
+            if fields and fields[0].upper() == '.TRAN':
+                step, stop = (spceconvrt.LTSpice_to_float(field) for field in fields[1:3])
+                return np.linspace(0, stop, int(min(stop / step, 2000)) + 1)
+    return np.linspace(0, 1e-3, 1001)
+
+def synthetic_results(file_name, n_samples, seed=0):
+    """Resultados con la forma de run_simulations: una senoidal amortiguada con amplitud y frecuencia
+    aleatorias por muestra, y una cantidad de timesteps distinta en cada una como en NgSpice."""
+    rng = np.random.default_rng(seed)
+    grid = tran_grid(file_name)
+    stop = grid[-1]
+    results = {}
+    for i in range(n_samples):
+        time_points = np.sort(np.concatenate([grid, rng.uniform(0, stop, rng.integers(0, 20))]))
+        amplitude, frequency = rng.normal(1.0, 0.05), rng.normal(5 / stop, 0.25 / stop)
+        values = amplitude * np.exp(-time_points / stop) * np.sin(2 * np.pi * frequency * time_points)
+        results[f"new_cir_{i}.cir"] = {'time': time_points, 'V(OUT)': values}
+    return results
+
+def tile_results(results, n_samples):
+    """Repite resultados reales hasta completar n_samples entradas, sin copiar los arreglos."""
+    values = list(results.values())
+    return {f"new_cir_{i}.cir": values[i % len(values)] for i in range(n_samples)}
+
+def single_output(results):
+    """Se queda con la primera salida de cada muestra, como al elegirla en la interfaz."""
+    output = next(key for key in next(iter(results.values())) if key != 'time')
+    return {name: {'time': result['time'], output: result[output]} for name, result in results.items()}
+
+def benchmark_scenario(file_name, sizes, repeat=3, sim_limit=100, simulate=True):
+    """
+    Mide todas las etapas de un netlist en cada tamaño.
+
+    Args:
+        file_name (str): Ruta del netlist.
+        sizes (list): Cantidades de muestras.
+        repeat (int, optional): Repeticiones cronometradas por etapa. Defaults to 3.
+        sim_limit (int, optional): Máximo de muestras de run_simulations. Defaults to 100.
+        simulate (bool, optional): Si es False no se llama a NgSpice. Defaults to True.
+
+    Returns:
+        tuple: ({etapa: {muestras: medición}}, bool) donde el bool indica si NgSpice estuvo disponible.
+    """
+    from simulation import run_simulations
+
+    cir_dict = read_cir_file(file_name)
+    for entry in cir_dict.values():
+        entry['scale'] = SCALE
+
+    stages = {stage: {} for stage in STAGES}
+    simulated = None
+    for n in sizes:
+        key = str(n)
+        stages['read_cir_file'][key] = measure(lambda: read_cir_file(file_name), repeat)
+
+        with tempfile.TemporaryDirectory() as folder:
+            stages['parameter_perturbator'][key] = measure(
+                lambda: parameter_perturbator(cir_dict, file_name, n_files=n, base_output_folder=folder, seed=0), repeat)
+
+            stages['campaign_sample_rows'][key] = measure(
+                lambda: Campaign(cir_dict, file_name, n, seed=0).sample_rows(range(n)), repeat)
+
+            if simulate and n <= sim_limit:
+                try:
+                    simulated, _ = run_simulations(folder, debug=False)
+                    stages['run_simulations'][key] = measure(lambda: run_simulations(folder, debug=False), 1)
+                except OSError:
+                    simulate = False
+
+        if simulated:
+            results = single_output(tile_results(simulated, n))
+        else:
+            results = synthetic_results(file_name, n)
+        stages['estimate_distribution'][key] = measure(
+            lambda: estimate_distribution(results, NUM_TIMESTEPS), repeat)
+
+        def density():
+            plot_density(results, NUM_TIMESTEPS)
+            plt.close('all')
+        stages['plot_density'][key] = measure(density, repeat)
+
+    return stages, simulate
+
+def compare(results, reference, threshold=1.2):
+    """
+    Compara dos corridas e imprime la razón de tiempos de cada etapa.
+
+    Args:
+        results (dict): Resultados de la corrida actual.
+        reference (dict): Resultados de referencia, con el mismo formato.
+        threshold (float, optional): Razón de tiempo sobre la cual se reporta una regresión. Defaults to 1.2.
+
+    Returns:
+        list: Tuples (escenario, etapa, muestras, razón) de las regresiones encontradas.
+    """
+    regressions = []
+    for scenario, stages in results.items():
+        for stage, sizes in stages.items():
+            for n, current in sizes.items():
+                before = reference.get(scenario, {}).get(stage, {}).get(n)
+                if before is None or before['seconds'] <= 0:
+                    continue
+                ratio = current['seconds'] / before['seconds']
+                marker = '  <-- regresión' if ratio > threshold else ''
+                print(f"{scenario:8} {stage:22} {n:>6} {ratio:6.2f}x tiempo "
+                      f"{current['peak_kib'] / max(before['peak_kib'], 1e-9):6.2f}x memoria{marker}")
+                if ratio > threshold:
+                    regressions.append((scenario, stage, n, ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el tiempo y la memoria de las etapas del flujo.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000], help="Cantidades de muestras.")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones cronometradas por etapa.")
+    parser.add_argument('--sim-limit', type=int, default=100, help="Máximo de muestras de run_simulations.")
+    parser.add_argument('--no-sim', action='store_true', help="No llama a NgSpice, usa formas de onda sintéticas.")
+    parser.add_argument('--save', help="Guarda los resultados en este JSON.")
+    parser.add_argument('--compare', help="JSON de referencia contra el cual comparar.")
+    parser.add_argument('--threshold', type=float, default=1.2, help="Razón de tiempo considerada regresión.")
+    args = parser.parse_args(argv)
+
+    simulate = not args.no_sim
+    results = {}
+    for scenario in args.scenarios:
+        stages, simulate = benchmark_scenario(os.path.join(cir_dir, SCENARIOS[scenario]), args.sizes,
+                                              args.repeat, args.sim_limit, simulate)
+        results[scenario] = stages
+        for stage, sizes in stages.items():
+            for n, measurement in sizes.items():
+                print(f"{scenario:8} {stage:22} {n:>6} {measurement['seconds'] * 1e3:10.2f} ms "
+                      f"{measurement['peak_kib']:10.1f} KiB")
+    if not simulate:
+        print("NgSpice no está disponible: run_simulations se omitió y el análisis usó formas de onda sintéticas.")
+
+    if args.save:
+        report = {
+            'meta': {
+                'date': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'ngspice': simulate
+            },
+            'results': results
+        }
+        with open(args.save, 'w', encoding='UTF-8') as out_file:
+            json.dump(report, out_file, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='UTF-8') as in_file:
+            reference = json.load(in_file)['results']
+        regressions = compare(results, reference, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} etapas más lentas que {args.threshold}x la referencia.")
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,441 @@
+"""campaign.py contiene el estado reproducible de una campaña de Monte Carlo:
+        Campaign(cir_dict, input_file_name, n_samples, seed=None, sampling_method='random', new_filename="new_cir"):
+        Campaña con una semilla raíz. Cada muestra i usa sus propios números aleatorios, que dependen solo
+        de la semilla y de i (contadores mezclados con SplitMix64), así cualquier subconjunto de muestras, simulado en
+        serie o repartido entre procesos, produce exactamente los mismos valores que la campaña completa.
+        Se guarda como JSON junto a los resultados y recuerda qué muestras ya terminaron. Con
+        Campaign.portion(start, stop) se divide en rangos que pueden simularse en máquinas distintas.
+
+        load_campaign(path): Lee una campaña guardada con Campaign.save.
+
+        read_failures(store_path): Lee las muestras fallidas de una campaña, con sus parámetros y errores.
+
+        record_progress(simulations, campaign): Deja pasar un generador de simulaciones marcando cada
+        muestra como terminada en la campaña.
+
+        run_campaign(campaign, store_path, simulate=None, batch_size=256, chunk_size=64, timeout=60.0, ...): Simula las
+        muestras pendientes por bloques en procesos vigilados, guardando los resultados en un almacén columnar,
+        las muestras fallidas en failures.jsonl y el estado de la campaña después de cada bloque. Con una
+        instrumentation.Instrumentation deja además el tiempo de cada etapa en instrumentation.json.
+
+        resume_campaign(store_path, simulate=None, retry_failed=False, ...): Retoma una campaña interrumpida
+        desde su almacén, saltando las muestras que ya quedaron guardadas.
+    """
+import functools
+import json
+import os
+import numpy as np
+import file_operations as fileopr
+import ltspice_converter as spceconvrt
+from parameter_perturbation import sample_parameter_matrix, sample_from_points, perturbed_dimensions, parameter_column_names, SAMPLING_METHODS
+from result_store import ColumnarResultStore
+from result_sink import write_stream
+from simulation import iter_isolated_simulations
+from instrumentation import instrumented, stage
+
+CAMPAIGN_FILE = "campaign.json"
+FAILURES_FILE = "failures.jsonl"
+
+def _encode_key(key):
+    """Las llaves de cir_dict pueden ser tuples, que JSON guarda como listas."""
+    return list(key) if isinstance(key, tuple) else key
+
+def _decode_key(key):
+    return tuple(key) if isinstance(key, list) else key
+
+def _splitmix64(key, counters):
+    """Mezcla cada contador con la llave como el generador SplitMix64, de forma vectorizada.
+
+    Args:
+        key (numpy.uint64): Llave del flujo, derivada de la semilla.
+        counters (numpy.ndarray): Contadores uint64, uno por número pedido.
+
+    Returns:
+        numpy.ndarray: Palabras uint64 pseudoaleatorias con la forma de counters.
+    """
+    # La aritmética de uint64 de NumPy da la vuelta módulo 2**64, como la de SplitMix64
+    z = key + (counters + np.uint64(1)) * np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+class Campaign:
+    """
+    Campaña de Monte Carlo reproducible y reanudable.
+
+    Attributes:
+        cir_dict (dict): Diccionario producido por read_cir_file, con las distribuciones de la campaña.
+        input_file_name (str): Ruta del netlist original.
+        n_samples (int): Cantidad total de muestras.
+        seed (int): Semilla raíz. Si no se da, se toma de la entropía del sistema y queda guardada.
+        sampling_method (str): Método de sample_parameter_matrix.
+        new_filename (str): Prefijo del nombre de cada muestra.
+        next_index (int): Primera muestra que no ha terminado; todas las anteriores terminaron.
+        stop (int): Fin (exclusivo) de las muestras a simular, n_samples salvo en una porción (ver portion).
+        failed (dict): {índice: texto del error} de las muestras que fallaron, que no se vuelven a simular.
+    """
+
+    def __init__(self, cir_dict, input_file_name, n_samples, seed=None, sampling_method='random', new_filename="new_cir"):
+        if sampling_method not in SAMPLING_METHODS:
+            raise ValueError(f'Unsupported sampling method: {sampling_method}')
+        self.cir_dict = cir_dict
+        self.input_file_name = input_file_name
+        self.n_samples = n_samples
+        self.seed = int(seed) if seed is not None else np.random.SeedSequence().entropy
+        self.sampling_method = sampling_method
+        self.new_filename = new_filename
+        self.next_index = 0
+        self.stop = n_samples
+        self.failed = {}
+        self._completed = set()
+        self._sequence = None
+        self._template = None
+
+    def sample_name(self, index):
+        """Nombre de la muestra index, de la forma f"{new_filename}_{index}.cir"."""
+        return f"{self.new_filename}_{index}.cir"
+
+    def portion(self, start, stop):
+        """
+        Porción de la campaña con las muestras start <= i < stop, por ejemplo para repartirla entre máquinas.
+
+        Cada muestra conserva su índice y por lo tanto su generador y sus valores, así las porciones
+        juntas producen exactamente la campaña completa.
+
+        Args:
+            start (int): Primera muestra de la porción.
+            stop (int): Fin (exclusivo) de la porción.
+
+        Returns:
+            Campaign: Campaña nueva, sin muestras terminadas, que solo simula su rango.
+        """
+        part = Campaign(self.cir_dict, self.input_file_name, self.n_samples, seed=self.seed,
+                        sampling_method=self.sampling_method, new_filename=self.new_filename)
+        part.next_index, part.stop = start, min(stop, self.n_samples)
+        return part
+
+    def sample_index(self, name):
+        """Índice de la muestra a partir de su nombre."""
+        return int(os.path.splitext(name)[0].rsplit('_', 1)[1])
+
+    def sample_points(self, indices):
+        """
+        Puntos en [0, 1) de las muestras pedidas en modo 'random', una fila por índice.
+
+        El valor de la columna j de la muestra i es el contador i * dimensiones + j mezclado con SplitMix64
+        a partir de una llave derivada de la semilla raíz, así cada fila depende solo de la semilla y de
+        su índice, y el bloque completo se calcula con operaciones de NumPy sin recorrer las muestras.
+
+        Args:
+            indices (list): Índices de las muestras.
+
+        Returns:
+            numpy.ndarray: Matriz (len(indices), perturbed_dimensions(cir_dict)).
+        """
+        dimensions = perturbed_dimensions(self.cir_dict)
+        key = np.random.SeedSequence(self.seed).generate_state(1, np.uint64)[0]
+        counters = (np.asarray(indices, dtype=np.uint64)[:, None] * np.uint64(dimensions)
+                    + np.arange(dimensions, dtype=np.uint64))
+        # Los 53 bits más altos de cada palabra dan un double uniforme en [0, 1)
+        return (_splitmix64(key, counters) >> np.uint64(11)) * 2.0 ** -53
+
+    def sample_rows(self, indices):
+        """
+        Muestrea los valores de las muestras pedidas.
+
+        Con 'random' cada fila se obtiene de los puntos independientes de su muestra (ver sample_points),
+        transformados con la inversa de la distribución de cada elemento para todo el bloque a la vez.
+        Los métodos de baja discrepancia y el hipercubo latino dependen del tamaño total, así que la
+        secuencia completa se genera una vez con la semilla raíz y se toman sus filas.
+
+        Args:
+            indices (iterable): Índices de las muestras.
+
+        Returns:
+            tuple: (lines, samples) como en sample_parameter_matrix, con una fila por índice.
+        """
+        indices = list(indices)
+        if self.sampling_method != 'random':
+            if self._sequence is None:
+                self._sequence = sample_parameter_matrix(self.cir_dict, self.n_samples, self.sampling_method,
+                                                         np.random.default_rng(self.seed))
+            lines, samples = self._sequence
+            return lines, samples[indices]
+
+        return sample_from_points(self.cir_dict, self.sample_points(indices))
+
+    def pending(self):
+        """list: Índices de las muestras que todavía no terminan ni fallaron, en orden."""
+        return [i for i in range(self.next_index, self.stop) if i not in self._completed and i not in self.failed]
+
+    def netlists(self, indices=None, rows=None):
+        """
+        Genera los netlists de las muestras pedidas, por defecto las pendientes.
+
+        La plantilla del netlist original se compila la primera vez y se reutiliza en los bloques siguientes.
+
+        Args:
+            indices (iterable, optional): Índices de las muestras. Defaults to None (Campaign.pending).
+            rows (tuple, optional): (lines, samples) ya extraídos con sample_rows(indices), para no volver
+            a muestrearlos. Defaults to None.
+
+        Yields:
+            tuple: (nombre, contenido) de cada netlist.
+        """
+        indices = self.pending() if indices is None else list(indices)
+        if not indices:
+            return
+        if self._template is None:
+            self._template = fileopr.compile_cir_template(self.cir_dict, self.input_file_name)
+        lines, samples = self.sample_rows(indices) if rows is None else rows
+        formatted = spceconvrt.float_to_LTSpice_array(samples)
+        for index, row in zip(indices, formatted.tolist()):
+            yield self.sample_name(index), fileopr.render_cir_template(self._template, dict(zip(lines, row)))
+
+    def mark_completed(self, sample):
+        """
+        Marca una muestra como terminada.
+
+        Args:
+            sample (int | str): Índice o nombre de la muestra.
+        """
+        index = sample if isinstance(sample, int) else self.sample_index(sample)
+        self._completed.add(index)
+        # Las muestras pueden terminar en desorden, next_index solo avanza sobre el prefijo completo
+        while self.next_index in self._completed:
+            self._completed.remove(self.next_index)
+            self.next_index += 1
+
+    def mark_failed(self, sample, error):
+        """
+        Marca una muestra como fallida.
+
+        Args:
+            sample (int | str): Índice o nombre de la muestra.
+            error (str): Texto del error.
+        """
+        index = sample if isinstance(sample, int) else self.sample_index(sample)
+        self.failed[index] = error
+
+    @property
+    def done(self):
+        """bool: True si todas las muestras terminaron o fallaron."""
+        return not self.pending()
+
+    def to_dict(self):
+        """
+        Convierte la campaña a un diccionario serializable como JSON.
+
+        Returns:
+            dict: Estado completo de la campaña, incluyendo cir_dict.
+        """
+        return {
+            'input_file_name': self.input_file_name,
+            'n_samples': self.n_samples,
+            'seed': self.seed,
+            'sampling_method': self.sampling_method,
+            'new_filename': self.new_filename,
+            'next_index': self.next_index,
+            'stop': self.stop,
+            'completed': sorted(self._completed),
+            'failed': {str(index): error for index, error in self.failed.items()},
+            'targets': [dict(item, key=_encode_key(key)) for key, item in self.cir_dict.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Reconstruye una campaña a partir de Campaign.to_dict.
+
+        Args:
+            state (dict): Estado de la campaña.
+
+        Returns:
+            Campaign: La campaña, con sus muestras terminadas.
+        """
+        cir_dict = {}
+        for item in state['targets']:
+            item = dict(item)
+            cir_dict[_decode_key(item.pop('key'))] = item
+        campaign = cls(cir_dict, state['input_file_name'], state['n_samples'], seed=state['seed'],
+                       sampling_method=state['sampling_method'], new_filename=state['new_filename'])
+        campaign.next_index = state['next_index']
+        campaign.stop = state.get('stop', state['n_samples'])
+        campaign._completed = set(state['completed'])
+        campaign.failed = {int(index): error for index, error in state.get('failed', {}).items()}
+        return campaign
+
+    def save(self, path):
+        """
+        Guarda la campaña en path/campaign.json, de forma atómica.
+
+        Args:
+            path (str): Carpeta de la campaña, normalmente la del almacén de resultados.
+        """
+        os.makedirs(path, exist_ok=True)
+        temporary_path = os.path.join(path, CAMPAIGN_FILE + ".tmp")
+        with open(temporary_path, 'w', encoding="UTF-8") as file:
+            json.dump(self.to_dict(), file)
+        os.replace(temporary_path, os.path.join(path, CAMPAIGN_FILE))
+
+def load_campaign(path):
+    """
+    Lee una campaña guardada con Campaign.save.
+
+    Args:
+        path (str): Carpeta de la campaña.
+
+    Returns:
+        Campaign: La campaña guardada.
+    """
+    with open(os.path.join(path, CAMPAIGN_FILE), 'r', encoding="UTF-8") as file:
+        return Campaign.from_dict(json.load(file))
+
+def record_progress(simulations, campaign):
+    """
+    Deja pasar un generador de simulaciones marcando cada muestra como terminada.
+
+    Args:
+        simulations (iterable): Pares (nombre, resultados).
+        campaign (Campaign): Campaña a la que pertenecen las muestras.
+
+    Yields:
+        tuple: Los mismos pares (nombre, resultados).
+    """
+    for name, results in simulations:
+        campaign.mark_completed(name)
+        yield name, results
+
+def _append_failures(store_path, failures):
+    """Agrega las muestras fallidas, con sus parámetros y su error, a failures.jsonl."""
+    with open(os.path.join(store_path, FAILURES_FILE), 'a', encoding="UTF-8") as file:
+        for failure in failures:
+            file.write(json.dumps(failure) + "\n")
+
+def read_failures(store_path):
+    """
+    Lee las muestras fallidas registradas por run_campaign.
+
+    Args:
+        store_path (str): Carpeta del almacén de la campaña.
+
+    Returns:
+        list: Diccionarios con 'name', 'error' y 'parameters' ({nombre del parámetro: valor}).
+    """
+    failures_path = os.path.join(store_path, FAILURES_FILE)
+    if not os.path.exists(failures_path):
+        return []
+    with open(failures_path, 'r', encoding="UTF-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+def run_campaign(campaign, store_path, simulate=None, batch_size=256, chunk_size=64, timeout=60.0, n_workers=1,
+                 vectors=None, prog=False, update_callback=None, instrumentation=None):
+    """
+    Simula las muestras pendientes de una campaña con puntos de control en disco.
+
+    Antes de empezar se guarda la campaña en store_path y se marcan como terminadas las muestras que
+    el almacén ya tiene confirmadas, que es la fuente de verdad al reanudar. Las pendientes se generan
+    y simulan por bloques de batch_size; los resultados se confirman cada chunk_size muestras y al
+    final de cada bloque se vuelve a guardar la campaña. Si NgSpice se cae o la máquina se reinicia,
+    se pierden a lo sumo las muestras del último bloque sin confirmar.
+
+    Por defecto cada muestra se simula con simulation.iter_isolated_simulations: las que exceden el
+    tiempo límite o hacen fallar a NgSpice se anotan en la campaña y en failures.jsonl, con sus
+    parámetros y el texto del error, y la campaña sigue con las demás.
+
+    Args:
+        campaign (Campaign): Campaña a simular.
+        store_path (str): Carpeta del almacén columnar de resultados.
+        simulate (callable, optional): Recibe un diccionario {nombre: contenido} y la palabra clave
+        on_failure, una función (nombre, error), y entrega pares (nombre, resultados).
+        Defaults to None (simulation.iter_isolated_simulations con timeout, n_workers y vectors).
+        batch_size (int, optional): Muestras que se generan y simulan por bloque. Defaults to 256.
+        chunk_size (int, optional): Muestras por bloque de escritura del almacén. Defaults to 64.
+        timeout (float, optional): Segundos máximos de simulación por muestra. Defaults to 60.0.
+        n_workers (int, optional): Procesos vigilados que simulan en paralelo. Defaults to 1.
+        vectors (list | str, optional): Vectores a guardar, ver simulation.iter_isolated_simulations.
+        Defaults to None (los del .PROBE del netlist).
+        prog (bool, optional): Muestra en la consola el progreso. Defaults to False.
+        update_callback (callable, optional): Recibe la cantidad de muestras guardadas, contando las
+        de ejecuciones anteriores. Defaults to None.
+        instrumentation (Instrumentation, optional): Mide las etapas de esta ejecución y escribe su reporte
+        en store_path/instrumentation.json al terminar, aunque la campaña se interrumpa. Defaults to None.
+
+    Returns:
+        list: Salidas simuladas en esta ejecución.
+    """
+    simulate = simulate or functools.partial(iter_isolated_simulations, timeout=timeout, n_workers=n_workers,
+                                             vectors=vectors)
+    parameter_names = parameter_column_names(campaign.cir_dict)
+    available_outputs = set()
+
+    campaign.save(store_path)
+    try:
+        with instrumented(instrumentation), \
+                ColumnarResultStore(store_path, parameter_names=parameter_names, chunk_size=chunk_size) as store:
+            for name in store.names:
+                campaign.mark_completed(name)
+            pending = campaign.pending()
+            failures = []
+            try:
+                for start in range(0, len(pending), batch_size):
+                    indices = pending[start:start + batch_size]
+                    with stage('sample_parameters'):
+                        rows = campaign.sample_rows(indices)
+                    parameters = {campaign.sample_name(i): row for i, row in zip(indices, rows[1])}
+                    with stage('render_netlists'):
+                        netlists = dict(campaign.netlists(indices, rows=rows))
+
+                    def on_failure(name, error):
+                        campaign.mark_failed(name, error)
+                        failures.append({'name': name, 'error': error,
+                                         'parameters': dict(zip(parameter_names, parameters[name].tolist()))})
+
+                    saved = store.count
+                    callback = (lambda count: update_callback(saved + count)) if update_callback else None
+                    simulations = record_progress(simulate(netlists, on_failure=on_failure), campaign)
+                    available_outputs.update(write_stream(simulations, store, prog=prog, update_callback=callback,
+                                                          parameters=parameters))
+                    store.flush()
+                    with stage('checkpoint'):
+                        _append_failures(store_path, failures)
+                        failures.clear()
+                        campaign.save(store_path)
+            finally:
+                # Lo que alcanzó a simularse se confirma aunque la campaña se interrumpa con una excepción
+                store.flush()
+                _append_failures(store_path, failures)
+                campaign.save(store_path)
+    finally:
+        if instrumentation is not None:
+            instrumentation.save(store_path)
+    return list(available_outputs)
+
+def resume_campaign(store_path, simulate=None, batch_size=256, chunk_size=64, timeout=60.0, n_workers=1,
+                    vectors=None, retry_failed=False, prog=False, update_callback=None, instrumentation=None):
+    """
+    Retoma una campaña guardada por run_campaign, simulando solo las muestras que faltan.
+
+    Args:
+        store_path (str): Carpeta del almacén, con su campaign.json.
+        simulate (callable, optional): Ver run_campaign. Defaults to None.
+        batch_size (int, optional): Ver run_campaign. Defaults to 256.
+        chunk_size (int, optional): Ver run_campaign. Defaults to 64.
+        timeout (float, optional): Ver run_campaign. Defaults to 60.0.
+        n_workers (int, optional): Ver run_campaign. Defaults to 1.
+        vectors (list | str, optional): Ver run_campaign. Defaults to None.
+        retry_failed (bool, optional): Vuelve a intentar las muestras que fallaron. Defaults to False.
+        prog (bool, optional): Ver run_campaign. Defaults to False.
+        update_callback (callable, optional): Ver run_campaign. Defaults to None.
+        instrumentation (Instrumentation, optional): Ver run_campaign. Defaults to None.
+
+    Returns:
+        tuple: (campaign, salidas simuladas en esta ejecución).
+    """
+    campaign = load_campaign(store_path)
+    if retry_failed:
+        campaign.failed.clear()
+    outputs = run_campaign(campaign, store_path, simulate=simulate, batch_size=batch_size, chunk_size=chunk_size,
+                           timeout=timeout, n_workers=n_workers, vectors=vectors, prog=prog,
+                           update_callback=update_callback, instrumentation=instrumentation)
+    return campaign, outputs
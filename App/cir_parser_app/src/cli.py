@@ -0,0 +1,279 @@
+"""cli.py contiene el ejecutor de campañas por línea de comandos, para correr en servidores sin pantalla.
+No importa tkinter ni matplotlib: lee el netlist, aplica las distribuciones pedidas, simula la campaña con
+campaign.run_campaign (puntos de control, procesos vigilados y tiempo límite por muestra) y escribe las
+estadísticas de cada salida junto al almacén de resultados:
+        parse_override(text): Lee una perturbación de la forma NOMBRE=DISTRIBUCIÓN:ESCALA.
+
+        apply_overrides(cir_dict, overrides, dist=None, scale=None): Aplica las perturbaciones al cir_dict.
+
+        output_statistics(results, outputs=None, num_timesteps=200, quantiles=(0.05, 0.5, 0.95)): Acumula
+        por bloques las estadísticas por timestep de cada salida de un almacén.
+
+        write_statistics(store_path, accumulators): Escribe un statistics_<salida>.csv por salida.
+
+        main(argv=None): Punto de entrada.
+
+    Ejemplos, desde src:
+        python cli.py ../archivos_cir/LINEAL.cir --samples 1000 --workers 8 --store resultados/lineal \\
+            --scale 0.03 --set R1=normal:5% --set C1=uniform:0.1 --seed 42
+        python cli.py --resume --store resultados/lineal
+
+    En la carpeta del almacén quedan, además de los resultados y campaign.json, failures.jsonl con las
+    muestras fallidas, instrumentation.json con el tiempo de cada etapa y summary.json con el resumen.
+    """
+import argparse
+import json
+import os
+import sys
+import regex as re
+import numpy as np
+from file_operations import read_cir_file
+from parameter_perturbation import SAMPLING_METHODS
+from campaign import Campaign, run_campaign, resume_campaign, CAMPAIGN_FILE, FAILURES_FILE
+from result_store import open_result_store
+from resampling import uniform_time_grid, resample_results
+from online_statistics import OutputAccumulator
+from instrumentation import Instrumentation, INSTRUMENTATION_FILE
+
+DISTRIBUTIONS = ('uniform', 'normal')
+SUMMARY_FILE = "summary.json"
+
+# Muestras que se interpolan juntas al calcular las estadísticas
+_STATISTICS_BATCH = 256
+
+def _parse_scale(text):
+    """Escala relativa, como fracción (0.05) o como porcentaje (5%)."""
+    text = text.strip()
+    if text.endswith('%'):
+        return float(text[:-1]) / 100
+    return float(text)
+
+def parse_override(text):
+    """
+    Lee una perturbación de la línea de comandos.
+
+    Args:
+        text (str): 'NOMBRE=DISTRIBUCIÓN:ESCALA', 'NOMBRE=DISTRIBUCIÓN' o 'NOMBRE=ESCALA',
+        por ejemplo 'R1=normal:5%' o 'C1=0.1'.
+
+    Returns:
+        tuple: (nombre, {'dist': ..., 'scale': ...}) con solo los campos dados.
+
+    Raises:
+        ValueError: Si el texto no tiene esa forma o la distribución no está soportada.
+    """
+    name, separator, spec = text.partition('=')
+    if not separator or not name.strip() or not spec.strip():
+        raise ValueError(f"Perturbación inválida '{text}', se espera NOMBRE=DISTRIBUCIÓN:ESCALA.")
+    override = {}
+    for field in spec.split(':'):
+        field = field.strip()
+        if field.lower() in DISTRIBUTIONS:
+            override['dist'] = field.lower()
+        else:
+            try:
+                override['scale'] = _parse_scale(field)
+            except ValueError:
+                raise ValueError(f"Distribución o escala desconocida '{field}' en '{text}', "
+                                 f"las distribuciones son {', '.join(DISTRIBUTIONS)}.") from None
+    return name.strip(), override
+
+def apply_overrides(cir_dict, overrides, dist=None, scale=None):
+    """
+    Aplica a cir_dict las distribuciones y escalas pedidas.
+
+    Args:
+        cir_dict (dict): Diccionario producido por read_cir_file, se modifica en el lugar.
+        overrides (list): Pares (nombre, campos) de parse_override. El nombre se compara sin distinguir
+        mayúsculas con el 'name' de cada entrada; en los objetivos por instancia de subcircuito afecta
+        a todas las entradas con ese nombre.
+        dist (str, optional): Distribución de todos los elementos sin perturbación propia. Defaults to None.
+        scale (float, optional): Escala de todos los elementos sin perturbación propia. Defaults to None.
+
+    Returns:
+        dict: El mismo cir_dict.
+
+    Raises:
+        ValueError: Si un nombre no corresponde a ningún elemento del netlist.
+    """
+    for entry in cir_dict.values():
+        if dist is not None:
+            entry['dist'] = dist
+        if scale is not None:
+            entry['scale'] = scale
+
+    for name, override in overrides:
+        matches = [entry for entry in cir_dict.values() if str(entry['name']).lower() == name.lower()]
+        if not matches:
+            known = sorted({str(entry['name']) for entry in cir_dict.values()})
+            raise ValueError(f"El netlist no tiene un elemento '{name}', los disponibles son: {', '.join(known)}.")
+        for entry in matches:
+            entry.update(override)
+    return cir_dict
+
+def output_statistics(results, outputs=None, num_timesteps=200, quantiles=(0.05, 0.5, 0.95)):
+    """
+    Acumula las estadísticas por timestep de cada salida, interpolando las muestras por bloques.
+
+    Args:
+        results (Mapping): Resultados, por ejemplo un result_store.ResultStoreReader.
+        outputs (list, optional): Salidas a resumir. Defaults to None (todas las del almacén).
+        num_timesteps (int, optional): Puntos de la malla uniforme. Defaults to 200.
+        quantiles (tuple, optional): Probabilidades de los cuantiles a estimar. Defaults to (0.05, 0.5, 0.95).
+
+    Returns:
+        dict: {salida: OutputAccumulator}, vacío si no hay muestras.
+    """
+    if not len(results):
+        return {}
+    if outputs is None:
+        outputs = results.available_outputs
+    time_grid = uniform_time_grid(results, num_timesteps)
+    accumulators = {output: OutputAccumulator(output, time_grid=time_grid, quantiles=quantiles) for output in outputs}
+
+    names = list(results)
+    for start in range(0, len(names), _STATISTICS_BATCH):
+        block = {name: results[name] for name in names[start:start + _STATISTICS_BATCH]}
+        for output, accumulator in accumulators.items():
+            _, matrix, _ = resample_results(block, output=output, time_grid=time_grid)
+            accumulator.add_resampled(matrix)
+    return accumulators
+
+def _statistics_file(output):
+    """Nombre del archivo de estadísticas de una salida, sin caracteres problemáticos como paréntesis."""
+    return "statistics_" + re.sub(r'[^\w.-]+', '_', output).strip('_') + ".csv"
+
+def write_statistics(store_path, accumulators):
+    """
+    Escribe las estadísticas de cada salida como CSV, una fila por timestep.
+
+    Columnas: time, mean, std, min, max y un cuantil por probabilidad (q0.05, ...).
+
+    Args:
+        store_path (str): Carpeta del almacén.
+        accumulators (dict): {salida: OutputAccumulator}, como los de output_statistics.
+
+    Returns:
+        dict: {salida: nombre del archivo escrito}.
+    """
+    files = {}
+    for output, accumulator in accumulators.items():
+        probabilities = sorted(accumulator.quantiles)
+        columns = [accumulator.time_grid, accumulator.moments.mean, accumulator.moments.std,
+                   accumulator.minimum, accumulator.maximum] + [accumulator.quantile(p) for p in probabilities]
+        header = ",".join(['time', 'mean', 'std', 'min', 'max'] + [f"q{p:g}" for p in probabilities])
+        files[output] = _statistics_file(output)
+        np.savetxt(os.path.join(store_path, files[output]), np.column_stack(columns), delimiter=",",
+                   header=header, comments="", fmt="%.9g")
+    return files
+
+def build_parser():
+    """Construye el argparse.ArgumentParser del ejecutor."""
+    parser = argparse.ArgumentParser(
+        description="Simula una campaña de Monte Carlo de un netlist sin interfaz gráfica.")
+    parser.add_argument('netlist', nargs='?', help="Archivo .cir a perturbar (no se usa con --resume).")
+    parser.add_argument('--store', required=True, help="Carpeta del almacén de resultados de la campaña.")
+    parser.add_argument('--samples', type=int, default=100, help="Cantidad de muestras. Default: 100.")
+    parser.add_argument('--workers', type=int, default=1, help="Procesos de NgSpice en paralelo. Default: 1.")
+    parser.add_argument('--set', dest='overrides', action='append', default=[], metavar='NOMBRE=DIST:ESCALA',
+                        help="Perturbación de un elemento, por ejemplo R1=normal:5%%. Se puede repetir.")
+    parser.add_argument('--dist', choices=DISTRIBUTIONS, help="Distribución de los elementos sin --set.")
+    parser.add_argument('--scale', type=_parse_scale, help="Escala de los elementos sin --set (0.03 o 3%%).")
+    parser.add_argument('--extended', action='store_true',
+                        help="Incluye los .PARAM y los elementos de subcircuitos por instancia.")
+    parser.add_argument('--sampling', choices=SAMPLING_METHODS, default='random', help="Método de muestreo.")
+    parser.add_argument('--seed', type=int, help="Semilla de la campaña. Default: aleatoria, queda en campaign.json.")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Segundos máximos por muestra. Default: 60.")
+    parser.add_argument('--batch-size', type=int, default=256, help="Muestras por punto de control. Default: 256.")
+    parser.add_argument('--vectors', nargs='+',
+                        help="Vectores a guardar, por ejemplo v(4) i(vin), o 'all'. Default: los del .PROBE.")
+    parser.add_argument('--outputs', nargs='+', help="Salidas a resumir. Default: todas.")
+    parser.add_argument('--timesteps', type=int, default=200, help="Puntos de la malla de las estadísticas.")
+    parser.add_argument('--quantiles', type=float, nargs='+', default=[0.05, 0.5, 0.95],
+                        help="Cuantiles por timestep. Default: 0.05 0.5 0.95.")
+    parser.add_argument('--resume', action='store_true', help="Retoma la campaña guardada en --store.")
+    parser.add_argument('--retry-failed', action='store_true', help="Con --resume, reintenta las muestras fallidas.")
+    parser.add_argument('--profile', action='store_true', help="Perfila con cProfile y mide la memoria.")
+    parser.add_argument('--quiet', action='store_true', help="No muestra el progreso.")
+    return parser
+
+def main(argv=None):
+    """
+    Ejecuta una campaña desde la línea de comandos.
+
+    Args:
+        argv (list, optional): Argumentos. Defaults to None (sys.argv).
+
+    Returns:
+        int: Código de salida, 0 si la campaña terminó con al menos una muestra guardada y 1 si ninguna
+        muestra se completó (todas fallaron o no había muestras); summary.json se escribe en ambos casos.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    vectors = args.vectors
+    if vectors == ['all']:
+        vectors = 'all'
+    exists = os.path.exists(os.path.join(args.store, CAMPAIGN_FILE))
+
+    if args.resume:
+        if not exists:
+            parser.error(f"{args.store} no contiene una campaña para reanudar.")
+    else:
+        if args.netlist is None:
+            parser.error("Falta el netlist (o --resume para retomar una campaña).")
+        if exists:
+            parser.error(f"{args.store} ya contiene una campaña, use --resume para retomarla u otra carpeta.")
+        try:
+            cir_dict = read_cir_file(args.netlist, incluir_parametros=args.extended,
+                                     incluir_subcircuitos=args.extended)
+            apply_overrides(cir_dict, [parse_override(text) for text in args.overrides], args.dist, args.scale)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    def progress(count):
+        print(f"\rMuestras guardadas: {count}", end="", file=sys.stderr, flush=True)
+
+    # El progreso se reescribe en la misma línea, solo tiene sentido en una terminal
+    show_progress = not args.quiet and sys.stderr.isatty()
+    options = dict(batch_size=args.batch_size, timeout=args.timeout, n_workers=args.workers, vectors=vectors,
+                   update_callback=progress if show_progress else None,
+                   instrumentation=Instrumentation(profile=args.profile, trace_memory=args.profile))
+    if args.resume:
+        campaign, _ = resume_campaign(args.store, retry_failed=args.retry_failed, **options)
+    else:
+        campaign = Campaign(cir_dict, args.netlist, args.samples, seed=args.seed, sampling_method=args.sampling)
+        run_campaign(campaign, args.store, **options)
+    if show_progress:
+        print(file=sys.stderr)
+
+    results = open_result_store(args.store)
+    accumulators = output_statistics(results, args.outputs, args.timesteps, tuple(args.quantiles))
+    files = write_statistics(args.store, accumulators)
+
+    with open(os.path.join(args.store, INSTRUMENTATION_FILE), 'r', encoding="UTF-8") as file:
+        performance = json.load(file)
+    summary = {
+        'netlist': campaign.input_file_name,
+        'seed': campaign.seed,
+        'sampling_method': campaign.sampling_method,
+        'n_samples': campaign.n_samples,
+        'completed': len(results),
+        'failed': len(campaign.failed),
+        'outputs': results.available_outputs,
+        'statistics': files,
+        'failures': FAILURES_FILE if campaign.failed else None,
+        'samples_per_second': performance['samples_per_second']
+    }
+    with open(os.path.join(args.store, SUMMARY_FILE), 'w', encoding="UTF-8") as file:
+        json.dump(summary, file, indent=2)
+
+    print(f"{len(results)} de {campaign.n_samples} muestras en {args.store} ({len(campaign.failed)} fallidas).")
+    for output, file_name in files.items():
+        print(f"  {output}: {file_name}")
+    if not len(results):
+        print(f"Ninguna muestra se completó, ver {os.path.join(args.store, FAILURES_FILE)}.", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,504 @@
+"""distributed.py contiene la ejecución de una campaña repartida entre varias máquinas, con una cola de
+trabajos en una carpeta compartida (por ejemplo un montaje NFS o SMB visible desde todas las máquinas):
+        submit_campaign(campaign, queue_path, range_size=256): El coordinador divide la campaña en rangos de
+        muestras y deja un trabajo por rango en la cola, junto con la campaña y una copia del netlist.
+
+        run_worker(queue_path, simulate=None, n_workers=1, timeout=60.0, ...): Un trabajador toma trabajos de
+        la cola y simula cada rango con campaign.run_campaign en su propio almacén parcial.
+
+        requeue_stale(queue_path, lease=600.0): Devuelve a la cola los trabajos de trabajadores que dejaron
+        de dar señales de vida.
+
+        queue_status(queue_path): Cuenta los trabajos pendientes, en curso y terminados.
+
+        merge_results(queue_path, store_path): Junta los almacenes parciales en un solo almacén columnar, con
+        su campaign.json y failures.jsonl, como si la campaña se hubiera simulado en una sola máquina.
+
+        coordinate(queue_path, store_path, lease=600.0, poll_interval=5.0): Espera a que terminen todos los
+        trabajos, reencolando los abandonados, y junta los resultados.
+
+        main(argv=None): Subcomandos submit, worker, status y merge para la línea de comandos.
+
+    Cada muestra se genera con el generador que Campaign deriva de la semilla raíz y su índice, así el
+    resultado no depende de cuántas máquinas hubo ni de qué rango simuló cada una.
+
+    Tomar un trabajo es renombrar su archivo de pending/ a running/ agregando una ficha única al nombre,
+    que es atómico. Mientras el trabajo le pertenece, el trabajador actualiza la fecha de ese archivo después
+    de cada muestra guardada o fallida; requeue_stale devuelve a pending/ los que llevan demasiado sin
+    cambiar. Si el archivo con su ficha ya no existe el trabajador perdió el trabajo y lo deja sin tocar la
+    cola. Cada toma escribe en su propia versión del almacén parcial, que parte de una copia de la versión
+    más avanzada de tomas anteriores, así dos trabajadores nunca escriben en el mismo almacén.
+
+    Estructura de la cola:
+        campaign.json: Campaña completa.        netlist.cir: Copia del netlist original.
+        pending/: job_<inicio>_<fin>.json por cada rango sin tomar.
+        running/, done/: job_<inicio>_<fin>@<ficha>.json de cada rango en curso o terminado, con la ficha de su toma.
+        parts/job_<inicio>_<fin>/<ficha>/: Almacén parcial de cada toma de un rango.
+    """
+import argparse
+import functools
+import json
+import os
+import shutil
+import socket
+import sys
+import time
+import uuid
+from campaign import Campaign, load_campaign, read_failures, run_campaign, CAMPAIGN_FILE, FAILURES_FILE
+from parameter_perturbation import parameter_column_names
+from result_store import ColumnarResultStore, open_result_store, INDEX_FILE
+from simulation import iter_isolated_simulations
+
+NETLIST_FILE = "netlist.cir"
+PENDING, RUNNING, DONE = "pending", "running", "done"
+PARTS = "parts"
+
+class _LeaseLost(Exception):
+    """El trabajo volvió a la cola con requeue_stale y ya no pertenece a este trabajador."""
+
+def _job_name(start, stop):
+    """Nombre del trabajo de un rango; con ceros a la izquierda el orden alfabético es el de las muestras."""
+    return f"job_{start:09d}_{stop:09d}"
+
+def _entries(queue_path, state):
+    """Pares (trabajo, ficha) de los archivos de un estado, en orden de muestras; la ficha es None en pending/."""
+    folder = os.path.join(queue_path, state)
+    if not os.path.isdir(folder):
+        return []
+    entries = []
+    for file_name in os.listdir(folder):
+        if file_name.endswith('.json'):
+            job, _, token = os.path.splitext(file_name)[0].partition('@')
+            entries.append((job, token or None))
+    return sorted(entries)
+
+def _jobs(queue_path, state):
+    """Nombres de los trabajos en un estado, en orden de muestras."""
+    return [job for job, _ in _entries(queue_path, state)]
+
+def _job_file(queue_path, state, job, token=None):
+    return os.path.join(queue_path, state, job + (f"@{token}" if token else "") + ".json")
+
+def _queue_campaign(queue_path):
+    """Campaña de la cola, con el netlist apuntando a la copia de la cola en esta máquina."""
+    campaign = load_campaign(queue_path)
+    campaign.input_file_name = os.path.join(queue_path, NETLIST_FILE)
+    return campaign
+
+def submit_campaign(campaign, queue_path, range_size=256):
+    """
+    Crea la cola de trabajos de una campaña.
+
+    Args:
+        campaign (Campaign): Campaña completa.
+        queue_path (str): Carpeta compartida de la cola.
+        range_size (int, optional): Muestras por trabajo. Defaults to 256.
+
+    Returns:
+        list: Nombres de los trabajos creados.
+
+    Raises:
+        FileExistsError: Si la carpeta ya contiene una cola.
+    """
+    if os.path.exists(os.path.join(queue_path, CAMPAIGN_FILE)):
+        raise FileExistsError(f"{queue_path} ya contiene una cola de trabajos.")
+    for state in (PENDING, RUNNING, DONE, PARTS):
+        os.makedirs(os.path.join(queue_path, state), exist_ok=True)
+    shutil.copyfile(campaign.input_file_name, os.path.join(queue_path, NETLIST_FILE))
+
+    jobs = []
+    for start in range(0, campaign.n_samples, range_size):
+        stop = min(start + range_size, campaign.n_samples)
+        job = _job_name(start, stop)
+        with open(_job_file(queue_path, PENDING, job), 'w', encoding="UTF-8") as file:
+            json.dump({'start': start, 'stop': stop}, file)
+        jobs.append(job)
+
+    # La campaña se escribe al final, los trabajadores no empiezan hasta que existe
+    campaign.save(queue_path)
+    return jobs
+
+def claim_job(queue_path, worker_id):
+    """
+    Toma el primer trabajo pendiente.
+
+    Args:
+        queue_path (str): Carpeta de la cola.
+        worker_id (str): Identificador del trabajador.
+
+    Returns:
+        tuple | None: (nombre, {'start', 'stop', 'worker', 'token'}) o None si no quedan pendientes. token
+        identifica esta toma: el trabajo pertenece al trabajador mientras exista running/<nombre>@<token>.json.
+    """
+    for job in _jobs(queue_path, PENDING):
+        token = uuid.uuid4().hex
+        running = _job_file(queue_path, RUNNING, job, token)
+        try:
+            # Si otro trabajador lo tomó primero el archivo ya no existe y seguimos con el siguiente
+            os.rename(_job_file(queue_path, PENDING, job), running)
+            # El renombre conserva la fecha de submit_campaign, la toma cuenta como primera señal de vida
+            os.utime(running)
+            with open(running, 'r', encoding="UTF-8") as file:
+                spec = json.load(file)
+        except FileNotFoundError:
+            continue
+        spec.update(worker=worker_id, token=token)
+        return job, spec
+    return None
+
+def _heartbeat(running):
+    """Señal de vida de un trabajo en curso.
+
+    Raises:
+        _LeaseLost: Si el trabajo ya no pertenece a esta toma.
+    """
+    try:
+        os.utime(running)
+    except FileNotFoundError:
+        raise _LeaseLost(os.path.basename(running)) from None
+
+def _release(queue_path, job, token, state):
+    """
+    Mueve un trabajo en curso a state (DONE al terminar o PENDING para reintentarlo), solo si sigue
+    perteneciendo a la toma token.
+
+    Returns:
+        bool: False si el trabajo ya había vuelto a la cola.
+    """
+    destination = _job_file(queue_path, state, job, token if state == DONE else None)
+    try:
+        os.rename(_job_file(queue_path, RUNNING, job, token), destination)
+    except FileNotFoundError:
+        return False
+    return True
+
+def _part_versions(queue_path, job):
+    """Carpetas de las tomas de un trabajo que alcanzaron a crear su almacén."""
+    job_path = os.path.join(queue_path, PARTS, job)
+    if not os.path.isdir(job_path):
+        return []
+    versions = (os.path.join(job_path, token) for token in sorted(os.listdir(job_path)))
+    return [path for path in versions
+            if os.path.exists(os.path.join(path, CAMPAIGN_FILE)) and os.path.exists(os.path.join(path, INDEX_FILE))]
+
+def _latest_part(queue_path, job):
+    """Versión del almacén parcial de un trabajo: la de la toma que lo terminó, o la con más muestras guardadas."""
+    for done_job, token in _entries(queue_path, DONE):
+        if done_job == job:
+            return os.path.join(queue_path, PARTS, job, token)
+    versions = _part_versions(queue_path, job)
+    if not versions:
+        return None
+    return max(versions, key=lambda path: len(open_result_store(path)))
+
+def _copy_part(source, destination):
+    """
+    Copia la versión source de un almacén parcial en destination, para retomarla.
+
+    Una toma anterior que perdió el trabajo puede seguir escribiendo en source. Los archivos de datos
+    solo crecen, así que se copian después de campaign.json e index.json y sobran a lo sumo muestras sin
+    confirmar, que ColumnarResultStore descarta al abrirse. De failures.jsonl se copian solo las fallas
+    que la campaña copiada recuerda.
+    """
+    os.makedirs(destination)
+    file_names = [CAMPAIGN_FILE, INDEX_FILE] + sorted(
+        name for name in os.listdir(source) if name.endswith('.f64'))
+    for file_name in file_names:
+        shutil.copyfile(os.path.join(source, file_name), os.path.join(destination, file_name))
+
+    part = load_campaign(destination)
+    failed = {part.sample_name(i) for i in part.failed}
+    lines = []
+    if os.path.exists(os.path.join(source, FAILURES_FILE)):
+        with open(os.path.join(source, FAILURES_FILE), 'r', encoding="UTF-8") as file:
+            lines = file.readlines()
+    failures = {}
+    for line in lines:
+        try:
+            failure = json.loads(line)
+        except ValueError:
+            # Última línea a medio escribir por la toma anterior
+            continue
+        if failure['name'] in failed:
+            failures[failure['name']] = failure
+    with open(os.path.join(destination, FAILURES_FILE), 'w', encoding="UTF-8") as file:
+        for failure in failures.values():
+            file.write(json.dumps(failure) + "\n")
+
+def run_job(queue_path, job, spec, simulate=None, n_workers=1, timeout=60.0, vectors=None, batch_size=64,
+            chunk_size=64):
+    """
+    Simula el rango de un trabajo en la versión del almacén parcial de esta toma, retomando la versión
+    más avanzada de tomas anteriores si un trabajador anterior lo dejó a medias.
+
+    Después de cada muestra guardada o fallida se actualiza la fecha del archivo del trabajo, que es
+    la señal de vida que revisa requeue_stale.
+
+    Args:
+        queue_path (str): Carpeta de la cola.
+        job (str): Nombre del trabajo.
+        spec (dict): Trabajo entregado por claim_job, con 'start', 'stop' y 'token'.
+        simulate, n_workers, timeout, vectors, batch_size, chunk_size: Ver campaign.run_campaign.
+
+    Returns:
+        Campaign: La porción simulada.
+
+    Raises:
+        _LeaseLost: Si el trabajo volvió a la cola mientras se simulaba.
+    """
+    running = _job_file(queue_path, RUNNING, job, spec['token'])
+    part_path = os.path.join(queue_path, PARTS, job, spec['token'])
+    previous = _latest_part(queue_path, job)
+    if previous is not None:
+        _copy_part(previous, part_path)
+        part = load_campaign(part_path)
+    else:
+        part = _queue_campaign(queue_path).portion(spec['start'], spec['stop'])
+    part.input_file_name = os.path.join(queue_path, NETLIST_FILE)
+    _heartbeat(running)
+
+    simulate = simulate or functools.partial(iter_isolated_simulations, timeout=timeout, n_workers=n_workers,
+                                             vectors=vectors)
+
+    def watched(netlists, on_failure):
+        # Una racha de muestras que exceden el tiempo límite también es señal de vida
+        def failed(name, error):
+            on_failure(name, error)
+            _heartbeat(running)
+        return simulate(netlists, on_failure=failed)
+
+    run_campaign(part, part_path, simulate=watched, batch_size=batch_size, chunk_size=chunk_size,
+                 update_callback=lambda count: _heartbeat(running))
+    return part
+
+def run_worker(queue_path, simulate=None, n_workers=1, timeout=60.0, vectors=None, batch_size=64, chunk_size=64,
+               poll_interval=None, worker_id=None, max_jobs=None):
+    """
+    Ciclo de un trabajador: toma trabajos de la cola y los simula hasta que no quedan.
+
+    Si un trabajo vuelve a la cola mientras se simula (requeue_stale lo dio por abandonado), el trabajador
+    lo suelta sin tocar la cola y sigue con el siguiente. Si la simulación lanza una excepción, el trabajo
+    vuelve a pending/ (su almacén parcial conserva lo simulado) y la excepción se propaga.
+
+    Args:
+        queue_path (str): Carpeta compartida de la cola.
+        simulate (callable, optional): Ver campaign.run_campaign. Defaults to None (procesos vigilados).
+        n_workers (int, optional): Procesos de NgSpice en esta máquina. Defaults to 1.
+        timeout (float, optional): Segundos máximos por muestra. Defaults to 60.0.
+        vectors (list | str, optional): Vectores a guardar. Defaults to None (los del .PROBE).
+        batch_size (int, optional): Muestras por punto de control. Defaults to 64.
+        chunk_size (int, optional): Muestras por bloque de escritura. Defaults to 64.
+        poll_interval (float, optional): Si se da, el trabajador espera nuevos trabajos (por ejemplo los
+        reencolados) mientras queden trabajos en curso de otros, revisando cada poll_interval segundos.
+        Defaults to None (termina apenas no quedan pendientes).
+        worker_id (str, optional): Identificador del trabajador. Defaults to None ("máquina-pid").
+        max_jobs (int, optional): Máximo de trabajos a terminar. Defaults to None (sin límite).
+
+    Returns:
+        list: Nombres de los trabajos terminados por este trabajador.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    finished = []
+    while max_jobs is None or len(finished) < max_jobs:
+        claimed = claim_job(queue_path, worker_id)
+        if claimed is None:
+            if poll_interval is None or not _jobs(queue_path, RUNNING):
+                break
+            time.sleep(poll_interval)
+            continue
+        job, spec = claimed
+        try:
+            run_job(queue_path, job, spec, simulate=simulate, n_workers=n_workers, timeout=timeout,
+                    vectors=vectors, batch_size=batch_size, chunk_size=chunk_size)
+        except _LeaseLost:
+            # Otro trabajador lo retoma desde su propia versión del almacén parcial
+            continue
+        except BaseException:
+            _release(queue_path, job, spec['token'], PENDING)
+            raise
+        if _release(queue_path, job, spec['token'], DONE):
+            finished.append(job)
+    return finished
+
+def requeue_stale(queue_path, lease=600.0):
+    """
+    Devuelve a pending/ los trabajos en curso sin señales de vida durante lease segundos.
+
+    Args:
+        queue_path (str): Carpeta de la cola.
+        lease (float, optional): Segundos sin guardar ni descartar muestras tras los cuales el trabajador se
+        da por caído; debe ser mayor que el tiempo límite por muestra. Defaults to 600.0.
+
+    Returns:
+        list: Nombres de los trabajos reencolados.
+    """
+    requeued = []
+    now = time.time()
+    for job, token in _entries(queue_path, RUNNING):
+        running = _job_file(queue_path, RUNNING, job, token)
+        try:
+            if now - os.path.getmtime(running) >= lease:
+                os.rename(running, _job_file(queue_path, PENDING, job))
+                requeued.append(job)
+        except FileNotFoundError:
+            # El trabajador lo terminó, o otro coordinador lo reencoló, mientras revisábamos
+            continue
+    return requeued
+
+def queue_status(queue_path):
+    """
+    Estado de la cola.
+
+    Returns:
+        dict: {'pending': n, 'running': n, 'done': n}.
+    """
+    return {state: len(_jobs(queue_path, state)) for state in (PENDING, RUNNING, DONE)}
+
+def merge_results(queue_path, store_path, chunk_size=256):
+    """
+    Junta los almacenes parciales de la cola en un solo almacén, en orden de rangos.
+
+    De cada trabajo se toma la versión de la toma que lo terminó. Los trabajos que no terminaron aportan
+    la versión más avanzada; la campaña escrita en store_path recuerda qué muestras faltan, así puede
+    completarse con campaign.resume_campaign.
+
+    Args:
+        queue_path (str): Carpeta de la cola.
+        store_path (str): Carpeta del almacén final, que no debe contener otra campaña.
+        chunk_size (int, optional): Muestras por bloque de escritura. Defaults to 256.
+
+    Returns:
+        Campaign: La campaña completa, con las muestras terminadas y fallidas de todos los rangos.
+
+    Raises:
+        FileExistsError: Si store_path ya contiene una campaña.
+    """
+    if os.path.exists(os.path.join(store_path, CAMPAIGN_FILE)):
+        raise FileExistsError(f"{store_path} ya contiene una campaña.")
+    campaign = load_campaign(queue_path)
+    parameter_names = parameter_column_names(campaign.cir_dict)
+
+    with ColumnarResultStore(store_path, parameter_names=parameter_names, chunk_size=chunk_size) as store, \
+            open(os.path.join(store_path, FAILURES_FILE), 'a', encoding="UTF-8") as failures:
+        for job in sorted(os.listdir(os.path.join(queue_path, PARTS))):
+            part_path = _latest_part(queue_path, job)
+            if part_path is None:
+                continue
+            part = load_campaign(part_path)
+            campaign.failed.update(part.failed)
+            results = open_result_store(part_path)
+            for name, row in zip(results, results.parameters):
+                store.append(name, results[name], parameters=row)
+                campaign.mark_completed(name)
+            failed = {part.sample_name(i) for i in part.failed}
+            for failure in read_failures(part_path):
+                if failure['name'] in failed:
+                    failures.write(json.dumps(failure) + "\n")
+    campaign.save(store_path)
+    return campaign
+
+def coordinate(queue_path, store_path, lease=600.0, poll_interval=5.0, update_callback=None):
+    """
+    Espera a que los trabajadores terminen la cola, reencolando los trabajos abandonados, y junta los resultados.
+
+    Args:
+        queue_path (str): Carpeta de la cola.
+        store_path (str): Carpeta del almacén final.
+        lease (float, optional): Ver requeue_stale. Defaults to 600.0.
+        poll_interval (float, optional): Segundos entre revisiones. Defaults to 5.0.
+        update_callback (callable, optional): Recibe queue_status en cada revisión. Defaults to None.
+
+    Returns:
+        Campaign: La campaña completa, ver merge_results.
+    """
+    while True:
+        requeue_stale(queue_path, lease)
+        status = queue_status(queue_path)
+        if update_callback:
+            update_callback(status)
+        if not status[PENDING] and not status[RUNNING]:
+            break
+        time.sleep(poll_interval)
+    return merge_results(queue_path, store_path)
+
+def main(argv=None):
+    """
+    Punto de entrada de la línea de comandos. Ejemplos, desde src:
+        python distributed.py submit ../archivos_cir/LINEAL.cir --queue /mnt/cola --samples 100000 --scale 3%
+        python distributed.py worker --queue /mnt/cola --workers 8          (en cada máquina)
+        python distributed.py merge --queue /mnt/cola --store resultados/lineal --wait
+
+    Args:
+        argv (list, optional): Argumentos. Defaults to None (sys.argv).
+
+    Returns:
+        int: Código de salida.
+    """
+    from cli import DISTRIBUTIONS, parse_override, apply_overrides, _parse_scale
+    from file_operations import read_cir_file
+    from parameter_perturbation import SAMPLING_METHODS
+
+    parser = argparse.ArgumentParser(description="Campañas de Monte Carlo repartidas entre varias máquinas.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    submit = commands.add_parser('submit', help="Crea la cola de trabajos de una campaña.")
+    submit.add_argument('netlist', help="Archivo .cir a perturbar.")
+    submit.add_argument('--queue', required=True, help="Carpeta compartida de la cola.")
+    submit.add_argument('--samples', type=int, default=1000, help="Cantidad de muestras. Default: 1000.")
+    submit.add_argument('--range-size', type=int, default=256, help="Muestras por trabajo. Default: 256.")
+    submit.add_argument('--set', dest='overrides', action='append', default=[], metavar='NOMBRE=DIST:ESCALA',
+                        help="Perturbación de un elemento, ver cli.py. Se puede repetir.")
+    submit.add_argument('--dist', choices=DISTRIBUTIONS, help="Distribución de los elementos sin --set.")
+    submit.add_argument('--scale', type=_parse_scale, help="Escala de los elementos sin --set.")
+    submit.add_argument('--extended', action='store_true', help="Incluye .PARAM y subcircuitos por instancia.")
+    submit.add_argument('--sampling', choices=SAMPLING_METHODS, default='random', help="Método de muestreo.")
+    submit.add_argument('--seed', type=int, help="Semilla de la campaña. Default: aleatoria.")
+
+    worker = commands.add_parser('worker', help="Simula trabajos de la cola hasta que se acaban.")
+    worker.add_argument('--queue', required=True, help="Carpeta compartida de la cola.")
+    worker.add_argument('--workers', type=int, default=1, help="Procesos de NgSpice en esta máquina.")
+    worker.add_argument('--timeout', type=float, default=60.0, help="Segundos máximos por muestra.")
+    worker.add_argument('--vectors', nargs='+', help="Vectores a guardar, o 'all'. Default: los del .PROBE.")
+    worker.add_argument('--wait', action='store_true', help="Espera trabajos reencolados mientras haya en curso.")
+
+    status = commands.add_parser('status', help="Muestra cuántos trabajos quedan.")
+    status.add_argument('--queue', required=True, help="Carpeta compartida de la cola.")
+    status.add_argument('--lease', type=float, help="Reencola los trabajos sin señales de vida por estos segundos.")
+
+    merge = commands.add_parser('merge', help="Junta los almacenes parciales en uno solo.")
+    merge.add_argument('--queue', required=True, help="Carpeta compartida de la cola.")
+    merge.add_argument('--store', required=True, help="Carpeta del almacén final.")
+    merge.add_argument('--wait', action='store_true', help="Espera a que terminen los trabajos antes de juntar.")
+    merge.add_argument('--lease', type=float, default=600.0, help="Con --wait, segundos para reencolar un trabajo.")
+
+    args = parser.parse_args(argv)
+    if args.command == 'submit':
+        try:
+            cir_dict = read_cir_file(args.netlist, incluir_parametros=args.extended, incluir_subcircuitos=args.extended)
+            apply_overrides(cir_dict, [parse_override(text) for text in args.overrides], args.dist, args.scale)
+            campaign = Campaign(cir_dict, args.netlist, args.samples, seed=args.seed, sampling_method=args.sampling)
+            jobs = submit_campaign(campaign, args.queue, args.range_size)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        print(f"{len(jobs)} trabajos de hasta {args.range_size} muestras en {args.queue} (semilla {campaign.seed}).")
+    elif args.command == 'worker':
+        vectors = 'all' if args.vectors == ['all'] else args.vectors
+        finished = run_worker(args.queue, n_workers=args.workers, timeout=args.timeout, vectors=vectors,
+                              poll_interval=5.0 if args.wait else None)
+        print(f"Se terminaron {len(finished)} trabajos.")
+    elif args.command == 'status':
+        if args.lease is not None:
+            for job in requeue_stale(args.queue, args.lease):
+                print(f"Reencolado: {job}")
+        print(", ".join(f"{state}: {count}" for state, count in queue_status(args.queue).items()))
+    else:
+        if args.wait:
+            campaign = coordinate(args.queue, args.store, lease=args.lease)
+        else:
+            campaign = merge_results(args.queue, args.store)
+        print(f"{len(open_result_store(args.store))} de {campaign.n_samples} muestras en {args.store} "
+              f"({len(campaign.failed)} fallidas, {len(campaign.pending())} pendientes).")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
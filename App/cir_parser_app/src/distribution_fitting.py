@@ -0,0 +1,105 @@
+"""distribution_fitting.py contiene la estimación vectorizada de distribuciones por timestep:
+        fit_parameters(matrix, dist_type='normal'): Calcula en forma cerrada los parámetros de máxima
+        verosimilitud (loc, scale) de todos los timesteps a la vez, a lo largo del eje de las muestras.
+
+        FittedDistributions(times, loc, scale, dist_type='normal'): Mapeo {tiempo: distribución} que
+        guarda solo los arreglos de parámetros y construye los objetos congelados de scipy.stats
+        únicamente cuando se piden.
+    """
+from collections.abc import Mapping
+import numpy as np
+
+# Nombre en scipy.stats de cada distribución soportada
+SCIPY_NAMES = {'normal': 'norm', 'uniform': 'uniform'}
+
+def fit_parameters(matrix, dist_type='normal'):
+    """
+    Estima los parámetros de máxima verosimilitud de cada columna de una matriz.
+
+    Equivale a llamar stats.norm.fit o stats.uniform.fit sobre cada timestep, pero usando
+    las fórmulas cerradas de ambos estimadores sobre toda la matriz a la vez.
+
+    Args:
+        matrix (numpy.ndarray): Matriz (muestras, timesteps), por ejemplo la de resampling.resample_results.
+        dist_type (str, opcional): 'normal' o 'uniform'. Por defecto es 'normal'.
+
+    Returns:
+        tuple: Arreglos (loc, scale) con un valor por timestep.
+
+    Raises:
+        ValueError: Si el tipo de distribución no está soportado.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if dist_type == 'normal':
+        # Media y desviación estándar poblacional
+        return matrix.mean(axis=0), matrix.std(axis=0)
+    elif dist_type == 'uniform':
+        # El menor valor y el rango observado
+        low = matrix.min(axis=0)
+        return low, matrix.max(axis=0) - low
+    raise ValueError(f"Tipo desconocido de distribución: {dist_type}")
+
+class FittedDistributions(Mapping):
+    """
+    Distribuciones estimadas por timestep, guardadas como arreglos de parámetros.
+
+    Se comporta como el diccionario {tiempo: distribución de scipy.stats} que retornaba
+    plotting.estimate_distribution, pero los objetos congelados se construyen solo al
+    acceder a una llave.
+
+    Attributes:
+        times (numpy.ndarray): Instantes de la malla uniforme de tiempo.
+        loc (numpy.ndarray): Parámetro de ubicación de cada timestep.
+        scale (numpy.ndarray): Parámetro de escala de cada timestep.
+        dist_type (str): 'normal' o 'uniform'.
+    """
+
+    def __init__(self, times, loc, scale, dist_type='normal'):
+        if dist_type not in SCIPY_NAMES:
+            raise ValueError(f"Tipo desconocido de distribución: {dist_type}")
+        self.times = np.asarray(times)
+        self.loc = np.asarray(loc)
+        self.scale = np.asarray(scale)
+        self.dist_type = dist_type
+        self._positions = {time: i for i, time in enumerate(self.times.tolist())}
+
+    def frozen(self, i):
+        """
+        Construye la distribución congelada de scipy.stats para el timestep i.
+
+        Args:
+            i (int): Índice del timestep.
+
+        Returns:
+            scipy.stats.rv_frozen: Distribución con los parámetros estimados.
+        """
+        from scipy import stats
+        dist = getattr(stats, SCIPY_NAMES[self.dist_type])
+        return dist(loc=self.loc[i], scale=self.scale[i])
+
+    def rvs(self, size, random_state=None):
+        """
+        Muestrea todas las distribuciones a la vez.
+
+        Args:
+            size (int): Cantidad de muestras por timestep.
+            random_state (numpy.random.Generator, opcional): Generador a usar. Por defecto uno nuevo.
+
+        Returns:
+            numpy.ndarray: Matriz (size, timesteps) de muestras.
+        """
+        rng = random_state if random_state is not None else np.random.default_rng()
+        if self.dist_type == 'normal':
+            standard = rng.standard_normal((size, self.loc.size))
+        else:
+            standard = rng.random((size, self.loc.size))
+        return self.loc + self.scale * standard
+
+    def __getitem__(self, time):
+        return self.frozen(self._positions[time])
+
+    def __iter__(self):
+        return iter(self.times.tolist())
+
+    def __len__(self):
+        return self.times.size
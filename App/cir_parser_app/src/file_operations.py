@@ -1,8 +1,26 @@
 import ltspice_converter as spceconvrt
 import os
 import regex as re
+from netlist_parser import read_netlist, parse_netlist
 
-def read_cir_file(file_name):
+# Comentario con la distribución de un elemento, por ejemplo '; *DIST: NORMAL 0.1 *'
+_DIST_PATTERN = re.compile(r'\*DIST:\s*(\w+)\s*([\d.]+)*')
+
+def _dist_from_text(text):
+    """Extrae (distribución, escala) de un comentario *DIST:, o ('uniform', 0.0) si no lo hay."""
+    dist_info = _DIST_PATTERN.search(text)
+    if dist_info:
+        return dist_info.group(1).lower(), float(dist_info.group(2)) if dist_info.group(2) else 0.00
+    return 'uniform', 0.00
+
+def _literal_value(value):
+    """Convierte un valor literal a float, o retorna None si es una expresión como {2*RINC}."""
+    try:
+        return spceconvrt.LTSpice_to_float(value)
+    except ValueError:
+        return None
+
+def read_cir_file(file_name, incluir_parametros=False, incluir_subcircuitos=False):
     """
     Lee un archivo .cir que define un circuito y construye un netlist.
 
@@ -12,16 +30,27 @@ def read_cir_file(file_name):
 
     Args:
         file_name (str): Ruta del archivo .cir a leer.
+        incluir_parametros (bool, optional): Agrega los .PARAM globales con valor literal, con llave
+            (línea, nombre del parámetro) y 'kind' igual a 'param'. Defaults to False.
+        incluir_subcircuitos (bool, optional): Agrega, por cada instancia X de un subcircuito definido en
+            el archivo, sus elementos R, C y L internos con llave (línea del elemento, nombre de la instancia)
+            y 'kind' igual a 'instance', y sus PARAMS: con llave (línea de la instancia, nombre del parámetro)
+            y 'kind' igual a 'instance_param'. Los elementos internos dejan de aparecer con su número de línea
+            como llave. Defaults to False.
 
     Returns:
         dict: Diccionario que contiene:
-              - Clave: Número de línea en el archivo original.
+              - Clave: Número de línea en el archivo original (o un tuple, para los objetivos extendidos).
               - Valor: Diccionario con 'name' (nombre del componente), 'value' (valor del componente),
                        'dist' (tipo de distribución), y 'scale' (escala de la distribución).
+                       Los elementos internos de una instancia se nombran 'XU1.RD1' y traen además
+                       'instance', 'element' y 'alter' (su nombre dentro de NgSpice, 'r.xu1.rd1').
 
     Notas:
+        - El archivo se interpreta en una sola pasada con netlist_parser.read_netlist, que ya
+          resuelve las líneas de continuación, los comentarios y los bloques .SUBCKT.
         - La función usa la línea que contiene '.TEMP' como marcador del comienzo del circuito principal.
-        - Solo se extraen componentes resistivos (R), capacitivos (C) o inductivos (L).
+        - Solo se extraen componentes resistivos (R), capacitivos (C) o inductivos (L) con valor numérico.
         - Se manejan casos especiales como componentes con condiciones iniciales (IC).
         - La función utiliza codificación UTF-8 para leer el archivo.
         - Ahora se extraen los datos de distribución si están presentes en el comentario.
@@ -30,46 +59,273 @@ def read_cir_file(file_name):
         FileNotFoundError: Si el archivo especificado no existe.
         UnicodeDecodeError: Si hay problemas al decodificar el archivo con UTF-8.
     """
-    with open(file_name, 'r', encoding="UTF-8") as file:
-        content = file.read()
-
-    lines = content.split('\n')
+    netlist = read_netlist(file_name)
     cir_dict = {}
-    temp_flag = False
-    line_counter = 0
-
-    for line in lines:
-        line_counter += 1
-        component_match = re.match(
-            r'([A-Za-z0-9]+)\s+([A-Za-z0-9]+)\s+([A-Za-z0-9]+)\s+(.*?)(?=(\s+[A-Za-z0-9]+\s+|$))', line)
-        if ".TEMP" in line:
-            temp_flag = True
-        if component_match and temp_flag:
-            component_name = component_match.group(1)
-            component_value = component_match.group(4)
-            if component_name[0] in ['R', 'C', 'L']:
-                value = component_value.split()[0]
-                dist_info = re.search(r'\*DIST:\s*(\w+)\s*([\d.]+)*', line)
-                
-                if dist_info:
-                    dist_type = dist_info.group(1).lower()
-                    dist_scale = float(dist_info.group(2)) if dist_info.group(2) else 0.00
-                else:
-                    dist_type = 'uniform'
-                    dist_scale = 0.00
-
-                cir_dict[line_counter] = {
-                    'value': spceconvrt.LTSpice_to_float(value),
-                    'name': component_name,
-                    'dist': dist_type,
-                    'scale': dist_scale
+
+    temp_line = netlist.directive_line('.TEMP')
+    if temp_line is None:
+        return cir_dict
+
+    for element in netlist.statements:
+        if element.line < temp_line or element.name[0] not in ['R', 'C', 'L'] or element.value is None:
+            continue
+        if incluir_subcircuitos and element.subckt is not None:
+            # Se perturban por instancia más abajo
+            continue
+        value = _literal_value(element.value)
+        if value is None:
+            # Valores dados por expresiones, por ejemplo {2*RINC}
+            continue
+
+        dist_type, dist_scale = _dist_from_text(element.text)
+
+        cir_dict[element.line] = {
+            'value': value,
+            'name': element.name,
+            'dist': dist_type,
+            'scale': dist_scale
+        }
+
+        if 'IC' in element.params:
+            cir_dict[element.line]['IC'] = element.params['IC']
+
+    if incluir_parametros:
+        for param in netlist.params.values():
+            value = _literal_value(param.value)
+            if value is None:
+                continue
+            dist_type, dist_scale = _dist_from_text(param.comment)
+            cir_dict[(param.line, param.name)] = {
+                'value': value,
+                'name': param.name,
+                'dist': dist_type,
+                'scale': dist_scale,
+                'kind': 'param'
+            }
+
+    if incluir_subcircuitos:
+        for instance in netlist.by_type.get('X', []):
+            subcircuit = netlist.subcircuit(instance.model)
+            if subcircuit is None:
+                # El subcircuito viene de un .LIB que no se lee
+                continue
+
+            # Solo los PARAMS: del encabezado se pueden cambiar desde la línea de la instancia
+            for name, param in subcircuit.params.items():
+                value = _literal_value(instance.params.get(name, param.value))
+                if param.line != subcircuit.span[0] or value is None:
+                    continue
+                cir_dict[(instance.line, name)] = {
+                    'value': value,
+                    'name': f"{instance.name}.{name}",
+                    'dist': 'uniform',
+                    'scale': 0.00,
+                    'kind': 'instance_param',
+                    'instance': instance.name
                 }
 
-                if 'IC' in component_value:
-                    cir_dict[line_counter]['IC'] = component_value.split('IC=')[1]
+            for element in netlist.by_subckt.get(subcircuit.name, []):
+                if element.name[0] not in ['R', 'C', 'L'] or element.value is None:
+                    continue
+                value = _literal_value(element.value)
+                if value is None:
+                    continue
+                dist_type, dist_scale = _dist_from_text(element.text)
+                cir_dict[(element.line, instance.name)] = {
+                    'value': value,
+                    'name': f"{instance.name}.{element.name}",
+                    'dist': dist_type,
+                    'scale': dist_scale,
+                    'kind': 'instance',
+                    'instance': instance.name,
+                    'element': element.name,
+                    'alter': f"{element.type}.{instance.name}.{element.name}".lower()
+                }
 
     return cir_dict
 
+def _split_component(line):
+    """
+    Separa la línea de un componente en las partes antes y después de su valor.
+
+    Returns:
+        tuple: (componente, comentario, partes) donde partes es None si la línea no tiene la
+        forma 'nombre nodo nodo valor ...', o un tuple (partes antes del valor, partes después).
+    """
+    parts = line.split(';')
+    component_part = parts[0].strip()
+    comment_part = ';'.join(parts[1:]).strip() if len(parts) > 1 else ""
+
+    if not re.match(r'(\S+)\s+(\S+)\s+(\S+)\s+(\S+)', component_part):
+        return component_part, comment_part, None
+    component_parts = component_part.split()
+    # El valor va antes de la condición inicial, si existe
+    value_index = len(component_parts) - 2 if "IC=" in component_parts[-1] else len(component_parts) - 1
+    return component_part, comment_part, (component_parts[:value_index], component_parts[value_index + 1:])
+
+def _join_component(component_part, comment_part):
+    """Une un componente con su comentario en una línea."""
+    if comment_part:
+        return f"{component_part} ; {comment_part}\n"
+    return f"{component_part}\n"
+
+def _continuation_indices(lines, index):
+    """Índices de las líneas de continuación ('+') que siguen a la línea index."""
+    tails = []
+    for tail in range(index + 1, len(lines)):
+        if not lines[tail].lstrip().startswith('+'):
+            break
+        tails.append(tail)
+    return tails
+
+def _compile_overrides(cir_dict, keys, lines):
+    """
+    Prepara las sentencias que se reescriben con parámetros para los objetivos extendidos.
+
+    Los .PARAM globales se reescriben en su propia línea. Los elementos internos de un subcircuito
+    pasan a tomar su valor de un parámetro P_<ELEMENTO>, cuyo valor nominal se agrega a los PARAMS:
+    del encabezado, y cada instancia lo sobrescribe en su propia línea. Así el cuerpo del modelo
+    no cambia entre muestras. Modifica lines en el lugar.
+
+    Returns:
+        tuple: (statements, overrides), ver compile_cir_template.
+    """
+    netlist = parse_netlist(''.join(lines))
+    params_by_line = {}
+    for param in netlist.params.values():
+        params_by_line.setdefault(param.line, {})[param.name] = param.value
+
+    statements, overrides, defaults = {}, {}, {}
+
+    def instance_statement(instance):
+        index = instance.line - 1
+        if index not in statements:
+            head = ' '.join([instance.name] + instance.nodes + [instance.model, 'PARAMS:'])
+            tails = list(range(instance.span[0], instance.span[1]))
+            statements[index] = (head, dict(instance.params), tails, instance.comment)
+        return index
+
+    for key in keys:
+        kind = cir_dict[key].get('kind')
+        line, target = key
+        if kind == 'param':
+            index = line - 1
+            if index not in statements:
+                comment = lines[index].split(';', 1)[1].strip() if ';' in lines[index] else ""
+                statements[index] = ('.PARAM', dict(params_by_line[line]), _continuation_indices(lines, index), comment)
+            overrides[key] = (index, target)
+        elif kind == 'instance_param':
+            overrides[key] = (instance_statement(netlist.by_line[line]), target)
+        elif kind == 'instance':
+            element = netlist.by_line[line]
+            name = f"P_{element.name.upper()}"
+            subckt_defaults = defaults.setdefault(element.subckt, {})
+            if name not in subckt_defaults:
+                component_part, comment_part, split = _split_component(lines[line - 1])
+                before, after = split
+                lines[line - 1] = _join_component(' '.join(before + [f"{{{name}}}"] + after), comment_part)
+                subckt_defaults[name] = element.value
+            overrides[key] = (instance_statement(netlist.elements[target]), name)
+        else:
+            raise ValueError(f"Tipo de objetivo desconocido para la llave {key}: {kind}")
+
+    # Los valores nominales van como PARAMS: del encabezado de cada subcircuito
+    for subckt, subckt_defaults in defaults.items():
+        subcircuit = netlist.subcircuits[subckt]
+        header = subcircuit.span[0] - 1
+        last = (_continuation_indices(lines, header) or [header])[-1]
+        has_params = any(param.line == subcircuit.span[0] for param in subcircuit.params.values())
+        prefix = "+ " if has_params else "+ PARAMS: "
+        if not lines[last].endswith('\n'):
+            lines[last] += '\n'
+        lines[last] += prefix + ' '.join(f"{name}={value}" for name, value in subckt_defaults.items()) + '\n'
+
+    return statements, overrides
+
+def compile_cir_template(cir_dict, input_file_name):
+    """
+    Lee una sola vez un netlist y lo compila en una plantilla con casillas para los valores.
+
+    Cada línea indicada en cir_dict se separa en las partes que la rodean y la posición
+    donde va el valor del componente, de forma que generar un netlist perturbado solo
+    requiere formatear los valores nuevos y unir strings, sin volver a abrir el archivo.
+
+    Args:
+        cir_dict (dict): Diccionario producido por read_cir_file, sus llaves son los números
+                         de línea que tendrán casillas en la plantilla, o los tuples de los
+                         .PARAM y de los elementos de subcircuitos por instancia.
+        input_file_name (str): Ruta del archivo .cir de entrada.
+
+    Returns:
+        dict: Plantilla compilada con:
+              - 'lines': Lista con las líneas del archivo (con su salto de línea), donde las
+                         líneas con casilla ya vienen normalizadas como las escribe create_new_cir_file.
+              - 'slots': Diccionario que mapea el número de línea a un tuple
+                         (índice en 'lines', partes antes del valor, partes después, comentario).
+              - 'statements': Diccionario que mapea el índice de una sentencia que se reescribe con
+                         parámetros (un .PARAM o una instancia X) a un tuple
+                         (encabezado, parámetros nominales, índices de continuación, comentario).
+              - 'overrides': Diccionario que mapea cada llave extendida de cir_dict a un tuple
+                         (índice de la sentencia, nombre del parámetro).
+    """
+    with open(input_file_name, 'r', encoding="UTF-8") as in_file:
+        lines = in_file.readlines()
+
+    slots = {}
+    for index, line in enumerate(lines):
+        line_counter = index + 1
+        if line_counter not in cir_dict:
+            continue
+
+        component_part, comment_part, split = _split_component(line)
+        if split:
+            slots[line_counter] = (index, split[0], split[1], comment_part)
+        else:
+            lines[index] = _join_component(component_part, comment_part)
+
+    statements, overrides = {}, {}
+    extended = [key for key in cir_dict if isinstance(key, tuple)]
+    if extended:
+        statements, overrides = _compile_overrides(cir_dict, extended, lines)
+
+    return {'lines': lines, 'slots': slots, 'statements': statements, 'overrides': overrides}
+
+def render_cir_template(template, values):
+    """
+    Genera en memoria el contenido de un netlist a partir de una plantilla compilada.
+
+    Args:
+        template (dict): Plantilla producida por compile_cir_template.
+        values (dict): Diccionario que mapea cada llave de cir_dict (número de línea o tuple) al
+                       nuevo valor (float o string ya formateado en notación LTSpice).
+
+    Returns:
+        str: Contenido del netlist con los valores sustituidos.
+    """
+    lines = list(template['lines'])
+    for line_counter, (index, before, after, comment_part) in template['slots'].items():
+        new_value = values[line_counter]
+        if not isinstance(new_value, str):
+            new_value = spceconvrt.float_to_LTSpice(new_value)
+        lines[index] = _join_component(' '.join(before + [new_value] + after), comment_part)
+
+    # Agrupamos los parámetros por sentencia, que se reescribe una sola vez
+    pending = {}
+    for key, (index, name) in template['overrides'].items():
+        new_value = values[key]
+        if not isinstance(new_value, str):
+            new_value = spceconvrt.float_to_LTSpice(new_value)
+        pending.setdefault(index, {})[name] = new_value
+
+    for index, params in pending.items():
+        head, nominal, tails, comment_part = template['statements'][index]
+        params = {**nominal, **params}
+        lines[index] = _join_component(f"{head} " + ' '.join(f"{name}={value}" for name, value in params.items()), comment_part)
+        for tail in tails:
+            lines[tail] = ""
+
+    return ''.join(lines)
+
 def create_new_cir_file(cir_dict, input_file_name, output_file_name):
     """
     Escribe un nuevo documento netlist con los valores dictados por un diccionario,
@@ -77,7 +333,8 @@ def create_new_cir_file(cir_dict, input_file_name, output_file_name):
 
     Args:
         cir_dict (dict): Diccionario que contiene:
-                         - Clave: Número de línea en el archivo original.
+                         - Clave: Número de línea en el archivo original, o el tuple
+                                  de un objetivo extendido (ver read_cir_file).
                          - Valor: Diccionario con 'name' (nombre del componente),
                                   'value' (nuevo valor del componente),
                                   'dist' (tipo de distribución),
@@ -88,39 +345,10 @@ def create_new_cir_file(cir_dict, input_file_name, output_file_name):
     Returns:
         None
     """
-    with open(input_file_name, 'r', encoding="UTF-8") as in_file:
-        with open(output_file_name, 'w', encoding="UTF-8") as out_file:
-            line_counter = 0
-            for line in in_file:
-                line_counter += 1
-                if line_counter in cir_dict:
-                    parts = line.split(';')
-                    component_part = parts[0].strip()
-                    comment_part = ';'.join(parts[1:]).strip() if len(parts) > 1 else ""
-
-                    component_match = re.match(
-                        r'([A-Za-z0-9]+)\s+([A-Za-z0-9]+)\s+([A-Za-z0-9]+)\s+(.*?)(?=(\s+[A-Za-z0-9]+\s+|$))', component_part)
-                    if component_match:
-                        component_parts = component_part.split()
-                        new_value = spceconvrt.float_to_LTSpice(cir_dict[line_counter]['value'])
-                        
-                        if "IC=" in component_parts[-1]:
-                            ic_part = component_parts[-1]
-                            component_parts[-2] = new_value
-                            component_parts[-1] = ic_part
-                        else:
-                            component_parts[-1] = new_value
-
-                        component_part = ' '.join(component_parts)
-
-                    if comment_part:
-                        new_line = f"{component_part} ; {comment_part}\n"
-                    else:
-                        new_line = f"{component_part}\n"
-
-                    out_file.write(new_line)
-                else:
-                    out_file.write(line)
+    template = compile_cir_template(cir_dict, input_file_name)
+    values = {line: item['value'] for line, item in cir_dict.items()}
+    with open(output_file_name, 'w', encoding="UTF-8") as out_file:
+        out_file.write(render_cir_template(template, values))
 
 def existe_carpeta(directory_name):
     """
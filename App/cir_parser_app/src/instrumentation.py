@@ -0,0 +1,227 @@
+"""instrumentation.py contiene la medición por etapas del flujo de una campaña:
+        Instrumentation(profile=False, trace_memory=False): Acumula el tiempo y las llamadas de cada etapa
+        (escritura de archivos, carga del netlist en NgSpice, análisis transitorio, copia de vectores,
+        interpolación, ...) y contadores como las muestras simuladas. Opcionalmente perfila con cProfile
+        y mide el pico de memoria con tracemalloc. report() entrega el resumen con muestras por segundo
+        y save(path) lo escribe como instrumentation.json junto a la campaña.
+
+        instrumented(instrumentation): Context manager que activa una Instrumentation para el proceso.
+
+        stage(name), count(name, n=1), merge(stages): Funciones que usan los módulos del flujo. Sin una
+        Instrumentation activa no hacen nada, así el costo cuando no se mide es una llamada por etapa.
+
+    Los procesos trabajadores de simulation miden sus etapas con su propia Instrumentation y envían
+    los tiempos de cada muestra junto con los resultados, el proceso principal los suma con merge.
+    """
+from contextlib import contextmanager, nullcontext
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+INSTRUMENTATION_FILE = "instrumentation.json"
+PROFILE_FILE = "profile.prof"
+
+# Instrumentation activa del proceso, None si no se está midiendo
+_active = None
+
+class Instrumentation:
+    """
+    Tiempos por etapa y contadores de una campaña.
+
+    Args:
+        profile (bool, optional): Perfila la campaña con cProfile. Defaults to False.
+        trace_memory (bool, optional): Mide el pico de memoria de Python con tracemalloc. Defaults to False.
+
+    Attributes:
+        stages (dict): {etapa: [segundos, llamadas]}.
+        counters (dict): {contador: valor}.
+    """
+
+    def __init__(self, profile=False, trace_memory=False):
+        self.stages = {}
+        self.counters = {}
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self._profiler = None
+        self._started = None
+        self.wall_seconds = 0.0
+        self.peak_memory = None
+
+    @contextmanager
+    def stage(self, name):
+        """Cronometra el bloque y lo suma a la etapa name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds, calls=1):
+        """Suma seconds y calls a la etapa name."""
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [seconds, calls]
+        else:
+            entry[0] += seconds
+            entry[1] += calls
+
+    def count(self, name, n=1):
+        """Suma n al contador name."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, stages):
+        """Suma las etapas {etapa: [segundos, llamadas]} medidas en otro proceso."""
+        for name, (seconds, calls) in stages.items():
+            self.add(name, seconds, calls)
+
+    def drain(self):
+        """Entrega las etapas medidas hasta ahora y las reinicia, para enviarlas a otro proceso."""
+        stages, self.stages = self.stages, {}
+        return stages
+
+    def start(self):
+        """Comienza a medir el tiempo total y, si se pidió, el perfil y la memoria."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profile:
+            self._profiler = self._profiler or cProfile.Profile()
+            self._profiler.enable()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        """Deja de medir, acumulando el tiempo total entre cada start y stop."""
+        if self._started is None:
+            return
+        self.wall_seconds += time.perf_counter() - self._started
+        self._started = None
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            self.peak_memory = max(self.peak_memory or 0, peak)
+            tracemalloc.stop()
+
+    def profile_summary(self, limit=20):
+        """Texto con las limit funciones de mayor tiempo acumulado, o None si no se perfiló."""
+        if self._profiler is None:
+            return None
+        stream = io.StringIO()
+        pstats.Stats(self._profiler, stream=stream).sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+
+    def report(self, samples=None):
+        """
+        Resumen de la campaña.
+
+        Args:
+            samples (int, optional): Muestras simuladas. Defaults to None (el contador 'samples').
+
+        Returns:
+            dict: Diccionario con:
+                  - 'wall_seconds': Tiempo total medido.
+                  - 'samples' y 'samples_per_second'.
+                  - 'stages': {etapa: {'seconds', 'calls', 'fraction'}}, ordenado de mayor a menor tiempo.
+                    fraction es relativa a wall_seconds; las etapas de los trabajadores en paralelo
+                    pueden sumar más que el tiempo total.
+                  - 'counters': Contadores.
+                  - 'peak_memory_kib': Pico de memoria de Python, si se midió.
+        """
+        if samples is None:
+            samples = self.counters.get('samples', 0)
+        wall = self.wall_seconds
+        if self._started is not None:
+            wall += time.perf_counter() - self._started
+        stages = {name: {'seconds': seconds, 'calls': calls, 'fraction': seconds / wall if wall else None}
+                  for name, (seconds, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0])}
+        report = {
+            'wall_seconds': wall,
+            'samples': samples,
+            'samples_per_second': samples / wall if wall else None,
+            'stages': stages,
+            'counters': dict(self.counters)
+        }
+        if self.peak_memory is not None:
+            report['peak_memory_kib'] = self.peak_memory / 1024
+        return report
+
+    def summary(self, samples=None):
+        """Texto legible de report(), para la consola o la interfaz."""
+        report = self.report(samples)
+        lines = [f"{report['samples']} muestras en {report['wall_seconds']:.2f} s"
+                 + (f" ({report['samples_per_second']:.2f} muestras/s)" if report['samples_per_second'] else "")]
+        for name, entry in report['stages'].items():
+            fraction = f"{100 * entry['fraction']:6.1f} %" if entry['fraction'] is not None else ""
+            lines.append(f"  {name:<22}{entry['seconds']:10.3f} s {fraction}  ({entry['calls']} llamadas)")
+        for name, value in report['counters'].items():
+            lines.append(f"  {name}: {value}")
+        if 'peak_memory_kib' in report:
+            lines.append(f"  Pico de memoria: {report['peak_memory_kib'] / 1024:.1f} MiB")
+        return "\n".join(lines)
+
+    def save(self, path, samples=None):
+        """
+        Escribe report() en path/instrumentation.json y, si se perfiló, el perfil en path/profile.prof.
+
+        Args:
+            path (str): Carpeta de la campaña.
+            samples (int, optional): Ver report. Defaults to None.
+
+        Returns:
+            dict: El reporte escrito.
+        """
+        report = self.report(samples)
+        if self._profiler is not None:
+            self._profiler.dump_stats(os.path.join(path, PROFILE_FILE))
+            report['profile'] = PROFILE_FILE
+        file_name = os.path.join(path, INSTRUMENTATION_FILE)
+        with open(file_name + ".tmp", 'w', encoding="UTF-8") as out_file:
+            json.dump(report, out_file, indent=2)
+        os.replace(file_name + ".tmp", file_name)
+        return report
+
+@contextmanager
+def instrumented(instrumentation):
+    """
+    Activa instrumentation para el proceso mientras dura el bloque y mide su tiempo total.
+
+    Args:
+        instrumentation (Instrumentation | None): Medición a activar. Con None el bloque corre sin medir.
+
+    Yields:
+        Instrumentation | None: La misma instrumentation.
+    """
+    global _active
+    if instrumentation is None:
+        yield None
+        return
+    previous, _active = _active, instrumentation
+    instrumentation.start()
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.stop()
+        _active = previous
+
+def active():
+    """La Instrumentation activa del proceso, o None."""
+    return _active
+
+def stage(name):
+    """Cronometra el bloque en la etapa name de la Instrumentation activa, si la hay."""
+    if _active is None:
+        return nullcontext()
+    return _active.stage(name)
+
+def count(name, n=1):
+    """Suma n al contador name de la Instrumentation activa, si la hay."""
+    if _active is not None:
+        _active.count(name, n)
+
+def merge(stages):
+    """Suma etapas medidas en otro proceso a la Instrumentation activa, si la hay."""
+    if _active is not None and stages:
+        _active.merge(stages)
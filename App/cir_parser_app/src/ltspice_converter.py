@@ -4,9 +4,48 @@ en el contexto de convertir de float al formato de string utilizado en LTSpice:
         utilizado en los netlist de LTSpice a floats.
         float_to_LTSpice(flo): Convierte de floats a strings en el estilo
         utilizado en los netlist de LTSpice.
+        LTSpice_to_float_array(strings) y float_to_LTSpice_array(values): Versiones
+        vectorizadas que convierten arreglos de NumPy completos de una sola vez.
     """
+from bisect import bisect_right
+from functools import lru_cache
+import numpy as np
 import regex as re
 
+# Número (con exponente opcional), sufijo de magnitud opcional y unidades al final (ohm, F, V...)
+_VALUE_PATTERN = re.compile(
+    r'^\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(meg|mil|[afpnumkgt])?[a-zμ]*\s*$', re.IGNORECASE)
+
+# Potencia de diez de cada sufijo, 'mil' es la milésima de pulgada
+_SUFFIX_EXPONENTS = {'a': -18, 'f': -15, 'p': -12, 'n': -9, 'u': -6, 'm': -3,
+                     'k': 3, 'meg': 6, 'g': 9, 't': 12}
+_MIL = 25.4e-6
+
+# Límites y sufijos usados por float_to_LTSpice
+_LIMITS = [1e-15, 1e-12, 1e-9, 1e-6, 1e-3, 1, 1e3, 1e6, 1e9, 1e12]
+_SUFFIXES = ["f", "p", "n", "u", "m", "", "K", "Meg", "G", "T"]
+
+@lru_cache(maxsize=4096)
+def _parse_LTSpice(string):
+    """Convierte una cadena ya validada; se guarda en caché porque los netlists repiten valores."""
+    match = _VALUE_PATTERN.match(string)
+    if not match:
+        raise ValueError(f"No se puede convertir a número: {string!r}")
+
+    number, suffix = match.group(1), match.group(2)
+    if suffix is None:
+        return float(number)
+
+    suffix = suffix.lower()
+    if suffix == 'mil':
+        return float(number) * _MIL
+
+    exponent = _SUFFIX_EXPONENTS[suffix]
+    if 'e' in number.lower():
+        return float(number) * pow(10.0, exponent)
+    # Armamos la notación científica para que float() redondee una sola vez
+    return float(f"{number}e{exponent}")
+
 def LTSpice_to_float(string):
     """
     Convierte una cadena en notación LTSpice a un número de punto flotante.
@@ -15,7 +54,8 @@ def LTSpice_to_float(string):
     en los netlists de LTSpice y la convierte a un número de punto flotante.
 
     Args:
-        string (str): Cadena en formato LTSpice. Puede ser de la forma '999', '10K', '20N', etc.
+        string (str): Cadena en formato LTSpice. Puede ser de la forma '999', '10K', '20N', '12E-3',
+            '1.5Meg' o tener unidades al final como '1kohm' o '10uF'.
 
     Returns:
         float: Valor en punto flotante extraído de la notación LTSpice.
@@ -30,48 +70,14 @@ def LTSpice_to_float(string):
         2e-8
         >>> LTSpice_to_float('1.5Meg')
         1500000.0
+
+    Notas:
+        - Se usa una sola expresión regular precompilada y una tabla de sufijos. 'meg' se revisa
+          antes que 'm', así '1Meg' es 1e6 y '1M' es 1e-3, como en SPICE.
     """
-    try:
+    if isinstance(string, (int, float)):
         return float(string)
-    except:
-        # Vamos a hacer letra minúscula cualquier entrada
-        multiplier = None
-        string = string.lower()
-      
-        # Luego detectar la magnitud del valor #Código horrible
-        if "f" in string:
-            multiplier = pow(10, -15)
-        elif "p" in string:
-            multiplier = pow(10, -12)
-        elif "n" in string:
-            multiplier = pow(10, -9)
-        elif "u" in string:
-            multiplier = pow(10, -6)
-        elif "m" in string:
-            multiplier = pow(10, -3)
-        elif "k" in string:
-            multiplier = pow(10, 3)
-        elif "meg" in string:
-            multiplier = pow(10, 6)
-        elif "g" in string:
-            multiplier = pow(10, 9)
-        elif "t" in string:
-            multiplier = pow(10, 12)
-        elif "e" in string:
-            #Algunos netlist vienen formateados en la forma 12E-3
-            split = string.split("e")
-            string = float(float(split[0])*pow(10, int(split[1])))
-
-        if multiplier:
-
-            string = re.sub(r'[^\d\.]', '', string)
-            string.rstrip("0")
-            if '.' in string:
-                parte_entera, parte_decimal = string.split('.')
-                string = (int(parte_entera) * multiplier) + (int(parte_decimal) * pow(10, -len(parte_decimal))) * multiplier
-            else:
-                string = int(string) * multiplier
-        return string
+    return _parse_LTSpice(string)
 
 def float_to_LTSpice(flo):
     """
@@ -100,23 +106,66 @@ def float_to_LTSpice(flo):
         - Si el número es muy grande (>1e12), la función intenta usar el sufijo
           más grande disponible ('T' para tera).
     """
-    units = [
-        {"limit": 1e-15, "suffix": "f"},
-        {"limit": 1e-12, "suffix": "p"},
-        {"limit": 1e-9, "suffix": "n"},
-        {"limit": 1e-6, "suffix": "u"},
-        {"limit": 1e-3, "suffix": "m"},
-        {"limit": 1, "suffix": ""},
-        {"limit": 1e3, "suffix": "K"},
-        {"limit": 1e6, "suffix": "Meg"},
-        {"limit": 1e9, "suffix": "G"},
-        {"limit": 1e12, "suffix": "T"},
-    ]
+    if flo < _LIMITS[0]:
+        # Valores fuera de la tabla: cero, negativos o menores a un femto
+        if flo == 0:
+            return "0"
+        if flo < 0:
+            return f"-{float_to_LTSpice(-flo)}"
+        return f"{flo / _LIMITS[0]}{_SUFFIXES[0]}"
+
+    # Buscamos el mayor límite que no supera a la entrada
+    index = bisect_right(_LIMITS, flo) - 1
+    if index == len(_LIMITS) - 1:
+        return f"{flo*pow(10, -12)}T"  # Si el valor es enorme intentamos usar el sufijo mayor
+    return f"{flo / _LIMITS[index]}{_SUFFIXES[index]}"
+
+def LTSpice_to_float_array(strings):
+    """
+    Convierte un arreglo de cadenas en notación LTSpice a floats.
+
+    Cada valor distinto se convierte una sola vez y el resultado se reparte con índices.
+
+    Args:
+        strings (array_like): Arreglo de cadenas de cualquier forma.
+
+    Returns:
+        numpy.ndarray: Arreglo de floats con la misma forma.
 
-    for unit in units: # Por cada diccionario en units
-        if flo < unit["limit"]: #Si la entrada es menor al límite
-            value = flo / prev_unit["limit"] # Retornamos el float en el límite anterior
-            return f"{value}{prev_unit['suffix']}" #Con el sufijo anterior
-        prev_unit = unit #Actualizamos la nueva unidad
+    Raises:
+        ValueError: Si alguna cadena no puede ser convertida.
+    """
+    strings = np.asarray(strings)
+    unique, inverse = np.unique(strings, return_inverse=True)
+    values = np.array([LTSpice_to_float(str(string)) for string in unique], dtype=np.float64)
+    return values[inverse].reshape(strings.shape)
+
+def float_to_LTSpice_array(values):
+    """
+    Convierte un arreglo de floats a cadenas en notación LTSpice.
 
-    return f"{flo*pow(10, -12)}T"  # Si el valor es enorme intentamos usar el sufijo mayor
+    La elección del sufijo y el escalamiento se hacen de forma vectorizada; el resultado
+    es idéntico a aplicar float_to_LTSpice a cada elemento.
+
+    Args:
+        values (array_like): Arreglo de floats de cualquier forma.
+
+    Returns:
+        numpy.ndarray: Arreglo de cadenas (dtype object) con la misma forma.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    flat = values.ravel()
+    limits = np.array(_LIMITS)
+
+    indices = np.searchsorted(limits, flat, side='right') - 1
+    regular = indices >= 0
+    indices = np.clip(indices, 0, len(_LIMITS) - 1)
+    top = indices == len(_LIMITS) - 1
+    scaled = np.where(top, flat * pow(10, -12), flat / limits[indices])
+
+    suffixes = _SUFFIXES
+    strings = [
+        f"{value}{suffixes[index]}" if ok else float_to_LTSpice(original)
+        for value, index, ok, original in zip(scaled.tolist(), indices.tolist(), regular.tolist(), flat.tolist())
+    ]
+    return np.array(strings, dtype=object).reshape(values.shape)
@@ -0,0 +1,385 @@
+"""netlist_parser.py contiene un parser de netlists SPICE que recorre el archivo una sola vez
+y construye una estructura indexada:
+        parse_netlist(text): Interpreta el contenido de un netlist y retorna un Netlist.
+
+        read_netlist(file_name): Lee un archivo .cir y lo interpreta con parse_netlist.
+
+        probe_vectors(text): Busca las sentencias .PROBE de un netlist y retorna sus vectores con
+        la sintaxis del comando save de NgSpice, sin interpretar el resto del archivo.
+
+        Netlist: Resultado del parser, con los elementos indexados por nombre, por tipo, por nodo,
+        por subcircuito y por línea, además de los .PARAM, .INCLUDE/.LIB y demás directivas.
+
+    Se reconocen las líneas de continuación ('+'), los comentarios de línea completa ('*') y al final
+    de la línea (';' o '$'), los bloques .SUBCKT/.ENDS con sus PARAMS:, los .PARAM y los
+    .INCLUDE/.LIB (se registran, pero no se siguen). La primera línea siempre es el título.
+    """
+import regex as re
+
+# Cantidad de nodos de cada tipo de elemento, los que no están usan dos
+_NODE_COUNTS = {'Q': 3, 'J': 3, 'Z': 3, 'M': 4, 'E': 4, 'G': 4, 'S': 4, 'T': 4, 'K': 0}
+# Tipos cuyo primer argumento después de los nodos es un modelo y no un valor
+_MODEL_TYPES = {'D', 'Q', 'J', 'Z', 'M'}
+
+# Un grupo entre llaves (con espacios dentro) se mantiene como un solo token
+_TOKEN_PATTERN = re.compile(r'[^\s{]*\{[^}]*\}\S*|\S+')
+_EQUALS_PATTERN = re.compile(r'\s*=\s*')
+
+# Sentencias .PROBE (con sus líneas de continuación) y cada V(...) o I(...) dentro de ellas
+_PROBE_PATTERN = re.compile(r'^[ \t]*\.PROBE\b([^\n]*(?:\n[ \t]*\+[^\n]*)*)', re.IGNORECASE | re.MULTILINE)
+_PROBE_VECTOR_PATTERN = re.compile(r'\b([VI])\s*\(([^()]*)\)', re.IGNORECASE)
+_CONTINUATION_PATTERN = re.compile(r'\n[ \t]*\+')
+
+def _tokenize(text):
+    """Separa una sentencia en tokens, uniendo 'clave = valor' en un solo token."""
+    if '=' in text:
+        text = _EQUALS_PATTERN.sub('=', text)
+    if '{' in text:
+        return _TOKEN_PATTERN.findall(text)
+    return text.split()
+
+def _split_params(tokens):
+    """Separa los tokens posicionales de los 'clave=valor', ignorando el marcador PARAMS:."""
+    positional, params = [], {}
+    for token in tokens:
+        if token.upper() == 'PARAMS:':
+            continue
+        if '=' in token and not token.startswith('{'):
+            key, value = token.split('=', 1)
+            params[key.upper()] = value
+        else:
+            positional.append(token)
+    return positional, params
+
+class Element:
+    """
+    Elemento de circuito de un netlist.
+
+    Attributes:
+        name (str): Nombre tal como aparece en el netlist, por ejemplo 'R1'.
+        type (str): Letra del tipo de elemento en mayúscula, por ejemplo 'R'.
+        nodes (list): Nodos a los que se conecta.
+        value (str | None): Primer argumento después de los nodos (el valor, sin convertir), o None
+            para los elementos que usan un modelo.
+        model (str | None): Modelo o subcircuito que instancia, si corresponde.
+        args (list): Argumentos posicionales después de los nodos.
+        params (dict): Parámetros 'clave=valor', con la clave en mayúsculas (por ejemplo 'IC').
+        comment (str): Comentario al final de la línea, sin el ';'.
+        text (str): Texto original de la sentencia, con sus líneas de continuación.
+        line (int): Número de la primera línea (desde 1).
+        span (tuple): (primera línea, última línea) que ocupa la sentencia.
+        subckt (str | None): Subcircuito que lo contiene, o None si está en el circuito principal.
+    """
+
+    def __init__(self, tokens, comment, text, span, subckt):
+        self.name = tokens[0]
+        self.type = self.name[0].upper()
+        positional, self.params = _split_params(tokens[1:])
+
+        if self.type == 'X':
+            # Los nodos van hasta el nombre del subcircuito, que es el último posicional
+            self.nodes, self.model, self.args = positional[:-1], positional[-1] if positional else None, []
+        else:
+            n_nodes = _NODE_COUNTS.get(self.type, 2)
+            nodes = []
+            for token in positional[:n_nodes]:
+                # Fuentes controladas con POLY o expresiones: no quedan más nodos
+                if token.upper().startswith('POLY') or token.startswith('('):
+                    break
+                nodes.append(token)
+            self.nodes = nodes
+            self.args = positional[len(nodes):]
+            self.model = self.args[0] if self.type in _MODEL_TYPES and self.args else None
+
+        self.value = self.args[0] if self.args and self.model is None else None
+        self.comment = comment
+        self.text = text
+        self.line = span[0]
+        self.span = span
+        self.subckt = subckt
+
+    def __repr__(self):
+        return f"Element({self.name!r}, nodes={self.nodes!r}, value={self.value!r}, line={self.line})"
+
+class Parameter:
+    """
+    Parámetro definido con .PARAM o en los PARAMS: de un .SUBCKT.
+
+    Attributes:
+        name (str): Nombre del parámetro.
+        value (str): Valor o expresión, sin evaluar.
+        line (int): Línea donde se define.
+        subckt (str | None): Subcircuito que lo contiene, o None si es global.
+        comment (str): Comentario al final de la línea donde se define.
+    """
+
+    def __init__(self, name, value, line, subckt, comment=""):
+        self.name = name
+        self.value = value
+        self.line = line
+        self.subckt = subckt
+        self.comment = comment
+
+    def __repr__(self):
+        return f"Parameter({self.name!r}, {self.value!r}, line={self.line})"
+
+class _Scope:
+    """Índices de elementos de un ámbito (el circuito principal o un subcircuito)."""
+
+    def __init__(self):
+        self.elements = {}
+        self.by_type = {}
+        self.by_node = {}
+        self.params = {}
+
+    def _add(self, element):
+        self.elements.setdefault(element.name, element)
+        self.by_type.setdefault(element.type, []).append(element)
+        for node in element.nodes:
+            self.by_node.setdefault(node, []).append(element)
+
+class Subcircuit(_Scope):
+    """
+    Bloque .SUBCKT ... .ENDS.
+
+    Attributes:
+        name (str): Nombre del subcircuito.
+        ports (list): Nodos externos.
+        params (dict): Parámetros del subcircuito {nombre: Parameter}, tanto los valores por defecto
+            de PARAMS: como los .PARAM internos.
+        elements (dict): Elementos internos {nombre: Element}.
+        by_type (dict): {tipo: [Element]} de los elementos internos.
+        by_node (dict): {nodo local: [Element]} de los elementos internos.
+        span (tuple): (línea del .SUBCKT, línea del .ENDS).
+    """
+
+    def __init__(self, name, ports, line):
+        super().__init__()
+        self.name = name
+        self.ports = ports
+        self.span = (line, line)
+
+class Netlist(_Scope):
+    """
+    Netlist interpretado, con índices para consultar sus elementos en tiempo constante.
+
+    Attributes:
+        title (str): Primera línea del archivo.
+        elements (dict): Elementos del circuito principal {nombre: Element}.
+        by_type (dict): {tipo: [Element]} del circuito principal.
+        by_node (dict): {nodo: [Element]} del circuito principal.
+        params (dict): Parámetros globales {nombre: Parameter}.
+        subcircuits (dict): {nombre: Subcircuit}.
+        by_subckt (dict): {nombre del subcircuito o None: [Element]} de todos los ámbitos.
+        by_line (dict): {número de línea: Element} para cada línea física que ocupa un elemento.
+        statements (list): Todos los elementos en el orden del archivo.
+        includes (list): Tuples (directiva, ruta, línea) de los .INCLUDE y .LIB.
+        directives (list): Tuples (directiva, argumentos, línea) del resto de las sentencias con punto.
+    """
+
+    def __init__(self, title=""):
+        super().__init__()
+        self.title = title
+        self.subcircuits = {}
+        self._subcircuits_upper = {}
+        self.by_subckt = {}
+        self.by_line = {}
+        self.statements = []
+        self.includes = []
+        self.directives = []
+
+    def find(self, name, subckt=None):
+        """
+        Busca un elemento por nombre.
+
+        Args:
+            name (str): Nombre del elemento.
+            subckt (str, optional): Subcircuito donde buscar. Defaults to None (circuito principal).
+
+        Returns:
+            Element | None: El elemento, o None si no existe.
+        """
+        scope = self if subckt is None else self.subcircuit(subckt)
+        return scope.elements.get(name) if scope is not None else None
+
+    def subcircuit(self, name):
+        """
+        Busca un subcircuito sin importar mayúsculas, como lo hace SPICE al instanciarlo.
+
+        Args:
+            name (str): Nombre del subcircuito, por ejemplo el modelo de una instancia X.
+
+        Returns:
+            Subcircuit | None: El subcircuito, o None si no está definido en el netlist.
+        """
+        subcircuit = self.subcircuits.get(name)
+        if subcircuit is None and name is not None:
+            subcircuit = self._subcircuits_upper.get(name.upper())
+        return subcircuit
+
+    def directive_line(self, directive):
+        """
+        Retorna la línea de la primera aparición de una directiva, por ejemplo '.TEMP'.
+
+        Args:
+            directive (str): Nombre de la directiva, sin importar mayúsculas.
+
+        Returns:
+            int | None: Número de línea, o None si no aparece.
+        """
+        directive = directive.upper()
+        for name, _, line in self.directives:
+            if name == directive:
+                return line
+        return None
+
+    def _add_element(self, element, scope):
+        scope._add(element)
+        self.by_subckt.setdefault(element.subckt, []).append(element)
+        self.statements.append(element)
+        for line in range(element.span[0], element.span[1] + 1):
+            self.by_line[line] = element
+
+def _strip_comment(line):
+    """Separa una línea en (código, comentario al final)."""
+    code, comment = line, ""
+    if ';' in line:
+        code, comment = line.split(';', 1)
+    if ' $ ' in code:
+        code, extra = code.split(' $ ', 1)
+        comment = f"{extra} {comment}".strip()
+    return code.strip(), comment.strip()
+
+def _logical_lines(physical_lines):
+    """
+    Une las líneas de continuación.
+
+    Yields:
+        tuple: (código, comentario, texto original, (primera línea, última línea)).
+    """
+    current = None
+    for number, raw in enumerate(physical_lines, 1):
+        stripped = raw.strip()
+        if not stripped or stripped.startswith('*'):
+            # Los comentarios y líneas vacías no cortan una sentencia con continuación
+            continue
+        code, comment = _strip_comment(stripped)
+        if stripped.startswith('+'):
+            if current is None:
+                continue
+            current[0].append(code[1:].strip())
+            if comment:
+                current[1].append(comment)
+            current[2].append(raw)
+            current[3] = number
+            continue
+        if current is not None:
+            yield ' '.join(current[0]), ' '.join(current[1]), '\n'.join(current[2]), (current[4], current[3])
+        current = [[code], [comment] if comment else [], [raw], number, number]
+    if current is not None:
+        yield ' '.join(current[0]), ' '.join(current[1]), '\n'.join(current[2]), (current[4], current[3])
+
+def parse_netlist(text):
+    """
+    Interpreta el contenido de un netlist en una sola pasada.
+
+    Args:
+        text (str): Contenido del netlist.
+
+    Returns:
+        Netlist: Estructura con los elementos, subcircuitos, parámetros y directivas indexados.
+
+    Ejemplos:
+        >>> netlist = parse_netlist("TITULO\\nR1 1 0 1K\\n.END\\n")
+        >>> netlist.elements['R1'].value
+        '1K'
+    """
+    physical_lines = text.split('\n')
+    netlist = Netlist(physical_lines[0].strip() if physical_lines else "")
+    scope, subckt = netlist, None
+
+    for code, comment, raw, span in _logical_lines(physical_lines[1:]):
+        # Las líneas se numeran desde el título
+        span = (span[0] + 1, span[1] + 1)
+        if not code:
+            continue
+
+        if code[0] != '.':
+            netlist._add_element(Element(_tokenize(code), comment, raw, span, subckt), scope)
+            continue
+
+        tokens = _tokenize(code)
+        directive = tokens[0].upper()
+        if directive == '.END':
+            break
+        elif directive == '.SUBCKT' and len(tokens) > 1:
+            ports, params = _split_params(tokens[2:])
+            subckt = tokens[1]
+            scope = Subcircuit(subckt, ports, span[0])
+            for name, value in params.items():
+                scope.params[name] = Parameter(name, value, span[0], subckt, comment)
+            netlist.subcircuits[subckt] = scope
+            netlist._subcircuits_upper.setdefault(subckt.upper(), scope)
+        elif directive == '.ENDS':
+            if subckt is not None:
+                scope.span = (scope.span[0], span[1])
+            scope, subckt = netlist, None
+        elif directive in ('.PARAM', '.PARAMS'):
+            _, params = _split_params(tokens[1:])
+            for name, value in params.items():
+                scope.params[name] = Parameter(name, value, span[0], subckt, comment)
+        elif directive in ('.INCLUDE', '.INC', '.LIB'):
+            path = code.split(None, 1)[1].strip().strip('"\'') if len(tokens) > 1 else ""
+            netlist.includes.append((directive, path, span[0]))
+        else:
+            netlist.directives.append((directive, tokens[1:], span[0]))
+
+    return netlist
+
+def read_netlist(file_name):
+    """
+    Lee un archivo .cir y lo interpreta con parse_netlist.
+
+    Args:
+        file_name (str): Ruta del archivo .cir a leer.
+
+    Returns:
+        Netlist: Netlist interpretado.
+
+    Raises:
+        FileNotFoundError: Si el archivo especificado no existe.
+        UnicodeDecodeError: Si hay problemas al decodificar el archivo con UTF-8.
+    """
+    with open(file_name, 'r', encoding="UTF-8") as file:
+        return parse_netlist(file.read())
+
+def probe_vectors(text):
+    """
+    Retorna los vectores pedidos en las sentencias .PROBE de un netlist.
+
+    Los nombres quedan en minúsculas con la sintaxis del comando save de NgSpice: V(a, b) se
+    convierte en v(a) y v(b) (sin la tierra), I(V1) en i(v1), y se quitan los corchetes de los
+    alias de PSpice como V([Vout]). Solo se revisan las líneas .PROBE, así que es barato llamarla
+    con cada muestra de una campaña.
+
+    Args:
+        text (str): Contenido del netlist.
+
+    Returns:
+        list: Vectores sin repetir en el orden en que aparecen, vacía si no hay .PROBE con vectores.
+
+    Ejemplos:
+        >>> probe_vectors("TITULO\\n.PROBE V(140, 0) I(VIN)\\n")
+        ['v(140)', 'i(vin)']
+    """
+    vectors = []
+    for statement in _PROBE_PATTERN.findall(text):
+        for kind, arguments in _PROBE_VECTOR_PATTERN.findall(_CONTINUATION_PATTERN.sub(' ', statement)):
+            for node in arguments.split(','):
+                node = node.strip().strip('[]').lower()
+                if not node or (kind.upper() == 'V' and node == '0'):
+                    continue
+                vector = f"{kind.lower()}({node})"
+                if vector not in vectors:
+                    vectors.append(vector)
+    return vectors
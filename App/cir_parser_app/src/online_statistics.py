@@ -0,0 +1,412 @@
+"""online_statistics.py contiene estadísticas que se actualizan a medida que llegan las muestras,
+sin guardar la matriz completa de resultados:
+        RunningMoments(num_timesteps): Media y varianza por timestep con el algoritmo de Welford,
+        combinando bloques completos de muestras con la fórmula de Chan et al.
+
+        P2Quantile(probability, num_timesteps): Estimador P² (Jain y Chlamtac) de un cuantil, vectorizado
+        sobre los timesteps, que usa cinco marcadores por timestep en lugar de guardar las muestras.
+
+        StreamingHistogram2D(time_grid, num_bins=200, value_range=None): Histograma 2D (valor, timestep) que
+        se actualiza por muestra o por bloque, con bins de valor fijos o que se extienden solos.
+
+        OutputAccumulator(output=None, num_timesteps=200, time_grid=None, quantiles=(0.05, 0.5, 0.95), num_bins=None):
+        Recibe cada muestra apenas termina de simularse, la interpola a la malla uniforme y actualiza
+        media, varianza, mínimo, máximo, cuantiles y opcionalmente el histograma por timestep.
+
+        accumulate(simulations, accumulator): Deja pasar un generador de simulaciones actualizando el
+        acumulador con cada muestra.
+
+        normal_quantile(confidence): Cuantil de la normal estándar para un intervalo de confianza bilateral.
+    """
+from statistics import NormalDist
+import numpy as np
+from resampling import resample_results
+from distribution_fitting import FittedDistributions
+
+def normal_quantile(confidence):
+    """
+    Cuantil z de la normal estándar tal que P(|Z| <= z) = confidence.
+
+    Args:
+        confidence (float): Nivel de confianza, por ejemplo 0.95.
+
+    Returns:
+        float: Cuantil z, por ejemplo 1.96 para 0.95.
+    """
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+class RunningMoments:
+    """
+    Media y varianza por timestep, actualizadas por muestra o por bloque.
+
+    La memoria es O(num_timesteps) sin importar la cantidad de muestras. Cada bloque se
+    resume con su propia media y suma de cuadrados de las desviaciones, y se combina con
+    el acumulado usando la actualización de Chan et al., que es numéricamente estable.
+
+    Attributes:
+        count (int): Cantidad de muestras acumuladas.
+        mean (numpy.ndarray): Media de cada timestep.
+        m2 (numpy.ndarray): Suma de los cuadrados de las desviaciones respecto de la media.
+    """
+
+    def __init__(self, num_timesteps):
+        self.count = 0
+        self.mean = np.zeros(num_timesteps)
+        self.m2 = np.zeros(num_timesteps)
+
+    def update(self, values):
+        """
+        Agrega una muestra o un bloque de muestras.
+
+        Args:
+            values (array_like): Vector (num_timesteps,) de una muestra, o matriz (muestras, num_timesteps).
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        n_batch = values.shape[0]
+        if n_batch == 0:
+            return
+
+        batch_mean = values.mean(axis=0)
+        batch_m2 = ((values - batch_mean) ** 2).sum(axis=0)
+
+        total = self.count + n_batch
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * (n_batch / total)
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * (self.count * n_batch / total)
+        self.count = total
+
+    def merge(self, other):
+        """
+        Combina con otro acumulado, por ejemplo el de otro proceso.
+
+        Args:
+            other (RunningMoments): Acumulado con la misma cantidad de timesteps.
+        """
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / total)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / total)
+        self.count = total
+
+    @property
+    def variance(self):
+        """numpy.ndarray: Varianza muestral (con n - 1) de cada timestep."""
+        if self.count < 2:
+            return np.full_like(self.mean, np.nan)
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        """numpy.ndarray: Desviación estándar muestral de cada timestep."""
+        return np.sqrt(self.variance)
+
+    def ci_width(self, confidence=0.95):
+        """
+        Ancho del intervalo de confianza de la media en cada timestep.
+
+        Args:
+            confidence (float, optional): Nivel de confianza. Defaults to 0.95.
+
+        Returns:
+            numpy.ndarray: 2 * z * std / sqrt(n) por timestep.
+        """
+        return 2 * normal_quantile(confidence) * self.std / np.sqrt(max(self.count, 1))
+
+class P2Quantile:
+    """
+    Estimación en línea de un cuantil con el algoritmo P², para cada timestep a la vez.
+
+    Cada timestep tiene cinco marcadores (mínimo, p/2, p, (1+p)/2 y máximo) cuyas alturas se
+    ajustan con interpolación parabólica al llegar cada muestra. Las posiciones deseadas solo
+    dependen de la cantidad de muestras, así que son comunes a todos los timesteps.
+
+    Attributes:
+        probability (float): Cuantil a estimar, entre 0 y 1.
+        count (int): Cantidad de muestras recibidas.
+    """
+
+    def __init__(self, probability, num_timesteps):
+        self.probability = probability
+        self.count = 0
+        p = probability
+        self._heights = np.zeros((5, num_timesteps))
+        self._positions = np.tile(np.arange(1.0, 6.0)[:, None], (1, num_timesteps))
+        self._desired = np.array([1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5])
+        self._increments = np.array([0, p / 2, p, (1 + p) / 2, 1])
+
+    def update(self, values):
+        """
+        Agrega una muestra.
+
+        Args:
+            values (numpy.ndarray): Vector (num_timesteps,) con el valor de cada timestep.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        q, n = self._heights, self._positions
+        if self.count < 5:
+            q[self.count] = values
+            self.count += 1
+            if self.count == 5:
+                q.sort(axis=0)
+            return
+        self.count += 1
+
+        # Celda de cada timestep, ajustando los extremos si la muestra los supera
+        np.minimum(q[0], values, out=q[0])
+        np.maximum(q[4], values, out=q[4])
+        cell = (values[None, :] >= q[1:4]).sum(axis=0)
+        n += np.arange(5)[:, None] > cell[None, :]
+        self._desired = self._desired + self._increments
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            move = ((d >= 1) & (n[i + 1] - n[i] > 1)) | ((d <= -1) & (n[i - 1] - n[i] < -1))
+            if not move.any():
+                continue
+            step = np.sign(d) * move
+            gap_up, gap_down = n[i + 1] - n[i], n[i] - n[i - 1]
+            parabolic = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / np.where(gap_up == 0, 1, gap_up)
+                + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / np.where(gap_down == 0, 1, gap_down))
+            # Si la parábola se sale del intervalo de los vecinos se usa la interpolación lineal
+            neighbour = np.where(step > 0, i + 1, i - 1)
+            columns = np.arange(q.shape[1])
+            linear = q[i] + step * (q[neighbour, columns] - q[i]) / np.where(
+                n[neighbour, columns] == n[i], 1, n[neighbour, columns] - n[i])
+            inside = (q[i - 1] < parabolic) & (parabolic < q[i + 1])
+            q[i] = np.where(move, np.where(inside, parabolic, linear), q[i])
+            n[i] = n[i] + step
+
+    @property
+    def value(self):
+        """numpy.ndarray: Cuantil estimado de cada timestep (exacto con menos de cinco muestras)."""
+        if self.count == 0:
+            return np.full(self._heights.shape[1], np.nan)
+        if self.count < 5:
+            return np.quantile(self._heights[:self.count], self.probability, axis=0)
+        return self._heights[2].copy()
+
+class StreamingHistogram2D:
+    """
+    Histograma 2D de una salida sobre la malla uniforme, con una columna por timestep.
+
+    Solo guarda la matriz de cuentas (num_bins, num_timesteps), así que la memoria no depende de la
+    cantidad de muestras. Si no se da value_range, el rango se fija con el primer bloque y cuando
+    llega un valor fuera de él se duplica el ancho de los bins uniendo pares vecinos, hacia el lado
+    donde cayó el valor. Los bordes anteriores siguen siendo bordes, así que no se pierde exactitud
+    en las cuentas ya acumuladas.
+
+    Attributes:
+        time_grid (numpy.ndarray): Malla uniforme de tiempo.
+        num_bins (int): Cantidad de bins de valor (par, para poder unirlos de a dos).
+        low (float | None): Borde inferior del primer bin de valor.
+        width (float | None): Ancho de cada bin de valor.
+        counts (numpy.ndarray): Cuentas (num_bins, num_timesteps).
+        count (int): Cantidad de muestras acumuladas.
+    """
+
+    def __init__(self, time_grid, num_bins=200, value_range=None):
+        self.time_grid = np.asarray(time_grid, dtype=np.float64)
+        self.num_bins = num_bins + num_bins % 2
+        self.counts = np.zeros((self.num_bins, self.time_grid.size), dtype=np.int64)
+        self.count = 0
+        self.low, self.width = None, None
+        self._fixed = value_range is not None
+        if self._fixed:
+            low, high = float(value_range[0]), float(value_range[1])
+            span = high - low
+            # Un rango de un solo valor (una salida constante) se ensancha igual que en update
+            if span == 0:
+                span = max(abs(high), 1.0) * 1e-6
+            self.low, self.width = low, span / self.num_bins
+
+    @property
+    def value_edges(self):
+        """numpy.ndarray: Bordes de los bins de valor."""
+        return self.low + self.width * np.arange(self.num_bins + 1)
+
+    @property
+    def time_edges(self):
+        """numpy.ndarray: Bordes de las columnas, a mitad de camino entre timesteps vecinos."""
+        grid = self.time_grid
+        step = np.diff(grid)
+        first, last = (step[0], step[-1]) if step.size else (1.0, 1.0)
+        return np.concatenate([[grid[0] - first / 2], grid[:-1] + step / 2, [grid[-1] + last / 2]])
+
+    def _extend(self, minimum, maximum):
+        """Duplica el ancho de los bins hasta que [minimum, maximum] quede dentro del rango."""
+        half = self.num_bins // 2
+        while minimum < self.low or maximum > self.low + self.width * self.num_bins:
+            merged = self.counts[0::2] + self.counts[1::2]
+            self.counts[:] = 0
+            if maximum > self.low + self.width * self.num_bins:
+                self.counts[:half] = merged
+            else:
+                self.counts[half:] = merged
+                self.low -= self.width * self.num_bins
+            self.width *= 2
+
+    def update(self, values):
+        """
+        Agrega una muestra o un bloque de muestras ya interpoladas a la malla.
+
+        Con bins fijos, los valores fuera del rango se acumulan en el primer o último bin.
+
+        Args:
+            values (array_like): Vector (num_timesteps,) o matriz (muestras, num_timesteps).
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        if values.shape[0] == 0:
+            return
+        minimum, maximum = float(values.min()), float(values.max())
+        if self.low is None:
+            span = maximum - minimum
+            if span == 0:
+                span = max(abs(maximum), 1.0) * 1e-6
+            self.low, self.width = minimum, span / self.num_bins
+        elif not self._fixed:
+            self._extend(minimum, maximum)
+
+        # Se busca en los bordes (y no se divide por el ancho) para respetar exactamente value_edges
+        rows = np.clip(np.searchsorted(self.value_edges, values, side='right') - 1, 0, self.num_bins - 1)
+        flat = rows * self.counts.shape[1] + np.arange(self.counts.shape[1])
+        self.counts += np.bincount(flat.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+        self.count += values.shape[0]
+
+    def density(self):
+        """
+        Densidad normalizada como plt.hist2d(..., density=True): la integral sobre el plano vale 1.
+
+        Returns:
+            numpy.ndarray: Densidad (num_bins, num_timesteps).
+        """
+        area = self.width * np.diff(self.time_edges)[None, :]
+        total = self.counts.sum()
+        return self.counts / (max(total, 1) * area)
+
+class OutputAccumulator:
+    """
+    Estadísticas en línea de una salida, con memoria O(num_timesteps) sin importar la cantidad de muestras.
+
+    Cada muestra se interpola a la malla uniforme apenas llega. Si no se da la malla, se fija con el
+    intervalo de tiempo de la primera muestra, que en un análisis transitorio es el mismo para todas.
+
+    Attributes:
+        output (str | None): Salida que se acumula, o None para el primer vector que no es el tiempo.
+        time_grid (numpy.ndarray | None): Malla uniforme de tiempo.
+        moments (RunningMoments | None): Media y varianza por timestep.
+        minimum (numpy.ndarray | None): Mínimo por timestep.
+        maximum (numpy.ndarray | None): Máximo por timestep.
+        quantiles (dict): {probabilidad: P2Quantile}.
+        histogram (StreamingHistogram2D | None): Histograma por timestep, si se pidió num_bins.
+    """
+
+    def __init__(self, output=None, num_timesteps=200, time_grid=None, quantiles=(0.05, 0.5, 0.95), num_bins=None):
+        self.output = output
+        self.num_timesteps = num_timesteps
+        self.time_grid = None
+        self.moments = None
+        self.minimum = None
+        self.maximum = None
+        self.quantiles = {}
+        self.histogram = None
+        self._probabilities = tuple(quantiles)
+        self._num_bins = num_bins
+        if time_grid is not None:
+            self._start(np.asarray(time_grid, dtype=np.float64))
+
+    def _start(self, time_grid):
+        self.time_grid = time_grid
+        size = time_grid.size
+        self.moments = RunningMoments(size)
+        self.minimum = np.full(size, np.inf)
+        self.maximum = np.full(size, -np.inf)
+        self.quantiles = {p: P2Quantile(p, size) for p in self._probabilities}
+        if self._num_bins:
+            self.histogram = StreamingHistogram2D(time_grid, self._num_bins)
+
+    @property
+    def count(self):
+        """int: Cantidad de muestras acumuladas."""
+        return self.moments.count if self.moments is not None else 0
+
+    def add(self, results):
+        """
+        Agrega una muestra.
+
+        Args:
+            results (dict): Diccionario {'time': ..., salida: ...} de la muestra.
+        """
+        if self.time_grid is None:
+            times = np.asarray(results['time'])
+            self._start(np.linspace(times.min(), times.max(), self.num_timesteps))
+        _, row, value_key = resample_results({'sample': results}, output=self.output, time_grid=self.time_grid)
+        self.output = self.output or value_key
+        self.add_resampled(row)
+
+    def add_resampled(self, matrix):
+        """
+        Agrega muestras ya interpoladas a la malla.
+
+        Args:
+            matrix (numpy.ndarray): Vector (num_timesteps,) o matriz (muestras, num_timesteps).
+        """
+        matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float64))
+        self.moments.update(matrix)
+        np.minimum(self.minimum, matrix.min(axis=0), out=self.minimum)
+        np.maximum(self.maximum, matrix.max(axis=0), out=self.maximum)
+        if self.histogram is not None:
+            self.histogram.update(matrix)
+        for row in matrix:
+            for quantile in self.quantiles.values():
+                quantile.update(row)
+
+    def quantile(self, probability):
+        """
+        Retorna el cuantil estimado de cada timestep.
+
+        Args:
+            probability (float): Una de las probabilidades dadas al crear el acumulador.
+
+        Returns:
+            numpy.ndarray: Cuantil por timestep.
+        """
+        return self.quantiles[probability].value
+
+    def fitted_distributions(self, dist_type='normal'):
+        """
+        Construye las distribuciones por timestep con lo acumulado hasta el momento.
+
+        Usa los mismos estimadores que distribution_fitting.fit_parameters: media y desviación
+        estándar poblacional para 'normal', y mínimo y rango para 'uniform'.
+
+        Args:
+            dist_type (str, optional): 'normal' o 'uniform'. Defaults to 'normal'.
+
+        Returns:
+            FittedDistributions: Distribuciones listas para plotting.plot_distributions.
+        """
+        if dist_type == 'normal':
+            loc, scale = self.moments.mean, np.sqrt(self.moments.m2 / max(self.moments.count, 1))
+        elif dist_type == 'uniform':
+            loc, scale = self.minimum, self.maximum - self.minimum
+        else:
+            raise ValueError(f"Tipo desconocido de distribución: {dist_type}")
+        return FittedDistributions(self.time_grid, loc, scale, dist_type)
+
+def accumulate(simulations, accumulator):
+    """
+    Deja pasar un generador de simulaciones actualizando un acumulador con cada muestra.
+
+    Args:
+        simulations (iterable): Pares (nombre, resultados), por ejemplo de simulation.iter_netlist_simulations.
+        accumulator (OutputAccumulator): Acumulador a actualizar.
+
+    Yields:
+        tuple: Los mismos pares (nombre, resultados).
+    """
+    for name, results in simulations:
+        accumulator.add(results)
+        yield name, results
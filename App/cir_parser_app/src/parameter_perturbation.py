@@ -1,14 +1,363 @@
 """parameter_perturbation.py contiene:
+        sample_parameter_matrix(cir_dict, n_files=10, sampling_method='random', seed=None): Muestrea en lote
+        la matriz (n_files, n_elementos) de valores perturbados, con una llamada de NumPy por grupo de
+        distribución, o con secuencias de Sobol, Halton o un hipercubo latino.
+
+        sample_from_points(cir_dict, points): Transforma una matriz de puntos en [0, 1) en valores perturbados,
+        con la inversa de la distribución de cada elemento; perturbed_dimensions(cir_dict) da su cantidad de columnas.
+
+        perturbed_columns(cir_dict, lines, samples): Selecciona los nombres y columnas de los
+        elementos que varían, para simular en modo alter.
+
+        parameter_column_names(cir_dict, lines=None): Nombres únicos de las columnas de parámetros, con el
+        nombre de NgSpice de los elementos internos de cada instancia.
+
+        supports_alter(cir_dict): Indica si todos los objetivos perturbados pueden cambiarse con alter.
+
+        matrix_to_dicts(cir_dict, lines, samples): Convierte la matriz de muestras en la lista de
+        diccionarios que usa create_new_cir_file.
+
+        perturbed_netlists(cir_dict, input_file_name, n_files=10, new_filename="new_cir",
+        escribir_archivos=False, base_output_folder="new_cir_files", muestras=None, sampling_method='random', seed=None): Genera en memoria los netlists
+        perturbados a partir de una plantilla compilada una sola vez, sin pasar por disco.
+
         parameter_perturbator(cir_dict, input_file_name, dist=None, scale=None, n_files=10,
-        base_output_folder="new_cir_files", new_filename="new_cir", retornar_lista_dicts=False, debug=False):
+        base_output_folder="new_cir_files", new_filename="new_cir", retornar_lista_dicts=False,
+        retornar_matriz=False, debug=False, sampling_method='random', seed=None):
         Una función encargada de poblar un directorio con una cantidad n_files de archivos cir, estos contienen
         el netlist que describe un circuito original, pero con el valor de las magnitudes de sus elementos
         perturbados según el diccionario en dist y el diccionario en scale."""
 import os
 import numpy as np
 import file_operations as fileopr
+import ltspice_converter as spceconvrt
+from instrumentation import stage
+
+# Métodos de muestreo de sample_parameter_matrix
+SAMPLING_METHODS = ('random', 'sobol', 'halton', 'lhs')
+
+# Campos que identifican los objetivos extendidos de read_cir_file (parámetros y elementos por instancia)
+_TARGET_FIELDS = ('kind', 'instance', 'element', 'alter')
+# Los parámetros se evalúan al cargar el circuito, alter no los puede cambiar
+_PARAMETER_KINDS = ('param', 'instance_param')
+
+def _draw_group(dist, values, scales, size, rng=np.random):
+    """Extrae muestras para un grupo de elementos que comparten distribución.
+
+    Args:
+        dist (str): 'uniform' o 'normal'.
+        values (numpy.ndarray): Valores nominales de los elementos.
+        scales (numpy.ndarray): Escalas relativas de los elementos.
+        size (int | tuple): Forma de la salida, compatible con values por broadcasting.
+        rng (numpy.random.Generator, optional): Generador a usar. Defaults to np.random (estado global).
+
+    Returns:
+        numpy.ndarray: Muestras extraídas.
+    """
+    if dist == 'uniform':
+        return rng.uniform(values * (1 - scales), values * (1 + scales), size=size)
+    elif dist == 'normal':
+        return rng.normal(values, values * scales, size=size)
+    raise ValueError(f'Unsupported distribution: {dist}')
+
+def _unit_hypercube(sampling_method, n_samples, dimensions, seed=None):
+    """Genera puntos en [0, 1)^dimensions con una secuencia de baja discrepancia o un hipercubo latino.
+
+    Args:
+        sampling_method (str): 'sobol', 'halton' o 'lhs'.
+        n_samples (int): Cantidad de puntos.
+        dimensions (int): Cantidad de elementos perturbados.
+        seed (int | numpy.random.Generator, optional): Semilla del aleatorizado. Defaults to None.
+
+    Returns:
+        numpy.ndarray: Matriz (n_samples, dimensions).
+    """
+    from scipy.stats import qmc
+    if sampling_method == 'sobol':
+        # Sobol conserva su balance en potencias de dos, se generan las necesarias y se toman las primeras
+        m = int(np.ceil(np.log2(n_samples))) if n_samples > 1 else 0
+        return qmc.Sobol(dimensions, scramble=True, seed=seed).random_base2(m)[:n_samples]
+    elif sampling_method == 'halton':
+        return qmc.Halton(dimensions, scramble=True, seed=seed).random(n_samples)
+    elif sampling_method == 'lhs':
+        return qmc.LatinHypercube(dimensions, seed=seed).random(n_samples)
+    raise ValueError(f'Unsupported sampling method: {sampling_method}')
+
+def _map_group(dist, values, scales, points):
+    """Transforma puntos uniformes con la inversa de la distribución de cada elemento.
+
+    Para los elementos con valor nominal positivo la distribución se trunca en cero, lo que
+    equivale al remuestreo de valores negativos del modo 'random'.
+
+    Args:
+        dist (str): 'uniform' o 'normal'.
+        values (numpy.ndarray): Valores nominales de los elementos.
+        scales (numpy.ndarray): Escalas relativas de los elementos.
+        points (numpy.ndarray): Matriz (n_samples, n_elementos) de puntos en [0, 1).
+
+    Returns:
+        numpy.ndarray: Muestras con la forma de points.
+    """
+    positive = values > 0
+    if dist == 'uniform':
+        low, high = values * (1 - scales), values * (1 + scales)
+        low = np.where(positive, np.maximum(low, 0), low)
+        return low + points * (high - low)
+    elif dist == 'normal':
+        from scipy import special
+        sigma = values * scales
+        # Probabilidad acumulada en cero, los puntos se comprimen a la parte positiva
+        lower = np.where(positive, special.ndtr(-1 / scales), 0.0)
+        eps = np.finfo(np.float64).eps
+        probabilities = np.clip(lower + points * (1 - lower), eps, 1 - eps)
+        return values + sigma * special.ndtri(probabilities)
+    raise ValueError(f'Unsupported distribution: {dist}')
+
+def _target_arrays(cir_dict):
+    """Valores nominales, escalas y distribuciones de cir_dict, en el orden de sus llaves.
+
+    Returns:
+        tuple: (lines, values, scales, dists). Si faltan 'dist' o 'scale' se usan 'uniform' y 0.03.
+
+    Raises:
+        ValueError: Si un elemento perturbado con distribución normal tiene valor nominal negativo, ya que
+        su desviación estándar (valor * escala) sería negativa. Se revisa aquí para que todos los métodos
+        de muestreo rechacen el mismo cir_dict.
+    """
+    lines = list(cir_dict.keys())
+    values = np.array([float(cir_dict[line]['value']) for line in lines])
+    scales = np.array([float(cir_dict[line].get('scale', 0.03)) for line in lines])
+    dists = np.array([cir_dict[line].get('dist', 'uniform') for line in lines])
+    negative = np.flatnonzero((scales > 0) & (dists == 'normal') & (values < 0))
+    if negative.size:
+        i = negative[0]
+        raise ValueError(f"El elemento {cir_dict[lines[i]]['name']} tiene distribución normal con valor nominal "
+                         f"negativo ({values[i]}), su desviación estándar sería negativa.")
+    return lines, values, scales, dists
+
+def perturbed_dimensions(cir_dict):
+    """Cantidad de elementos de cir_dict con escala mayor que cero, la dimensión de los puntos de sample_from_points."""
+    return sum(float(item.get('scale', 0.03)) > 0 for item in cir_dict.values())
+
+def sample_from_points(cir_dict, points):
+    """Transforma puntos de [0, 1) en valores perturbados, con la inversa de la distribución de cada elemento.
+
+    Los elementos que comparten distribución se transforman juntos, con una llamada por grupo.
+
+    Args:
+        cir_dict (dict): Diccionario producido por read_cir_file.
+        points (numpy.ndarray): Matriz (n_muestras, perturbed_dimensions(cir_dict)) de puntos en [0, 1), con
+        una columna por elemento con escala mayor que cero, en el orden de cir_dict.
+
+    Returns:
+        tuple: (lines, samples) como en sample_parameter_matrix.
+
+    Raises:
+        ValueError: Si un elemento con escala mayor que cero usa una distribución no soportada o es normal
+        con valor nominal negativo.
+    """
+    lines, values, scales, dists = _target_arrays(cir_dict)
+    points = np.asarray(points, dtype=np.float64)
+
+    # Por defecto cada columna conserva su valor nominal (escala 0)
+    samples = np.tile(values, (points.shape[0], 1))
+    columns = np.flatnonzero(scales > 0)
+    for dist in np.unique(dists[columns]):
+        group = dists[columns] == dist
+        samples[:, columns[group]] = _map_group(dist, values[columns[group]], scales[columns[group]], points[:, group])
+    return lines, samples
+
+def sample_parameter_matrix(cir_dict, n_files=10, sampling_method='random', seed=None):
+    """Muestrea todas las perturbaciones de una campaña en una sola pasada vectorizada.
+
+    En lugar de extraer un escalar por elemento y por archivo, se agrupan las columnas
+    según su distribución y se extrae la matriz completa con una llamada de NumPy por grupo.
+    Los valores negativos se vuelven a muestrear de forma vectorizada, solo en las
+    posiciones que lo requieren.
+
+    Args:
+        cir_dict (dict): Diccionario producido por read_cir_file, con 'value', 'dist' y 'scale'
+        para cada línea. Si faltan 'dist' o 'scale' se usan 'uniform' y 0.03.
+        n_files (int, optional): Cantidad de muestras (filas) a generar. Defaults to 10.
+        sampling_method (str, optional): 'random' para extracciones pseudoaleatorias independientes, o
+        'sobol', 'halton' o 'lhs' (hipercubo latino), que reparten los puntos de forma más pareja y
+        estabilizan las estimaciones con muchas menos simulaciones. Los puntos en [0, 1) se transforman
+        con la inversa de la distribución de cada elemento. Defaults to 'random'.
+        seed (int | numpy.random.SeedSequence | numpy.random.Generator, optional): Semilla de la campaña.
+        Con 'random' se usa para crear el generador de las extracciones, y con los demás métodos para
+        aleatorizar la secuencia. Defaults to None (estado global de np.random en 'random').
+
+    Returns:
+        tuple: Un tuple conteniendo dos elementos:
+            - list: Las llaves de cir_dict (números de línea o tuples), en el orden de las columnas.
+            - numpy.ndarray: Matriz de forma (n_files, n_elementos) con los valores muestreados.
+
+    Raises:
+        ValueError: Si un elemento con escala mayor que cero usa una distribución no soportada o es normal
+        con valor nominal negativo, o si el método de muestreo no existe.
+    """
+    if sampling_method not in SAMPLING_METHODS:
+        raise ValueError(f'Unsupported sampling method: {sampling_method}')
+
+    if sampling_method != 'random':
+        # Todas las columnas perturbadas comparten un único conjunto de puntos de dimensión n_elementos
+        dimensions = perturbed_dimensions(cir_dict)
+        points = _unit_hypercube(sampling_method, n_files, dimensions, seed) if dimensions else np.empty((n_files, 0))
+        return sample_from_points(cir_dict, points)
+
+    lines, values, scales, dists = _target_arrays(cir_dict)
+
+    # Por defecto cada columna conserva su valor nominal (escala 0)
+    samples = np.tile(values, (n_files, 1))
+
+    perturbed = scales > 0
+    rng = np.random if seed is None else np.random.default_rng(seed)
+    for dist in np.unique(dists[perturbed]):
+        columns = np.flatnonzero(perturbed & (dists == dist))
+        group_values = values[columns]
+        group_scales = scales[columns]
+
+        # Una sola llamada de NumPy para todo el grupo
+        block = _draw_group(dist, group_values, group_scales, (n_files, columns.size), rng)
 
-def parameter_perturbator(cir_dict, input_file_name, dist=None, scale=None, n_files=10, base_output_folder="new_cir_files", new_filename="new_cir", retornar_lista_dicts=False, debug=False):
+        # Atajamos los valores negativos, solo para elementos con valor nominal positivo
+        # (si el nominal es negativo el muestreo por rechazo nunca terminaría)
+        resample = (block < 0) & (group_values > 0)
+        while resample.any():
+            rows, cols = np.nonzero(resample)
+            block[rows, cols] = _draw_group(dist, group_values[cols], group_scales[cols], rows.size, rng)
+            resample = (block < 0) & (group_values > 0)
+
+        samples[:, columns] = block
+
+    return lines, samples
+
+def perturbed_columns(cir_dict, lines, samples):
+    """Selecciona las columnas de una matriz de muestras que realmente varían.
+
+    Útil para el modo alter de simulación, donde solo hace falta cambiar los
+    elementos con escala mayor que cero.
+
+    Args:
+        cir_dict (dict): Diccionario producido por read_cir_file.
+        lines (list): Llaves de cir_dict en el orden de las columnas de samples.
+        samples (numpy.ndarray): Matriz (n_files, n_elementos) de valores muestreados.
+
+    Returns:
+        tuple: Los nombres de los elementos perturbados y la submatriz con sus columnas. Los elementos
+        internos de una instancia usan su nombre dentro de NgSpice, por ejemplo 'r.xu1.rd1'.
+
+    Raises:
+        ValueError: Si se perturba un parámetro, que solo puede cambiarse generando el netlist.
+    """
+    columns = [i for i, line in enumerate(lines) if cir_dict[line].get('scale', 0.03) > 0]
+    for i in columns:
+        if cir_dict[lines[i]].get('kind') in _PARAMETER_KINDS:
+            raise ValueError(f"El parámetro {cir_dict[lines[i]]['name']} no se puede cambiar con alter.")
+    names = parameter_column_names(cir_dict, [lines[i] for i in columns])
+    return names, samples[:, columns]
+
+def parameter_column_names(cir_dict, lines=None):
+    """Nombres de las columnas de parámetros, únicos aunque un subcircuito tenga varias instancias.
+
+    Los elementos internos de una instancia usan su nombre dentro de NgSpice, por ejemplo 'r.xu1.rd1',
+    como en perturbed_columns; los demás objetivos usan su 'name'.
+
+    Args:
+        cir_dict (dict): Diccionario producido por read_cir_file.
+        lines (list, optional): Llaves de cir_dict en el orden de las columnas. Defaults to None (todas).
+
+    Returns:
+        list: Un nombre por columna, para el almacén de resultados y failures.jsonl.
+    """
+    lines = list(cir_dict.keys()) if lines is None else lines
+    return [cir_dict[line].get('alter', cir_dict[line]['name']) for line in lines]
+
+def supports_alter(cir_dict):
+    """Indica si todos los objetivos perturbados de cir_dict pueden cambiarse con alter.
+
+    Args:
+        cir_dict (dict): Diccionario producido por read_cir_file.
+
+    Returns:
+        bool: False si se perturba algún .PARAM o algún PARAMS: de una instancia.
+    """
+    return not any(item.get('kind') in _PARAMETER_KINDS and item.get('scale', 0.03) > 0 for item in cir_dict.values())
+
+def matrix_to_dicts(cir_dict, lines, samples):
+    """Convierte una matriz de muestras en una lista de diccionarios estilo cir_dict.
+
+    Args:
+        cir_dict (dict): Diccionario original producido por read_cir_file.
+        lines (list): Llaves de cir_dict en el orden de las columnas de samples.
+        samples (numpy.ndarray): Matriz (n_files, n_elementos) de valores muestreados.
+
+    Returns:
+        list: Lista con un diccionario por fila de samples, con 'value', 'name', 'dist' y 'scale'.
+    """
+    out_dicts = []
+    for row in samples.tolist():
+        new_cir_dict = {}
+        for line, new_val in zip(lines, row):
+            item = cir_dict[line]
+            new_cir_dict[line] = {
+                'value': new_val,
+                'name': item['name'],
+                'dist': item.get('dist', 'uniform'),
+                'scale': item.get('scale', 0.03)
+            }
+            # Los objetivos extendidos necesitan sus campos para generar el netlist
+            new_cir_dict[line].update({field: item[field] for field in _TARGET_FIELDS if field in item})
+        out_dicts.append(new_cir_dict)
+    return out_dicts
+
+def perturbed_netlists(cir_dict, input_file_name, n_files=10, new_filename="new_cir", escribir_archivos=False, base_output_folder="new_cir_files", muestras=None, sampling_method='random', seed=None):
+    """Genera los netlists perturbados en memoria, listos para NgSpiceShared.load_circuit.
+
+    El netlist de origen se lee y compila una sola vez en una plantilla, y cada muestra
+    se obtiene sustituyendo los valores en las casillas. Los archivos en disco solo se
+    escriben si se pide explícitamente.
+
+    Args:
+        cir_dict (dict): Diccionario producido por read_cir_file.
+        input_file_name (str): Camino del archivo original al cual perturbar.
+        n_files (int, optional): Número de netlists a generar. Defaults to 10.
+        new_filename (str, optional): Prefijo de los nombres de cada muestra. Defaults to "new_cir".
+        escribir_archivos (bool, optional): Si es True también se escribe cada netlist como .cir
+        en base_output_folder. Defaults to False.
+        base_output_folder (str, optional): Carpeta para los archivos opcionales. Defaults to "new_cir_files".
+        muestras (tuple, optional): Tuple (lines, samples) ya muestreado, por ejemplo con
+        sample_parameter_matrix. Si se da, se ignora n_files. Defaults to None.
+        sampling_method (str, optional): Método de muestreo, ver sample_parameter_matrix. Defaults to 'random'.
+        seed (int, optional): Semilla de la campaña, ver sample_parameter_matrix. Defaults to None.
+
+    Yields:
+        tuple: (nombre, contenido) de cada netlist, con nombres de la forma f"{new_filename}_{i}.cir".
+    """
+    template = fileopr.compile_cir_template(cir_dict, input_file_name)
+    if muestras is not None:
+        lines, samples = muestras
+    else:
+        with stage('sample_parameters'):
+            lines, samples = sample_parameter_matrix(cir_dict, n_files, sampling_method, seed)
+
+    if escribir_archivos:
+        fileopr.existe_carpeta(base_output_folder)
+
+    # Formateamos toda la matriz en notación LTSpice de una sola vez
+    with stage('render_netlists'):
+        formatted = spceconvrt.float_to_LTSpice_array(samples)
+
+    for i, row in enumerate(formatted.tolist()):
+        name = f"{new_filename}_{i}.cir"
+        with stage('render_netlists'):
+            content = fileopr.render_cir_template(template, dict(zip(lines, row)))
+        if escribir_archivos:
+            with stage('write_files'), open(os.path.join(base_output_folder, name), 'w', encoding="UTF-8") as out_file:
+                out_file.write(content)
+        yield name, content
+
+def parameter_perturbator(cir_dict, input_file_name, dist=None, scale=None, n_files=10, base_output_folder="new_cir_files", new_filename="new_cir", retornar_lista_dicts=False, retornar_matriz=False, debug=False, sampling_method='random', seed=None):
     """Genera n_files archivos .cir que contienen 
     valores para sus parámetros perturbados con distribuciones probabilísticas.
 
@@ -23,6 +372,15 @@ def parameter_perturbator(cir_dict, input_file_name, dist=None, scale=None, n_fi
         input_file_name (str, optional): Camino del archivo original al cual perturbar.
         parámetros, su valor default es "./archivos_cir/LINEAL.cir".
         base_output_folder (str, optional): Carpeta que contendrá los archivos generados, su default es "new_cir_files".
+        retornar_lista_dicts (bool, optional): Retorna la lista de diccionarios usados para cada archivo.
+        retornar_matriz (bool, optional): Retorna las llaves de las columnas y la matriz (n_files, n_elementos)
+        de valores muestreados.
+        sampling_method (str, optional): Método de muestreo, ver sample_parameter_matrix. Defaults to 'random'.
+        seed (int, optional): Semilla de la campaña, para poder repetirla. Defaults to None.
+
+    Returns:
+        list | tuple | None: La lista de diccionarios si retornar_lista_dicts, el tuple (lines, samples)
+        si retornar_matriz, o (lista, lines, samples) si se piden ambos.
     """
     if debug:
         print(f'Cir_dict es: \n{cir_dict}\n\n')
@@ -31,56 +389,33 @@ def parameter_perturbator(cir_dict, input_file_name, dist=None, scale=None, n_fi
     
     # Revisamos si existe la carpeta
     fileopr.existe_carpeta(base_output_folder)
-    out_dicts = []
+
+    # Muestreamos toda la campaña de una vez
+    with stage('sample_parameters'):
+        lines, samples = sample_parameter_matrix(cir_dict, n_files, sampling_method, seed)
     
-    # Realizamos n_files loops
-    for i in range(n_files):
-        # Iniciamos un diccionario vacío
-        new_cir_dict = {}
-        for key, item in cir_dict.items():
-            # Agarramos el valor actual
-            value = item['value']
-            # Ese valor es perturbado probabilísticamente solo si la escala es mayor que 0
-            element_dist = item['dist']
-            element_scale = item['scale']
-            
-            if element_scale > 0:
-                if element_dist == 'uniform':
-                    min_val = value * (1 - element_scale)
-                    max_val = value * (1 + element_scale)
-                    new_val = np.random.uniform(min_val, max_val)
-                elif element_dist == 'normal':
-                    std_dev = value * element_scale
-                    new_val = np.random.normal(value, std_dev)
-                else:
-                    raise ValueError(f'Unsupported distribution: {element_dist}')
-
-                # Atajamos los valores negativos
-                while new_val < 0:
-                    if element_dist == 'uniform':
-                        new_val = np.random.uniform(min_val, max_val)
-                    elif element_dist == 'normal':
-                        new_val = np.random.normal(value, std_dev)
-            else:
-                new_val = value  # No change if scale is 0
-            
-            # Vamos armando el diccionario
-            new_cir_dict[key] = {
-                'value': new_val,
-                'name': item['name'],
-                'dist': item['dist'],
-                'scale': item['scale']
-            }
-        
-        # Tal vez vamos a ocupar esta lista de diccionarios
-        if retornar_lista_dicts:
-            out_dicts.append(new_cir_dict)
-        
+    # Leemos el netlist original una sola vez
+    template = fileopr.compile_cir_template(cir_dict, input_file_name)
+
+    # Formateamos toda la matriz en notación LTSpice de una sola vez
+    with stage('render_netlists'):
+        formatted = spceconvrt.float_to_LTSpice_array(samples)
+
+    # Solo queda sustituir cada fila ya formateada en la plantilla y escribirla
+    for i, row in enumerate(formatted.tolist()):
         # Usamos el marco de referencia
         output_file_name = os.path.join(base_output_folder, f"{new_filename}_{i}.cir")
-        # Con el nuevo dict creamos otro .cir
-        fileopr.create_new_cir_file(new_cir_dict, input_file_name, output_file_name)
+        with stage('render_netlists'):
+            content = fileopr.render_cir_template(template, dict(zip(lines, row)))
+        # Con la nueva fila creamos otro .cir
+        with stage('write_files'), open(output_file_name, 'w', encoding="UTF-8") as out_file:
+            out_file.write(content)
     
-    # Queremos la lista?
+    # Queremos la lista o la matriz?
+    out_dicts = matrix_to_dicts(cir_dict, lines, samples) if retornar_lista_dicts else None
+    if retornar_lista_dicts and retornar_matriz:
+        return out_dicts, lines, samples
+    if retornar_matriz:
+        return lines, samples
     if retornar_lista_dicts:
-        return out_dicts
\ No newline at end of file
+        return out_dicts
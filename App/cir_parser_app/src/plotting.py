@@ -11,13 +11,20 @@
         
         plot_density(simulation_results, num_timesteps, num_bins=200, interpolation_method='linear'): Usa los resultados
         de las simulaciones para graficar la densidad de los resultados interpolados a uniformes en el tiempo, con
-        resolución configurable (coloreado logarítmicamente)."""
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-from matplotlib.colors import LogNorm
-import seaborn as sns
+        resolución configurable (coloreado logarítmicamente).
+
+        plot_histogram2d(histogram, value_key=None): Grafica un histograma 2D acumulado en línea con pcolormesh.
+
+    matplotlib y seaborn se importan dentro de las funciones que dibujan, así estimate_distribution y quien
+    importe este módulo sin graficar (procesos trabajadores, ejecución sin pantalla) no pagan su carga."""
 import numpy as np
-from scipy import interpolate, stats
+from resampling import resample_results
+from distribution_fitting import fit_parameters, FittedDistributions
+from online_statistics import StreamingHistogram2D
+from instrumentation import stage
+
+# Muestras por bloque al construir el histograma de plot_density
+_DENSITY_BATCH = 1024
 
 def plot_simulation_results(simulation_results, output=None, max_files=None):
     """
@@ -34,6 +41,8 @@ def plot_simulation_results(simulation_results, output=None, max_files=None):
     La función crea un gráfico para cada archivo de simulación, mostrando la evolución temporal
     de la magnitud especificada (o la primera disponible si no se especifica).
     """
+    import matplotlib.pyplot as plt
+
     files_counter = 0
     for file_name, plot in simulation_results.items():
         if files_counter >= max_files:
@@ -59,7 +68,7 @@ def plot_simulation_results(simulation_results, output=None, max_files=None):
         # Show
         plt.show()
 
-def estimate_distribution(simulation_results, num_timesteps, dist_type='normal', interpolation_method='linear'):
+def estimate_distribution(simulation_results, num_timesteps, dist_type='normal', interpolation_method='linear', resampled=None):
     
     """
     Estima distribuciones probabilísticas basadas en los resultados de la simulación.
@@ -69,67 +78,31 @@ def estimate_distribution(simulation_results, num_timesteps, dist_type='normal',
         num_timesteps (int): Número de pasos de tiempo para la interpolación uniforme.
         dist_type (str, opcional): Tipo de distribución a estimar ('normal' o 'uniform'). Por defecto es 'normal'.
         interpolation_method (str, opcional): Método de interpolación ('linear', 'cubic', etc.). Por defecto es 'linear'.
+        resampled (tuple, opcional): Resultado ya calculado de resampling.resample_results, por ejemplo
+            desde una ResampleCache. Si se da, no se vuelve a interpolar simulation_results.
 
     Returns:
-        dict: Diccionario de distribuciones estimadas, donde las claves son los instantes de tiempo
-              y los valores son objetos de distribución de scipy.stats.
+        FittedDistributions: Mapeo de distribuciones estimadas, donde las claves son los instantes de tiempo
+              y los valores son objetos de distribución de scipy.stats, construidos solo al pedirlos.
+              Los parámetros de todos los timesteps están en sus atributos loc y scale.
 
     La función interpola los resultados no uniformes en el tiempo a datos uniformes,
     y luego estima una distribución probabilística para cada instante de tiempo.
+
+    Raises:
+        ValueError: Si el tipo de distribución no está soportado.
     """    
     
-    # Inicializamos el diccionario vacío
-    # lo vamos a llenar con distribuciones
-    fitted_distributions = {}
-
-    # El tiempo mínimo entre los mínimos y el máximo de los máximos
-    min_time = min(min(result['time'])
-                   for result in simulation_results.values())
-    max_time = max(max(result['time'])
-                   for result in simulation_results.values())
-
-    # Preparamos un espacio en el cual llenar los datos que vamos a interpolar
-    uniform_time_grid = np.linspace(min_time, max_time, num_timesteps)
-    all_interpolated_results = []
-
-    # Iteramos por sobre los resultados de la simulación
-    for circuit_name, circuit_results in simulation_results.items():
-        # Extraemos el tiempo
-        times = circuit_results['time']
-
-        # Extraemos el key que no se llama "time"
-        value_key = [key for key in circuit_results.keys() if key != 'time'][0]
-        values = circuit_results[value_key]
-
-        # Interpolamos los valores a unos distribuídos de forma uniforme
-        f = interpolate.interp1d(
-            times, values, kind=interpolation_method, fill_value='extrapolate')
-        interpolated_values = f(uniform_time_grid)
-
-        # Guardamos los datos interpolados
-        all_interpolated_results.append(interpolated_values)
-
-    all_interpolated_results = np.array(all_interpolated_results)
-
-    # Usamos una de dos distribuciones
-    if dist_type == 'normal':
-        dist = stats.norm
-    elif dist_type == 'uniform':
-        dist = stats.uniform
-    else:
-        raise ValueError(f"Tipo desconocido de distribución: {dist_type}")
-
-    # Ahora para cada timestep vamos aproximando la distribución
-    for i in range(num_timesteps):
-        timestep_data = all_interpolated_results[:, i]
+    # Interpolamos todas las muestras a la malla uniforme en una sola pasada
+    if resampled is None:
+        resampled = resample_results(simulation_results, num_timesteps, interpolation_method=interpolation_method)
+    uniform_time_grid, all_interpolated_results, _ = resampled
 
-        # Fit
-        distribution = dist(*dist.fit(timestep_data))
+    # Estimamos los parámetros de todos los timesteps a la vez
+    with stage('fit_distributions'):
+        loc, scale = fit_parameters(all_interpolated_results, dist_type)
 
-        # Vamos guardando los datos.
-        fitted_distributions[uniform_time_grid[i]] = distribution
-
-    return fitted_distributions
+    return FittedDistributions(uniform_time_grid, loc, scale, dist_type)
 
 def plot_distributions(fitted_distributions, num_samples=1000, n=20):
 
@@ -146,12 +119,19 @@ def plot_distributions(fitted_distributions, num_samples=1000, n=20):
 
     La función crea un gráfico de violín que muestra la evolución de las distribuciones estimadas a lo largo del tiempo.
     """
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as ticker
+    import seaborn as sns
 
-    data = []
-    for time, distribution in fitted_distributions.items():
-        # Muestreamos la distribución
-        samples = distribution.rvs(size=num_samples)
-        data.append(samples)
+    if isinstance(fitted_distributions, FittedDistributions):
+        # Muestreamos todas las distribuciones a la vez a partir de sus parámetros
+        data = list(fitted_distributions.rvs(num_samples).T)
+    else:
+        data = []
+        for time, distribution in fitted_distributions.items():
+            # Muestreamos la distribución
+            samples = distribution.rvs(size=num_samples)
+            data.append(samples)
 
     plt.figure(figsize=(10, 6))
 
@@ -177,7 +157,7 @@ def plot_distributions(fitted_distributions, num_samples=1000, n=20):
     # Show
     plt.show()
 
-def plot_density(simulation_results, num_timesteps, num_bins=200, interpolation_method='linear'):
+def plot_density(simulation_results, num_timesteps, num_bins=200, interpolation_method='linear', resampled=None):
 
     """
     Grafica la densidad de los resultados de simulación interpolados a tiempos uniformes.
@@ -187,46 +167,55 @@ def plot_density(simulation_results, num_timesteps, num_bins=200, interpolation_
         num_timesteps (int): Número de pasos de tiempo para la interpolación uniforme.
         num_bins (int, opcional): Número de bins para el histograma 2D. Por defecto es 200.
         interpolation_method (str, opcional): Método de interpolación ('linear', 'cubic', etc.). Por defecto es 'linear'.
+        resampled (tuple, opcional): Resultado ya calculado de resampling.resample_results. Si se da,
+            no se vuelve a interpolar simulation_results.
 
     Returns:
         None
 
     La función crea un gráfico de densidad 2D que muestra la distribución de los resultados
     de la simulación a lo largo del tiempo, utilizando una escala de colores logarítmica.
+    Cada timestep es una columna del histograma y num_bins es la cantidad de bins de valor.
     """
 
-    # Mínimos y máximos en tiempo
-    min_time = min(min(result['time'])
-                   for result in simulation_results.values())
-    max_time = max(max(result['time'])
-                   for result in simulation_results.values())
-    uniform_time_grid = np.linspace(min_time, max_time, num_timesteps)
+    # Interpolamos todas las muestras a la malla uniforme en una sola pasada
+    if resampled is None:
+        resampled = resample_results(simulation_results, num_timesteps, interpolation_method=interpolation_method)
+    uniform_time_grid, all_interpolated_results, value_key = resampled
 
-    all_interpolated_results = []
-    # Recorremos los resultados para interpolar
-    for circuit_name, circuit_results in simulation_results.items():
-        times = circuit_results['time']
-        value_key = [key for key in circuit_results.keys() if key != 'time'][0]
-        values = circuit_results[value_key]
+    # Acumulamos el histograma por bloques de muestras, sin repetir la malla de tiempo por cada valor
+    with stage('histogram'):
+        histogram = StreamingHistogram2D(uniform_time_grid, num_bins,
+                                         value_range=(all_interpolated_results.min(), all_interpolated_results.max()))
+        for start in range(0, all_interpolated_results.shape[0], _DENSITY_BATCH):
+            histogram.update(all_interpolated_results[start:start + _DENSITY_BATCH])
 
-        f = interpolate.interp1d(
-            times, values, kind=interpolation_method, fill_value='extrapolate')
-        interpolated_values = f(uniform_time_grid)
+    plot_histogram2d(histogram, value_key)
 
-        all_interpolated_results.append(interpolated_values)
+def plot_histogram2d(histogram, value_key=None):
+    """
+    Grafica un online_statistics.StreamingHistogram2D con pcolormesh y colores logarítmicos.
 
-    # Hacemos las columnas los timestep
-    data = np.transpose(all_interpolated_results)
+    Args:
+        histogram (StreamingHistogram2D): Histograma acumulado, por ejemplo el de un OutputAccumulator.
+        value_key (str, opcional): Nombre de la magnitud graficada. Por defecto es None.
 
-    plt.figure(figsize=(10, 6))
+    Returns:
+        None
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
 
-    # Construimos un arreglo con los datos en cada timestep
-    flattened_data = data.flatten()
-    time_data = np.repeat(uniform_time_grid, data.shape[1])
+    # Recortamos los bins de valor vacíos que dejan los rangos extendidos
+    occupied = np.flatnonzero(histogram.counts.any(axis=1))
+    first, last = (occupied[0], occupied[-1] + 1) if occupied.size else (0, histogram.num_bins)
+    density = np.ma.masked_equal(histogram.density()[first:last], 0)
+
+    plt.figure(figsize=(10, 6))
 
-    # Creamos un histograma en 2d con colores logarítmicos
-    plt.hist2d(time_data, flattened_data, bins=num_bins,
-               density=True, cmap='plasma', norm=LogNorm())
+    # Dibujamos la densidad con colores logarítmicos, dejando en blanco los bins vacíos
+    plt.pcolormesh(histogram.time_edges, histogram.value_edges[first:last + 1], density,
+                   cmap='plasma', norm=LogNorm(), shading='flat')
     plt.xlabel('Time')
     plt.ylabel(f'Magnitud graficada: {str(value_key)} .')
 
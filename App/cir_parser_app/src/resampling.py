@@ -0,0 +1,207 @@
+"""resampling.py contiene el motor compartido para llevar los resultados de las simulaciones,
+que NgSpice entrega con pasos de tiempo no uniformes, a una malla de tiempo uniforme:
+        time_bounds(simulation_results): Retorna el menor tiempo inicial y el mayor tiempo final.
+
+        uniform_time_grid(simulation_results, num_timesteps): Construye la malla uniforme de tiempo.
+
+        resample_results(simulation_results, num_timesteps, output=None, interpolation_method='linear'):
+        Interpola todas las muestras a la malla uniforme y retorna la matriz densa (muestras, timesteps),
+        en una sola pasada vectorizada cuando la interpolación es lineal.
+
+        ResampleCache(max_bytes=256 * 2**20): Caché LRU de matrices interpoladas, indexada por
+        (campaña, salida, timesteps, método de interpolación) y acotada por la memoria que ocupa.
+    """
+from collections import OrderedDict
+import numpy as np
+from instrumentation import stage
+
+def _output_key(circuit_results, output=None):
+    """Retorna la salida pedida, o el primer vector que no es el tiempo."""
+    if output is not None:
+        return output
+    return [key for key in circuit_results.keys() if key != 'time'][0]
+
+def time_bounds(simulation_results):
+    """
+    Encuentra el intervalo de tiempo que cubren todas las simulaciones.
+
+    Args:
+        simulation_results (Mapping): Diccionario con los resultados de la simulación.
+
+    Returns:
+        tuple: (tiempo mínimo entre los mínimos, tiempo máximo entre los máximos).
+    """
+    min_time, max_time = np.inf, -np.inf
+    for result in simulation_results.values():
+        times = np.asarray(result['time'])
+        min_time = min(min_time, times.min())
+        max_time = max(max_time, times.max())
+    return float(min_time), float(max_time)
+
+def uniform_time_grid(simulation_results, num_timesteps):
+    """
+    Construye una malla de tiempo uniforme que cubre todas las simulaciones.
+
+    Args:
+        simulation_results (Mapping): Diccionario con los resultados de la simulación.
+        num_timesteps (int): Número de puntos de la malla.
+
+    Returns:
+        numpy.ndarray: Malla uniforme de tiempo.
+    """
+    min_time, max_time = time_bounds(simulation_results)
+    return np.linspace(min_time, max_time, num_timesteps)
+
+def _interpolate_linear(times, values, time_grid):
+    """
+    Interpola linealmente (con extrapolación) varias muestras de distinta longitud en una sola pasada.
+
+    Las muestras se concatenan y a cada una se le suma un desplazamiento en el tiempo que las
+    deja ordenadas una después de la otra, de forma que una única búsqueda binaria encuentra
+    el segmento de todas las muestras para todos los puntos de la malla.
+
+    Args:
+        times (list): Arreglos de tiempo (ordenados) de cada muestra.
+        values (list): Arreglos de valores de cada muestra.
+        time_grid (numpy.ndarray): Malla en la cual evaluar.
+
+    Returns:
+        numpy.ndarray: Matriz (muestras, timesteps).
+    """
+    n_samples = len(times)
+    lengths = np.array([len(t) for t in times])
+    if np.any(lengths < 2):
+        raise ValueError("Cada muestra necesita al menos dos puntos para interpolar.")
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+
+    all_times = np.concatenate(times).astype(np.float64)
+    all_values = np.concatenate(values).astype(np.float64)
+
+    # Desplazamiento mayor que cualquier intervalo de tiempo involucrado
+    low = min(all_times.min(), time_grid[0])
+    high = max(all_times.max(), time_grid[-1])
+    step = 2 * (high - low) if high > low else 1.0
+    sample_ids = np.repeat(np.arange(n_samples), lengths)
+    shifted_times = all_times + sample_ids * step
+    shifted_grid = time_grid[None, :] + (np.arange(n_samples) * step)[:, None]
+
+    # Igual que interp1d: el segmento se elige con searchsorted y se recorta a los extremos
+    # de cada muestra, lo que extrapola con el primer o el último segmento
+    indices = np.searchsorted(shifted_times, shifted_grid)
+    indices = np.clip(indices, (offsets[:-1] + 1)[:, None], (offsets[1:] - 1)[:, None])
+
+    x_low, x_high = all_times[indices - 1], all_times[indices]
+    y_low, y_high = all_values[indices - 1], all_values[indices]
+    delta = x_high - x_low
+    slope = np.divide(y_high - y_low, delta, out=np.zeros_like(delta), where=delta != 0)
+    return y_low + slope * (time_grid[None, :] - x_low)
+
+def resample_results(simulation_results, num_timesteps=None, output=None, interpolation_method='linear', time_grid=None):
+    """
+    Interpola todas las muestras de una salida a una malla de tiempo uniforme.
+
+    Args:
+        simulation_results (Mapping): Diccionario con los resultados de la simulación.
+        num_timesteps (int, opcional): Número de pasos de la malla uniforme. Se ignora si se da time_grid.
+        output (str, opcional): Salida a interpolar. Si es None, en cada muestra se usa el primer
+            vector que no es el tiempo.
+        interpolation_method (str, opcional): 'linear' usa la pasada vectorizada; cualquier otro tipo
+            aceptado por scipy.interpolate.interp1d ('cubic', etc.) se interpola muestra por muestra.
+        time_grid (numpy.ndarray, opcional): Malla ya construida, por ejemplo para reutilizarla entre campañas.
+
+    Returns:
+        tuple: Un tuple conteniendo tres elementos:
+            - numpy.ndarray: La malla uniforme de tiempo.
+            - numpy.ndarray: Matriz densa (muestras, timesteps) con los valores interpolados.
+            - str: Nombre de la salida interpolada (la de la primera muestra si output es None).
+    """
+    with stage('interpolation'):
+        if time_grid is None:
+            time_grid = uniform_time_grid(simulation_results, num_timesteps)
+        time_grid = np.asarray(time_grid, dtype=np.float64)
+
+        times, values, value_key = [], [], None
+        for circuit_results in simulation_results.values():
+            key = _output_key(circuit_results, output)
+            value_key = key if value_key is None else value_key
+            times.append(np.asarray(circuit_results['time']))
+            values.append(np.asarray(circuit_results[key]))
+
+        if interpolation_method == 'linear':
+            return time_grid, _interpolate_linear(times, values, time_grid), value_key
+
+        from scipy import interpolate
+        matrix = np.empty((len(times), time_grid.size))
+        for i, (sample_times, sample_values) in enumerate(zip(times, values)):
+            f = interpolate.interp1d(
+                sample_times, sample_values, kind=interpolation_method, fill_value='extrapolate')
+            matrix[i] = f(time_grid)
+        return time_grid, matrix, value_key
+
+class ResampleCache:
+    """
+    Caché de matrices interpoladas con desalojo del elemento usado hace más tiempo.
+
+    Las llaves suelen ser tuples (id de campaña, salida, num_timesteps, interpolation_method),
+    de forma que cambiar de gráfico o repetirlo con los mismos datos no vuelve a interpolar.
+    El tamaño se acota por la suma de bytes de las matrices guardadas.
+
+    Attributes:
+        max_bytes (int): Memoria máxima que pueden ocupar las entradas.
+        nbytes (int): Memoria ocupada actualmente.
+        hits (int): Cantidad de consultas resueltas desde la caché.
+        misses (int): Cantidad de consultas que tuvieron que calcularse.
+    """
+
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _size(value):
+        return sum(getattr(item, 'nbytes', 0) for item in value)
+
+    def get(self, key, compute):
+        """
+        Retorna el valor guardado para key, o lo calcula con compute() y lo guarda.
+
+        Args:
+            key (hashable): Llave de la entrada.
+            compute (callable): Función sin argumentos que retorna el valor, por ejemplo
+                un tuple (time_grid, matrix, value_key) de resample_results.
+
+        Returns:
+            object: El valor guardado o recién calculado.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        value = compute()
+        size = self._size(value)
+        if size > self.max_bytes:
+            # No cabe, se retorna sin guardarlo
+            return value
+
+        self._entries[key] = value
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= self._size(evicted)
+        return value
+
+    def clear(self):
+        """Vacía la caché."""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
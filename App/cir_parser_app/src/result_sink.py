@@ -0,0 +1,38 @@
+"""result_sink.py contiene las herramientas para escribir resultados de simulación de forma
+incremental, sin que el diccionario completo de una campaña exista en memoria:
+        write_stream(simulations, sink, prog=False, update_callback=None, parameters=None): Consume un generador de
+        simulaciones (por ejemplo simulation.iter_netlist_simulations) escribiendo cada resultado en el sumidero,
+        por ejemplo un result_store.ColumnarResultStore.
+    """
+from instrumentation import count
+
+def write_stream(simulations, sink, prog=False, update_callback=None, parameters=None):
+    """
+    Consume un generador de simulaciones escribiendo cada muestra en un sumidero.
+
+    Args:
+        simulations (iterable): Pares (nombre, resultados), por ejemplo de simulation.iter_netlist_simulations.
+        sink (result_store.ColumnarResultStore): Sumidero con un método append(name, results).
+        prog (bool, optional): Muestra en la consola el progreso. Defaults to False.
+        update_callback (callable, optional): Recibe el número de muestras escritas. Defaults to None.
+        parameters (dict, optional): Mapea el nombre de cada muestra a sus valores de parámetros,
+        que se guardan junto a sus resultados. Defaults to None.
+
+    Returns:
+        list: Lista de salidas disponibles.
+    """
+    available_outputs = set()
+    for i, (name, results) in enumerate(simulations, 1):
+        if parameters is None:
+            sink.append(name, results)
+        else:
+            sink.append(name, results, parameters=parameters.get(name))
+        available_outputs.update(key for key in results if key != 'time')
+        count('samples')
+
+        if prog:
+            print(f"Se guardó la muestra: {str(name)}")
+        if update_callback:
+            update_callback(i)
+
+    return list(available_outputs)
@@ -0,0 +1,261 @@
+"""result_store.py contiene un almacén columnar en disco para los resultados de una campaña:
+        ColumnarResultStore(path, parameter_names=None, chunk_size=64): Escritor que agrega las muestras
+        por bloques, guardando un archivo continuo por cada vector de salida (muestras x timesteps),
+        más la matriz de parámetros muestreados.
+
+        ResultStoreReader(path): Lector que mapea a memoria los archivos del almacén, se comporta como el
+        diccionario simulation_results pero sin cargar los datos en RAM.
+
+        open_result_store(path): Abre un almacén existente para lectura.
+
+    Estructura de la carpeta:
+        index.json: Nombres de las muestras, cantidad de timesteps de cada una, nombres de los vectores
+                    y de los parámetros. Se escribe vacío al crear el almacén y se reescribe al confirmar
+                    cada bloque, así un almacén sin muestras (por ejemplo si todas fallaron) también se abre.
+        vector_<i>.f64: Valores float64 de un vector, concatenando todas las muestras una tras otra.
+        parameters.f64: Matriz (n_muestras, n_parámetros) en float64, por filas.
+    NgSpice usa pasos de tiempo adaptativos, por lo que cada muestra puede tener una cantidad distinta
+    de timesteps; los desplazamientos de cada muestra se calculan con las longitudes del índice.
+    """
+from collections.abc import Mapping
+import json
+import os
+import numpy as np
+from instrumentation import stage
+
+INDEX_FILE = "index.json"
+PARAMETERS_FILE = "parameters.f64"
+
+def _vector_file(index):
+    """Nombre del archivo de datos del vector en la posición index."""
+    return f"vector_{index}.f64"
+
+def _read_index(path):
+    """Lee el índice de un almacén, o uno vacío si no existe."""
+    index_path = os.path.join(path, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return {'names': [], 'lengths': [], 'vectors': [], 'parameter_names': []}
+    with open(index_path, 'r', encoding="UTF-8") as file:
+        return json.load(file)
+
+class ColumnarResultStore:
+    """
+    Escritor de un almacén columnar de resultados.
+
+    Las muestras se acumulan en memoria hasta completar chunk_size y entonces se agregan al
+    final de los archivos de cada vector. El índice se reescribe de forma atómica después de
+    cada bloque, así que si el proceso muere a la mitad de un bloque, al reabrir el almacén se
+    descartan los datos que no alcanzaron a confirmarse.
+
+    Su método append(name, results) permite usarlo como sumidero de result_sink.write_stream.
+
+    Attributes:
+        path (str): Carpeta del almacén.
+        parameter_names (list): Nombres de las columnas de la matriz de parámetros.
+        chunk_size (int): Cantidad de muestras por bloque de escritura.
+    """
+
+    def __init__(self, path, parameter_names=None, chunk_size=64):
+        self.path = path
+        self.chunk_size = chunk_size
+        os.makedirs(path, exist_ok=True)
+
+        self._index = _read_index(path)
+        if parameter_names is not None:
+            if self._index['names'] and list(parameter_names) != self._index['parameter_names']:
+                raise ValueError("Los nombres de los parámetros no coinciden con los del almacén existente.")
+            self._index['parameter_names'] = list(parameter_names)
+        self.parameter_names = self._index['parameter_names']
+
+        # Descartamos lo que haya quedado escrito después del último bloque confirmado
+        self._truncate_to_index()
+        self._buffer = []
+        if not os.path.exists(os.path.join(path, INDEX_FILE)):
+            self._write_index()
+
+    @property
+    def count(self):
+        """int: Número de muestras confirmadas más las que esperan en el bloque actual."""
+        return len(self._index['names']) + len(self._buffer)
+
+    @property
+    def names(self):
+        """list: Nombres de las muestras confirmadas en disco, sin las del bloque actual."""
+        return list(self._index['names'])
+
+    def _truncate_to_index(self):
+        total_length = sum(self._index['lengths'])
+        for i in range(len(self._index['vectors'])):
+            self._truncate(_vector_file(i), total_length * 8)
+        self._truncate(PARAMETERS_FILE, len(self._index['names']) * len(self.parameter_names) * 8)
+
+    def _truncate(self, file_name, size):
+        file_path = os.path.join(self.path, file_name)
+        if os.path.exists(file_path) and os.path.getsize(file_path) > size:
+            with open(file_path, 'r+b') as file:
+                file.truncate(size)
+
+    def append(self, name, results, parameters=None):
+        """
+        Agrega una muestra al almacén.
+
+        Args:
+            name (str): Nombre de la muestra.
+            results (dict): Diccionario {'time': ..., vector: ...} de la muestra.
+            parameters (array_like, optional): Valores de los parámetros de la muestra, en el orden
+            de parameter_names. Defaults to None (se guardan como NaN).
+
+        Raises:
+            ValueError: Si parameters no tiene un valor por cada nombre de parameter_names.
+        """
+        if parameters is not None:
+            # Validamos antes de acumular, una fila de otro largo desalinearía parameters.f64
+            parameters = np.asarray(parameters, dtype=np.float64)
+            if parameters.shape != (len(self.parameter_names),):
+                raise ValueError(f"La muestra {name} tiene {parameters.size} parámetros y el almacén "
+                                 f"espera {len(self.parameter_names)}.")
+        self._buffer.append((name, results, parameters))
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Escribe el bloque pendiente y confirma el índice."""
+        if not self._buffer:
+            return
+
+        with stage('store_write'):
+            total_length = sum(self._index['lengths'])
+            vectors = self._index['vectors']
+
+            # Los vectores nuevos se rellenan con NaN para las muestras anteriores
+            for _, results, _ in self._buffer:
+                for key in results:
+                    if key not in vectors:
+                        vectors.append(key)
+                        with open(os.path.join(self.path, _vector_file(len(vectors) - 1)), 'wb') as file:
+                            np.full(total_length, np.nan).tofile(file)
+
+            lengths = [len(results['time']) for _, results, _ in self._buffer]
+            for i, key in enumerate(vectors):
+                column = np.concatenate([
+                    np.asarray(results[key], dtype=np.float64) if key in results else np.full(length, np.nan)
+                    for (_, results, _), length in zip(self._buffer, lengths)
+                ])
+                with open(os.path.join(self.path, _vector_file(i)), 'ab') as file:
+                    column.tofile(file)
+
+            if self.parameter_names:
+                parameters = np.array([
+                    np.full(len(self.parameter_names), np.nan) if row is None else row
+                    for _, _, row in self._buffer
+                ])
+                with open(os.path.join(self.path, PARAMETERS_FILE), 'ab') as file:
+                    parameters.tofile(file)
+
+            self._index['names'].extend(name for name, _, _ in self._buffer)
+            self._index['lengths'].extend(lengths)
+            self._buffer = []
+            self._write_index()
+
+    def _write_index(self):
+        """Reescribe el índice de forma atómica."""
+        temporary_path = os.path.join(self.path, INDEX_FILE + ".tmp")
+        with open(temporary_path, 'w', encoding="UTF-8") as file:
+            json.dump(self._index, file)
+        os.replace(temporary_path, os.path.join(self.path, INDEX_FILE))
+
+    def close(self):
+        """Confirma las muestras pendientes."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class ResultStoreReader(Mapping):
+    """
+    Lector de un almacén columnar, con la interfaz del diccionario simulation_results.
+
+    Los datos se mapean a memoria con numpy.memmap, así que abrir un almacén es instantáneo
+    y cada muestra retornada son vistas sobre el archivo, sin copiar a RAM.
+
+    Attributes:
+        path (str): Carpeta del almacén.
+        names (list): Nombres de las muestras en el orden en que se escribieron.
+        vectors (list): Nombres de los vectores guardados.
+        parameter_names (list): Nombres de las columnas de la matriz de parámetros.
+        offsets (numpy.ndarray): Posición de inicio de cada muestra en los archivos de vectores,
+            con un elemento extra al final igual al total.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        index = _read_index(path)
+        self.names = index['names']
+        self.vectors = index['vectors']
+        self.parameter_names = index['parameter_names']
+        self.offsets = np.concatenate([[0], np.cumsum(index['lengths'], dtype=np.int64)])
+        self._positions = {name: i for i, name in enumerate(self.names)}
+        self._columns = {}
+
+    def column(self, vector):
+        """
+        Retorna el arreglo plano (mapeado a memoria) de un vector para todas las muestras.
+
+        Args:
+            vector (str): Nombre del vector, por ejemplo 'time'.
+
+        Returns:
+            numpy.memmap: Valores concatenados; la muestra i ocupa offsets[i]:offsets[i + 1].
+        """
+        if vector not in self._columns:
+            total_length = int(self.offsets[-1])
+            file_path = os.path.join(self.path, _vector_file(self.vectors.index(vector)))
+            if total_length == 0:
+                self._columns[vector] = np.zeros(0)
+            else:
+                self._columns[vector] = np.memmap(file_path, dtype=np.float64, mode='r', shape=(total_length,))
+        return self._columns[vector]
+
+    @property
+    def parameters(self):
+        """numpy.ndarray: Matriz (n_muestras, n_parámetros) mapeada a memoria."""
+        shape = (len(self.names), len(self.parameter_names))
+        if 0 in shape:
+            return np.zeros(shape)
+        return np.memmap(os.path.join(self.path, PARAMETERS_FILE), dtype=np.float64, mode='r', shape=shape)
+
+    @property
+    def available_outputs(self):
+        """list: Vectores guardados, sin contar el tiempo."""
+        return [vector for vector in self.vectors if vector != 'time']
+
+    def __getitem__(self, name):
+        i = self._positions[name]
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return {vector: self.column(vector)[start:stop] for vector in self.vectors}
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+def open_result_store(path):
+    """
+    Abre un almacén columnar existente para lectura.
+
+    Args:
+        path (str): Carpeta del almacén.
+
+    Returns:
+        ResultStoreReader: Lector con la interfaz de simulation_results.
+
+    Raises:
+        FileNotFoundError: Si la carpeta no contiene un almacén.
+    """
+    if not os.path.exists(os.path.join(path, INDEX_FILE)):
+        raise FileNotFoundError(f"No se encontró un almacén de resultados en: {path}")
+    return ResultStoreReader(path)
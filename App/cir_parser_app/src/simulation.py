@@ -3,102 +3,575 @@
         Que ejecuta una simulación a través de PySpice en NgSpice, construye un diccionario
         que contiene los archivos de origen de la simulación y en los values los resultados
         de simular.
+
+        run_netlist_simulations(netlists, debug=True, prog=False, compat=None, update_callback=None):
+        Igual que run_simulations, pero recibe los netlists ya en memoria como pares (nombre, contenido),
+        sin leer ni escribir archivos.
+
+        iter_netlist_simulations, iter_alter_simulations, iter_isolated_simulations: Versiones generadoras
+        de los motores de simulación, producen cada par (nombre, resultados) apenas termina, de forma
+        que una campaña puede escribirse a disco (ver result_sink y result_store) sin juntar todo en memoria.
+
+        run_alter_simulations(content, element_names, samples, names=None, debug=False, prog=False,
+        compat=None, update_callback=None): Carga el circuito nominal una sola vez y simula cada
+        muestra aplicando solo los valores perturbados con comandos alter de NgSpice.
+
+        iter_isolated_simulations(netlists, timeout=60.0, n_workers=1, on_failure=None, debug=False,
+        compat=None, vectors=None): Simula cada muestra en procesos vigilados, con un tiempo límite por muestra.
+        Una muestra que no converge, se cuelga o tumba a NgSpice se registra como falla, el proceso
+        se reemplaza por uno nuevo y la campaña sigue con las demás.
+
+        run_parallel_simulations(netlists, n_workers=None, timeout=60.0, on_failure=None, debug=False,
+        prog=False, compat=None, update_callback=None, vectors=None): Reparte los netlists entre varios
+        procesos vigilados como iter_isolated_simulations y junta los resultados en el mismo formato.
+
+    Todos los motores aceptan vectors, la lista de vectores de interés. Por defecto son los del .PROBE
+    del netlist: NgSpice solo guarda esos vectores (comando save) y solo esos se copian a NumPy, en
+    lugar de todos los nodos internos de los subcircuitos.
+
+    Las etapas de cada muestra (carga del netlist, análisis transitorio y copia de vectores) se miden
+    con instrumentation; los procesos trabajadores envían sus tiempos junto con los resultados.
     """
-from PySpice.Spice.NgSpice.Shared import NgSpiceShared
+from multiprocessing import connection
+import multiprocessing
+import traceback
+import time
 import numpy as np
 import os
+from netlist_parser import probe_vectors
+from instrumentation import Instrumentation, instrumented, stage, count, merge
 
-def run_simulations(cir_folder, debug=True, prog=False, compat=None, update_callback=None):
-    """_    Ejecuta las simulaciones de todos los archivos .cir en el cir_folder
-    que los contenga._
+def _new_ngspice():
+    """Crea la instancia compartida de NgSpice. PySpice se importa recién aquí, así importar este
+    módulo para muestrear, leer resultados o repartir trabajo no paga su carga.
+
+    Returns:
+        NgSpiceShared: Instancia compartida de NgSpice del proceso.
+    """
+    from PySpice.Spice.NgSpice.Shared import NgSpiceShared
+    return NgSpiceShared.new_instance()
+
+def _set_compat(ngspice, compat=None):
+    """Selecciona el modo de compatibilidad de NgSpice, si es necesario.
 
     Args:
-        cir_folder (_str_): _Dirección del folder contenedor de los archivos .cir_
+        ngspice (NgSpiceShared): Instancia compartida de NgSpice.
+        compat (str, optional): Modo de compatibilidad ("lt" o "ps"). Defaults to None.
+    """
+    if compat == "lt":
+        ngspice.exec_command("set ngbehavior=lt")
+    elif compat == "ps":
+        ngspice.exec_command("set ngbehavior=ps")
+
+def _collect_last_plot(ngspice, debug=False):
+    """Extrae los vectores de la última simulación de una instancia de NgSpice.
+
+    Args:
+        ngspice (NgSpiceShared): Instancia compartida de NgSpice.
+        debug (bool, optional): Imprime los vectores obtenidos. Defaults to False.
+
+    Returns:
+        tuple: El nombre del plot y un diccionario con 'time' y un arreglo por cada vector.
+    """
+    # Sostenemos la última salida
+    last_plot = ngspice.last_plot
+
+    # Construímos un objeto plot del ambiente PySpice
+    plot = ngspice.plot(simulation=ngspice, plot_name=last_plot)
+
+    # Salida para el desarrollador
+    if debug:
+        print(f'Los vectores obtenidos al simular son: {str(list(plot.keys()))}.')
+
+    # Extraemos los datos del objeto plot:
+    time_data = np.array(plot['time']._data) # El tiempo
+    results = {'time': time_data} # Comenzamos a llenar los resultados
+
+    # No sabemos que salidas existen ni cuantas hay
+    for key in plot.keys():
+        if key != 'time': # Pero sabemos que ya recogimos el tiempo
+
+            # Extraemos las salidas por como se les nombró en el netlist
+            results[key] = np.array(plot[key]._data)
+
+    return last_plot, results
+
+def _save_vectors(ngspice, content, vectors=None):
+    """Pide a NgSpice que guarde solo los vectores de interés del circuito recién cargado.
+
+    Args:
+        ngspice (NgSpiceShared): Instancia compartida de NgSpice, con el circuito ya cargado.
+        content (str): Contenido del netlist, para leer su .PROBE si vectors es None.
+        vectors (list | str, optional): Vectores a guardar, o 'all'. Defaults to None (.PROBE).
+    """
+    if vectors is None:
+        vectors = probe_vectors(content)
+    elif vectors == 'all':
+        return
+    # Sin vectores declarados NgSpice guarda todos, como antes
+    if vectors:
+        ngspice.exec_command("save " + " ".join(vectors))
+
+def _simulate_content(ngspice, content, compat=None, debug=False, vectors=None):
+    """Simula el contenido de un netlist en una instancia de NgSpice y extrae sus vectores.
+
+    Args:
+        ngspice (NgSpiceShared): Instancia compartida de NgSpice.
+        content (str): Contenido del netlist.
+        compat (str, optional): Modo de compatibilidad ("lt" o "ps"). Defaults to None.
+        debug (bool, optional): Imprime los vectores obtenidos. Defaults to False.
+        vectors (list | str, optional): Vectores a guardar, ver _save_vectors. Defaults to None.
+
+    Returns:
+        dict: Diccionario con 'time' y un arreglo por cada vector producido por NgSpice.
+    """
+    # Cargamos el contenido del .cir en el ambiente de ngspice
+    with stage('ngspice_load'):
+        _set_compat(ngspice, compat)
+        ngspice.load_circuit(content)
+        _save_vectors(ngspice, content, vectors)
+    with stage('ngspice_run'):
+        ngspice.run() # Simulamos
+
+    with stage('copy_vectors'):
+        last_plot, results = _collect_last_plot(ngspice, debug=debug)
+
+        # Liberamos el plot y el circuito para que la memoria de NgSpice no crezca con cada muestra
+        ngspice.destroy(last_plot)
+        ngspice.remove_circuit()
+    return results
+
+def _timed_simulation(ngspice, content, compat=None, debug=False, vectors=None):
+    """Simula como _simulate_content dentro de un proceso trabajador, midiendo sus etapas.
+
+    Returns:
+        tuple: Los resultados y las etapas medidas {etapa: [segundos, llamadas]}, para sumarlas
+        en el proceso principal con instrumentation.merge.
+    """
+    with instrumented(Instrumentation()) as recorder:
+        results = _simulate_content(ngspice, content, compat=compat, debug=debug, vectors=vectors)
+    return results, recorder.drain()
+
+def _collect_simulations(simulations, prog=False, update_callback=None):
+    """Junta en un diccionario los resultados producidos por un generador de simulaciones.
+
+    Args:
+        simulations (iterable): Pares (nombre, resultados) como los que producen los iter_*.
+        prog (bool, optional): Muestra en la consola el progreso. Defaults to False.
+        update_callback (callable, optional): Recibe el número de simulaciones completadas.
+
+    Returns:
+        tuple: El diccionario de resultados y la lista de salidas disponibles.
+    """
+    # Contenedor para los resultados
+    simulation_results = {}
+
+    # Conjunto vacío contenedor de los nombres de las salidas
+    available_outputs = set()
+
+    for i, (name, results) in enumerate(simulations, 1):
+        # Talvez producimos salidas sobre el progreso de la simulación
+        if prog:
+            print(f"Se simuló con éxito el archivo: {str(name)}")
+
+        available_outputs.update(key for key in results if key != 'time')
+        simulation_results[name] = results
+
+        # Finalmente el callback comunica a la UI que logramos simular
+        if update_callback:
+            update_callback(i)
+
+    #Fin
+    return simulation_results, list(available_outputs)
+
+def iter_netlist_simulations(netlists, debug=False, compat=None, vectors=None):
+    """_    Simula uno a uno netlists en memoria y produce cada resultado apenas termina._
+
+    Args:
+        netlists (_str | dict | iterable_): _Carpeta con archivos .cir, diccionario {nombre: contenido}
+            o iterable de pares (nombre, contenido), por ejemplo el generador
+            parameter_perturbation.perturbed_netlists_.
+        debug (bool, optional): _Controla salidas a consola útiles para el desarrollador_.
+            Defaults to False.
+        compat (_str_, optional): _Modo de compatibilidad de NgSpice (lt o ps)_. Defaults to None.
+        vectors (_list | str_, optional): _Vectores a guardar, con la sintaxis del comando save de NgSpice
+            (por ejemplo ['v(4)', 'i(vin)']), o 'all' para guardar todos_. Defaults to None (los del
+            .PROBE de cada netlist, o todos si no tiene).
+
+    Yields:
+        tuple: _(nombre, resultados) de cada muestra, con resultados en el formato
+            {'time': ..., vector: ...}_.
+    """
+    if isinstance(netlists, str):
+        netlists = _read_cir_folder(netlists)
+    elif hasattr(netlists, 'items'):
+        netlists = netlists.items()
+
+    # Declaramos una instancia de NgSpice para la simulación
+    ngspice = _new_ngspice()
+
+    # Recorremos los netlists simulando cada uno
+    for name, content in netlists:
+        yield name, _simulate_content(ngspice, content, compat=compat, debug=debug, vectors=vectors)
+
+def run_netlist_simulations(netlists, debug=True, prog=False, compat=None, update_callback=None, vectors=None):
+    """_    Ejecuta las simulaciones de netlists que ya se encuentran en memoria._
+
+    Args:
+        netlists (_dict | iterable_): _Diccionario {nombre: contenido} o iterable de pares
+            (nombre, contenido), por ejemplo el generador parameter_perturbation.perturbed_netlists_.
         debug (bool, optional): _Controla salidas a consola útiles para el desarrollador_.
             Defaults to True.
         prog (bool, optional): _Muestra en la consola el progreso de las simulaciones_.
             Defaults to False.
         compat (_str_, optional): _Controla la el modo de compatibilidad de PySpice con
             LtSpice y PSpice (lt o ps)_. Defaults to None.
-        update_callback (_callable_, optional): _Función de callback para actualizar el progreso. 
+        update_callback (_callable_, optional): _Función de callback para actualizar el progreso.
             Toma un argumento entero que representa el número de simulaciones completadas._
             Defaults to None.
+        vectors (_list | str_, optional): _Vectores a guardar, con la sintaxis del comando save de NgSpice
+            (por ejemplo ['v(4)', 'i(vin)']), o 'all' para guardar todos_. Defaults to None (los del
+            .PROBE de cada netlist, o todos si no tiene).
 
+    Returns:
+    tuple: Un tuple conteniendo dos elementos:
+            - dict: Diccionario con los resultados de la simulación, indexado por nombre.
+            - list: Lista de salidas disponibles.
+    """
+    return _collect_simulations(iter_netlist_simulations(netlists, debug=debug, compat=compat, vectors=vectors),
+                                prog=prog, update_callback=update_callback)
+
+def iter_alter_simulations(content, element_names, samples, names=None, debug=False, compat=None, vectors=None):
+    """_    Simula una campaña cargando el circuito nominal una sola vez y aplicando a cada
+    muestra únicamente los valores perturbados mediante comandos alter._
+
+    NgSpice no vuelve a leer ni a expandir el netlist (ni sus bibliotecas de subcircuitos)
+    por cada muestra, solo cambia los valores de los elementos y vuelve a correr el análisis.
+
+    Args:
+        content (_str_): _Contenido del netlist nominal_.
+        element_names (_list_): _Nombres de los elementos a alterar, en el orden de las
+            columnas de samples_.
+        samples (_numpy.ndarray_): _Matriz (n_muestras, n_elementos) con los valores de cada muestra,
+            por ejemplo la retornada por parameter_perturbation.sample_parameter_matrix_.
+        names (_list_, optional): _Nombre de cada muestra en los resultados_.
+            Defaults to None (f"new_cir_{i}.cir").
+        debug (bool, optional): _Controla salidas a consola útiles para el desarrollador_.
+            Defaults to False.
+        compat (_str_, optional): _Modo de compatibilidad de NgSpice (lt o ps)_. Defaults to None.
+        vectors (_list | str_, optional): _Vectores a guardar, con la sintaxis del comando save de NgSpice
+            (por ejemplo ['v(4)', 'i(vin)']), o 'all' para guardar todos_. Defaults to None (los del
+            .PROBE de cada netlist, o todos si no tiene).
+
+    Yields:
+        tuple: _(nombre, resultados) de cada muestra apenas termina de simularse_.
+    """
+    samples = np.atleast_2d(samples)
+    if names is None:
+        names = [f"new_cir_{i}.cir" for i in range(samples.shape[0])]
+
+    # Declaramos una instancia de NgSpice y cargamos el circuito nominal una sola vez
+    ngspice = _new_ngspice()
+    with stage('ngspice_load'):
+        _set_compat(ngspice, compat)
+        ngspice.load_circuit(content)
+        _save_vectors(ngspice, content, vectors)
+
+    for name, row in zip(names, samples.tolist()):
+        # Solo cambiamos los valores de los elementos perturbados
+        with stage('ngspice_alter'):
+            for element_name, value in zip(element_names, row):
+                ngspice.exec_command(f"alter {element_name} = {value!r}")
+        with stage('ngspice_run'):
+            ngspice.run()
+
+        with stage('copy_vectors'):
+            last_plot, results = _collect_last_plot(ngspice, debug=debug)
+
+            # Liberamos el plot para que la memoria de NgSpice no crezca con cada muestra
+            ngspice.destroy(last_plot)
+
+        yield name, results
+
+def run_alter_simulations(content, element_names, samples, names=None, debug=True, prog=False, compat=None, update_callback=None, vectors=None):
+    """_    Simula una campaña en modo alter (ver iter_alter_simulations) y junta los resultados._
+
+    Args:
+        content (_str_): _Contenido del netlist nominal_.
+        element_names (_list_): _Nombres de los elementos a alterar, en el orden de las
+            columnas de samples_.
+        samples (_numpy.ndarray_): _Matriz (n_muestras, n_elementos) con los valores de cada muestra_.
+        names (_list_, optional): _Nombre de cada muestra en el diccionario de resultados_.
+            Defaults to None (f"new_cir_{i}.cir").
+        debug (bool, optional): _Controla salidas a consola útiles para el desarrollador_.
+            Defaults to True.
+        prog (bool, optional): _Muestra en la consola el progreso de las simulaciones_.
+            Defaults to False.
+        compat (_str_, optional): _Modo de compatibilidad de NgSpice (lt o ps)_. Defaults to None.
+        update_callback (_callable_, optional): _Función de callback que recibe el número de
+            simulaciones completadas_. Defaults to None.
+        vectors (_list | str_, optional): _Vectores a guardar, con la sintaxis del comando save de NgSpice
+            (por ejemplo ['v(4)', 'i(vin)']), o 'all' para guardar todos_. Defaults to None (los del
+            .PROBE de cada netlist, o todos si no tiene).
 
     Returns:
     tuple: Un tuple conteniendo dos elementos:
-            - dict: Diccionario con los resultados de la simulación.
+            - dict: Diccionario con los resultados de la simulación, indexado por nombre.
             - list: Lista de salidas disponibles.
     """
+    return _collect_simulations(iter_alter_simulations(content, element_names, samples, names=names,
+                                                       debug=debug, compat=compat, vectors=vectors),
+                                prog=prog, update_callback=update_callback)
+
+def _read_cir_folder(cir_folder):
+    """Genera los pares (nombre, contenido) de los archivos .cir de una carpeta.
 
+    Args:
+        cir_folder (str): Dirección del folder contenedor de los archivos .cir.
+
+    Yields:
+        tuple: (nombre del archivo, contenido).
+    """
     # Si el folder no termina con el separador del sistema operativo
     if not cir_folder.endswith(os.path.sep):
         # Lo añadimos
         cir_folder += os.path.sep
-    
+
     # Entonces recorremos todos los archivos cir en el folder
     cir_files = [f for f in os.listdir(cir_folder) if f.endswith('.cir')]
 
-    # Declaramos una instancia de NgSpice para la simulación
-    ngspice = NgSpiceShared.new_instance()
+    for cir_file in cir_files:
+        # Abrimos el archivo, ojo al encoding
+        with stage('read_files'), open(cir_folder + cir_file, 'r', encoding="UTF-8") as file:
+            content = file.read()
+        yield cir_file, content
 
-    # Contenedor para los resultados
-    simulation_results = {}
+def run_simulations(cir_folder, debug=True, prog=False, compat=None, update_callback=None, vectors=None):
+    """_    Ejecuta las simulaciones de todos los archivos .cir en el cir_folder
+    que los contenga._
 
-    # Conjunto vacío contenedor de los nombres de las salidas
-    available_outputs = set()
-    
-    # Recorremos la carpeta simulando todos los archivos cir
-    for i, cir_file in enumerate(cir_files, 1):
+    Args:
+        cir_folder (_str_): _Dirección del folder contenedor de los archivos .cir_
+        debug (bool, optional): _Controla salidas a consola útiles para el desarrollador_.
+            Defaults to True.
+        prog (bool, optional): _Muestra en la consola el progreso de las simulaciones_.
+            Defaults to False.
+        compat (_str_, optional): _Controla la el modo de compatibilidad de PySpice con
+            LtSpice y PSpice (lt o ps)_. Defaults to None.
+        update_callback (_callable_, optional): _Función de callback para actualizar el progreso. 
+            Toma un argumento entero que representa el número de simulaciones completadas._
+            Defaults to None.
+        vectors (_list | str_, optional): _Vectores a guardar, con la sintaxis del comando save de NgSpice
+            (por ejemplo ['v(4)', 'i(vin)']), o 'all' para guardar todos_. Defaults to None (los del
+            .PROBE de cada netlist, o todos si no tiene).
 
-        # Establecemos el camino al archivo que queremos simular
-        full_cir_path = cir_folder + cir_file
+    Returns:
+    tuple: Un tuple conteniendo dos elementos:
+            - dict: Diccionario con los resultados de la simulación.
+            - list: Lista de salidas disponibles.
+    """
+    return run_netlist_simulations(_read_cir_folder(cir_folder), debug=debug, prog=prog,
+                                   compat=compat, update_callback=update_callback, vectors=vectors)
 
-        # Abrimos el archivo, ojo al encoding
-        with open(full_cir_path, 'r', encoding="UTF-8") as file:
-            content = file.read()
-        
-        # Seleccionamos el modo de compatibilidad, si es necesario
-        if compat == "lt":
-            ngspice.exec_command("set ngbehavior=lt")
-        elif compat == "ps":
-            ngspice.exec_command("set ngbehavior=ps")
-        
-        # Cargamos el contenido del .cir en el ambiente de ngspice
-        ngspice.load_circuit(content)
-        ngspice.run() # Simulamos
-        
-        # Talvez producimos salidas sobre el progreso de la simulación
-        if prog:
-            print(f"Se simuló con éxito el archivo: {str(cir_file)}")
-        
-        # Sostenemos la última salida
-        last_plot = ngspice.last_plot
-
-        # Construímos un objeto plot del ambiente PySpice
-        plot = ngspice.plot(simulation=ngspice, plot_name=last_plot)
-        
-        # Salida para el desarrollador
+
+def _isolated_worker(conn, compat=None, debug=False, vectors=None):
+    """Ciclo de un proceso vigilado: recibe (nombre, contenido) y responde con el resultado y sus
+    etapas medidas, o con el error. Si NgSpice no puede iniciar, responde a cada muestra con
+    'init_error' y el traceback, que no es una falla de la muestra.
+
+    Args:
+        conn (multiprocessing.connection.Connection): Extremo del proceso en la tubería.
+        compat (str, optional): Modo de compatibilidad ("lt" o "ps"). Defaults to None.
+        debug (bool, optional): Imprime los vectores obtenidos. Defaults to False.
+        vectors (list | str, optional): Vectores a guardar, ver _save_vectors. Defaults to None.
+    """
+    ngspice, init_error = None, None
+    try:
+        ngspice = _new_ngspice()
+    except Exception:
+        init_error = traceback.format_exc()
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        name, content = job
+        if init_error is not None:
+            conn.send(('init_error', name, init_error))
+            continue
+        try:
+            conn.send(('ok', name, _timed_simulation(ngspice, content, compat=compat, debug=debug, vectors=vectors)))
+        except Exception:
+            conn.send(('error', name, traceback.format_exc()))
+
+class _WatchedWorker:
+    """Proceso trabajador con su tubería y la muestra que está simulando."""
+
+    def __init__(self, context, compat=None, debug=False, vectors=None):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_isolated_worker, args=(child_conn, compat, debug, vectors), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.name = None
+        self.deadline = None
+
+    def submit(self, name, content, timeout):
+        self.name = name
+        self.deadline = time.monotonic() + timeout
+        self.conn.send((name, content))
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+def iter_isolated_simulations(netlists, timeout=60.0, n_workers=1, on_failure=None, debug=False, compat=None, vectors=None):
+    """_    Simula netlists en procesos vigilados, cada uno con su propia instancia de NgSpice,
+    con un tiempo límite por muestra._
+
+    Cada proceso recibe una muestra a la vez por una tubería. Si la muestra excede el tiempo
+    límite el proceso se mata; si NgSpice lanza un error o el proceso muere, la muestra también
+    se da por fallida. En todos los casos el proceso se reemplaza por uno nuevo, así una muestra
+    problemática no deja a NgSpice en mal estado para las siguientes, y la campaña continúa.
+    Si en cambio NgSpice no puede iniciar en el proceso (por ejemplo, falta la librería), ninguna
+    muestra tiene la culpa: se lanza RuntimeError con el error del proceso y la campaña se detiene.
+
+    Args:
+        netlists (_str | dict | iterable_): _Carpeta con archivos .cir, diccionario {nombre: contenido}
+            o iterable de pares (nombre, contenido)_.
+        timeout (float, optional): _Segundos máximos de simulación por muestra_. Defaults to 60.0.
+        n_workers (int, optional): _Cantidad de procesos vigilados en paralelo_. Defaults to 1.
+        on_failure (_callable_, optional): _Recibe (nombre, texto del error) de cada muestra fallida_.
+            Defaults to None (las fallas solo se imprimen si debug).
+        debug (bool, optional): _Controla salidas a consola útiles para el desarrollador_.
+            Defaults to False.
+        compat (_str_, optional): _Modo de compatibilidad de NgSpice (lt o ps)_. Defaults to None.
+        vectors (_list | str_, optional): _Vectores a guardar, con la sintaxis del comando save de NgSpice
+            (por ejemplo ['v(4)', 'i(vin)']), o 'all' para guardar todos_. Defaults to None (los del
+            .PROBE de cada netlist, o todos si no tiene).
+
+    Yields:
+        tuple: _(nombre, resultados) de cada muestra exitosa, en el orden en que terminan_.
+
+    Raises:
+        RuntimeError: Si NgSpice no puede iniciar en un proceso vigilado.
+    """
+    if isinstance(netlists, str):
+        netlists = _read_cir_folder(netlists)
+    elif hasattr(netlists, 'items'):
+        netlists = netlists.items()
+    netlists = iter(netlists)
+
+    def fail(name, error):
+        count('failed')
         if debug:
-            print(f'Los vectores obtenidos al simular son: {str(list(plot.keys()))}.')
-        
-        # Extraemos los datos del objeto plot:
-        time_data = np.array(plot['time']._data) # El tiempo
-        results = {'time': time_data} # Comenzamos a llenar los resultados
-        
-        # No sabemos que salidas existen ni cuantas hay
-        for key in plot.keys():
-            if key != 'time': # Pero sabemos que ya recogimos el tiempo
-
-                # Extraemos las salidas por como se les nombró en el netlist
-                results[key] = np.array(plot[key]._data)
-                available_outputs.add(key)
-        
-        simulation_results[cir_file] = results
-        
-        # Finalmente el callback comunica a la UI que logramos simular
-        if update_callback:
-            update_callback(i)
-    
-    #Fin
-    return simulation_results, list(available_outputs)
\ No newline at end of file
+            print(f"Falló la simulación de {name}: {error}")
+        if on_failure:
+            on_failure(name, error)
+
+    # Usamos spawn para que cada proceso cargue su propia copia de la librería de NgSpice
+    context = multiprocessing.get_context('spawn')
+    idle = [_WatchedWorker(context, compat, debug, vectors) for _ in range(max(1, n_workers))]
+    busy = {}
+    try:
+        while True:
+            while idle:
+                job = next(netlists, None)
+                if job is None:
+                    break
+                worker = idle.pop()
+                worker.submit(job[0], job[1], timeout)
+                busy[worker.conn] = worker
+            if not busy:
+                break
+
+            wait_time = max(0.0, min(worker.deadline for worker in busy.values()) - time.monotonic())
+            for conn in connection.wait(list(busy), timeout=wait_time):
+                worker = busy.pop(conn)
+                try:
+                    status, name, payload = conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join()
+                    fail(worker.name, f"El proceso de NgSpice terminó con código {worker.process.exitcode}.")
+                    worker.stop(kill=True)
+                    idle.append(_WatchedWorker(context, compat, debug, vectors))
+                    continue
+                if status == 'init_error':
+                    worker.stop()
+                    raise RuntimeError(f"NgSpice no pudo iniciar en el proceso de simulación:\n{payload}")
+                if status == 'ok':
+                    idle.append(worker)
+                    results, stages = payload
+                    merge(stages)
+                    yield name, results
+                else:
+                    # Reciclamos el proceso, NgSpice puede quedar en mal estado después de un error
+                    fail(name, payload)
+                    worker.stop()
+                    idle.append(_WatchedWorker(context, compat, debug, vectors))
+
+            now = time.monotonic()
+            for conn, worker in list(busy.items()):
+                if worker.deadline <= now:
+                    del busy[conn]
+                    fail(worker.name, f"Se excedió el tiempo límite de {timeout} s.")
+                    worker.stop(kill=True)
+                    idle.append(_WatchedWorker(context, compat, debug, vectors))
+    finally:
+        for worker in idle:
+            worker.stop()
+        for worker in busy.values():
+            worker.stop(kill=True)
+
+def run_parallel_simulations(netlists, n_workers=None, timeout=60.0, on_failure=None, debug=False, prog=False, compat=None, update_callback=None, vectors=None):
+    """_    Ejecuta las simulaciones repartidas en varios procesos vigilados, cada uno con su propia
+    instancia de NgSpice (ver iter_isolated_simulations), y junta los resultados en un diccionario._
+
+    Args:
+        netlists (_str | dict | iterable_): _Carpeta con archivos .cir, diccionario {nombre: contenido}
+            o iterable de pares (nombre, contenido)_.
+        n_workers (int, optional): _Cantidad de procesos trabajadores_. Defaults to None
+            (os.cpu_count()).
+        timeout (float, optional): _Segundos máximos de simulación por muestra_. Defaults to 60.0.
+        on_failure (_callable_, optional): _Recibe (nombre, texto del error) de cada muestra fallida_.
+            Defaults to None.
+        debug (bool, optional): _Controla salidas a consola útiles para el desarrollador_.
+            Defaults to False.
+        prog (bool, optional): _Muestra en la consola el progreso de las simulaciones_.
+            Defaults to False.
+        compat (_str_, optional): _Modo de compatibilidad de NgSpice (lt o ps)_. Defaults to None.
+        update_callback (_callable_, optional): _Función de callback que recibe el número total de
+            simulaciones completadas entre todos los procesos_. Defaults to None.
+        vectors (_list | str_, optional): _Vectores a guardar, con la sintaxis del comando save de NgSpice
+            (por ejemplo ['v(4)', 'i(vin)']), o 'all' para guardar todos_. Defaults to None (los del
+            .PROBE de cada netlist, o todos si no tiene).
+
+    Returns:
+    tuple: Un tuple conteniendo dos elementos:
+            - dict: Diccionario con los resultados de las muestras exitosas, en el orden de entrada.
+            - list: Lista de salidas disponibles.
+    """
+    if isinstance(netlists, str):
+        netlists = _read_cir_folder(netlists)
+    elif hasattr(netlists, 'items'):
+        netlists = netlists.items()
+
+    # Anotamos el orden de entrada a medida que los netlists se consumen
+    order = []
+    def track(pairs):
+        for name, content in pairs:
+            order.append(name)
+            yield name, content
+
+    unordered_results, available_outputs = _collect_simulations(
+        iter_isolated_simulations(track(netlists), timeout=timeout, n_workers=n_workers or os.cpu_count() or 1,
+                                  on_failure=on_failure, debug=debug, compat=compat, vectors=vectors),
+        prog=prog, update_callback=update_callback)
+
+    simulation_results = {name: unordered_results[name] for name in order if name in unordered_results}
+    return simulation_results, available_outputs
@@ -1,14 +1,24 @@
 import os
 from file_operations import read_cir_file, create_new_cir_file
-from parameter_perturbation import parameter_perturbator
-from simulation import run_simulations
-from plotting import estimate_distribution, plot_distributions, plot_density
+from parameter_perturbation import perturbed_netlists, perturbed_columns, supports_alter, parameter_column_names, SAMPLING_METHODS
+from simulation import iter_isolated_simulations, iter_alter_simulations
+from result_sink import write_stream
+from result_store import ColumnarResultStore, open_result_store
+from resampling import resample_results, ResampleCache
+from adaptive_campaign import run_adaptive_campaign
+from online_statistics import OutputAccumulator, accumulate
+from campaign import Campaign, run_campaign, resume_campaign, CAMPAIGN_FILE, FAILURES_FILE
+from plotting import estimate_distribution, plot_distributions, plot_density, plot_histogram2d
+from instrumentation import Instrumentation, instrumented
 from ltspice_converter import LTSpice_to_float, float_to_LTSpice
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog
 from tkinter import ttk
 import threading
+import tempfile
+import time
+import functools
 import regex as re
 
 class ElementDialog(simpledialog.Dialog):
@@ -87,10 +97,29 @@ class UI:
         num_files (int): Número de archivos a generar en la perturbación.
         num_timesteps (int): Número de pasos de tiempo para la simulación.
         num_bins (int): Número de bins para los gráficos de densidad.
+        num_workers (int): Número de procesos que simulan en paralelo (1 simula en serie). El modo alter
+            simula siempre en un solo proceso y no lo usa.
+        sample_timeout (float): Segundos máximos de simulación por muestra antes de darla por fallida.
+        all_vectors (tk.BooleanVar): Indica si se guardan todos los vectores, y no solo los del .PROBE.
+        profile_run (tk.BooleanVar): Indica si la simulación se perfila con cProfile y tracemalloc.
+        instrumentation (Instrumentation): Tiempos por etapa de la última simulación.
         running_simulation (bool): Indica si una simulación está en progreso.
         generating_files (bool): Indica si se están generando archivos.
-        simulation_results (dict): Resultados de la simulación.
+        simulation_results (Mapping): Resultados de la simulación, leídos desde el almacén de la campaña.
+        netlists (dict): Netlists perturbados generados en memoria, indexados por nombre.
+        write_files (tk.BooleanVar): Indica si además se escriben los netlists en disco.
+        alter_mode (tk.BooleanVar): Indica si se simula cargando el circuito nominal una vez y aplicando alter.
+        extended_targets (tk.BooleanVar): Indica si al cargar se incluyen los .PARAM y los elementos de
+            subcircuitos por instancia.
+        sampling_method (tk.StringVar): Método de muestreo de la campaña ('random', 'sobol', 'halton' o 'lhs').
+        campaign_seed (tk.StringVar): Semilla raíz de la próxima campaña, vacía para tomarla del sistema.
+        campaign (Campaign): Campaña de la última generación, se guarda junto a sus resultados.
+        samples (tuple): Tuple (lines, samples) con la matriz de valores de la última generación.
+        campaign_id (int): Identificador de los resultados actuales, cambia con cada simulación o carga.
+        resample_cache (ResampleCache): Caché de las matrices interpoladas usadas por los gráficos.
+        live_statistics (OutputAccumulator): Estadísticas en línea de la salida seleccionada durante la simulación.
         cir_dict (dict): Diccionario con la información del archivo .cir.
+        lines_by_name (dict): Mapea el nombre de cada elemento a su línea, para buscarlo en tiempo constante.
         dist (dict): Diccionario con las distribuciones de perturbación por línea.
         scale (dict): Diccionario con las escalas de perturbación por línea.
         simulation_counter (int): Contador de simulaciones ejecutadas.
@@ -104,10 +133,27 @@ class UI:
         self.num_files = 10
         self.num_timesteps = 200
         self.num_bins = 200
+        self.num_workers = 1
+        self.sample_timeout = 60.0
+        self.all_vectors = None
+        self.profile_run = None
+        self.instrumentation = None
         self.running_simulation = False
         self.generating_files = False
         self.simulation_results = None
+        self.netlists = None
+        self.write_files = None
+        self.alter_mode = None
+        self.extended_targets = None
+        self.sampling_method = None
+        self.campaign_seed = None
+        self.campaign = None
+        self.samples = None
+        self.campaign_id = 0
+        self.resample_cache = ResampleCache()
+        self.live_statistics = None
         self.cir_dict = {}
+        self.lines_by_name = {}
         self.dist = {}
         self.scale = {}
         self.simulation_counter = 0
@@ -149,10 +195,7 @@ class UI:
         Returns:
             int or None: Número de línea del elemento si se encuentra, None si no se encuentra.
         """
-        for line, element in self.cir_dict.items():
-            if element['name'] == name:
-                return line
-        return None
+        return self.lines_by_name.get(name)
 
     def load_file(self):
         """
@@ -163,7 +206,12 @@ class UI:
         filename = filedialog.askopenfilename()
         if filename:
             self.current_file = filename
-            self.cir_dict = read_cir_file(self.current_file)
+            extended = bool(self.extended_targets and self.extended_targets.get())
+            self.cir_dict = read_cir_file(self.current_file, incluir_parametros=extended, incluir_subcircuitos=extended)
+            # Índice nombre -> línea, si un nombre se repite se queda con la primera aparición
+            self.lines_by_name = {}
+            for line, element in self.cir_dict.items():
+                self.lines_by_name.setdefault(element['name'], line)
             self.dist = {key: self.cir_dict[key]['dist'] for key in self.cir_dict.keys()}
             self.scale = {key: self.cir_dict[key]['scale'] for key in self.cir_dict.keys()}
             self.populate_table()
@@ -186,8 +234,10 @@ class UI:
 
     def generate_files(self):
         """
-        Genera archivos perturbados basados en el archivo .cir cargado.
+        Genera los netlists perturbados basados en el archivo .cir cargado.
 
+        Los netlists se guardan en memoria y solo se escriben en "new_cir_files"
+        si la opción correspondiente está activa.
         Utiliza un hilo separado para no bloquear la interfaz de usuario.
         """
         if not self.current_file:
@@ -196,19 +246,32 @@ class UI:
         if self.generating_files:
             messagebox.showwarning("Advertencia", "La generación de archivos ya está en progreso.")
             return
+        # La semilla se revisa aquí, en el hilo de la interfaz, antes de empezar a generar
+        try:
+            seed = self.selected_seed()
+        except ValueError:
+            messagebox.showwarning("Advertencia", "La semilla debe ser un número entero.")
+            return
+        sampling_method = self.sampling_method.get() if self.sampling_method else 'random'
 
         def generate():
             self.generating_files = True
-            parameter_perturbator(
-                self.cir_dict,
-                dist=self.dist,
-                scale=self.scale,
-                n_files=self.num_files,
-                input_file_name=self.current_file,
-                debug=False
-            )
-            self.generating_files = False
-            messagebox.showinfo("Info", "Archivos generados con éxito.")
+            try:
+                self.campaign = Campaign(self.cir_dict, self.current_file, self.num_files,
+                                         seed=seed, sampling_method=sampling_method)
+                self.samples = self.campaign.sample_rows(range(self.num_files))
+                self.netlists = dict(perturbed_netlists(
+                    self.cir_dict,
+                    input_file_name=self.current_file,
+                    escribir_archivos=bool(self.write_files and self.write_files.get()),
+                    muestras=self.samples
+                ))
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudieron generar los netlists: {e}")
+                return
+            finally:
+                self.generating_files = False
+            messagebox.showinfo("Info", "Netlists generados con éxito.")
 
         thread = threading.Thread(target=generate)
         thread.start()
@@ -224,34 +287,363 @@ class UI:
 
     def run_simulations(self):
         """
-        Ejecuta las simulaciones de los archivos generados.
-
+        Ejecuta las simulaciones de los netlists generados.
+
+        Si hay netlists en memoria se simulan directamente, si no se simulan
+        los archivos en "new_cir_files". Cada muestra se escribe a medida que termina
+        en un almacén columnar dentro de "resultados", que luego se lee mapeado a memoria.
+        Las campañas generadas en la interfaz se simulan con puntos de control, así que si
+        se interrumpen pueden retomarse con "Reanudar Campaña".
+        Si hay una salida seleccionada, sus estadísticas se acumulan en línea para poder
+        graficar las distribuciones mientras la campaña avanza.
+        El tiempo de cada etapa queda en instrumentation.json dentro del almacén y puede verse
+        con el botón "Rendimiento".
         Utiliza un hilo separado para no bloquear la interfaz de usuario.
         Actualiza la lista de salidas disponibles al finalizar.
         """
         if self.running_simulation:
             messagebox.showwarning("Advertencia", "La simulación ya está en progreso.")
             return
+        if self.uses_alter() and self.num_workers > 1:
+            messagebox.showwarning("Advertencia", "El modo alter carga el circuito una sola vez en un solo proceso, "
+                                   f"se ignoran los {self.num_workers} procesos de simulación.")
 
         def run_simulation():
             self.running_simulation = True
-            self.simulation_results, self.available_outputs = run_simulations(
-                "new_cir_files", 
-                prog=True, 
-                update_callback=self.update_simulation_counter
-            )
-            self.running_simulation = False
-            self.output_selection['values'] = self.available_outputs
+            campaign = None
+            store_path = None
+            try:
+                # Cada campaña se guarda en su propio almacén, así no se pierde al cerrar la ventana
+                store_path = self.new_store_path()
+                parameter_names, parameters = None, None
+                if self.samples is not None and self.netlists:
+                    lines, values = self.samples
+                    parameter_names = parameter_column_names(self.cir_dict, lines)
+                    parameters = dict(zip(self.netlists, values))
+
+                selected_output = self.output_selection.get()
+                self.live_statistics = None
+                if selected_output:
+                    self.live_statistics = OutputAccumulator(selected_output, num_timesteps=self.num_timesteps,
+                                                             num_bins=self.num_bins)
+                self.instrumentation = self.new_instrumentation()
+
+                if self.campaign is not None and self.netlists and not self.uses_alter():
+                    # Cada simulación parte de una copia sin muestras terminadas de la campaña generada,
+                    # con la misma semilla, así volver a simular repite las mismas muestras en el almacén nuevo
+                    campaign = self.campaign.portion(0, self.campaign.n_samples)
+                    simulate = self.netlist_simulator()
+                    if self.live_statistics is not None:
+                        simulate = lambda netlists, on_failure, base=simulate: accumulate(
+                            base(netlists, on_failure=on_failure), self.live_statistics)
+                    self.available_outputs = run_campaign(campaign, store_path, simulate=simulate, prog=True,
+                                                          update_callback=self.update_simulation_counter,
+                                                          instrumentation=self.instrumentation)
+                else:
+                    stream = self.simulation_stream()
+                    if self.live_statistics is not None:
+                        stream = accumulate(stream, self.live_statistics)
+                    with instrumented(self.instrumentation), \
+                            ColumnarResultStore(store_path, parameter_names=parameter_names) as store:
+                        self.available_outputs = write_stream(
+                            stream,
+                            store,
+                            prog=True,
+                            update_callback=self.update_simulation_counter,
+                            parameters=parameters
+                        )
+                    self.instrumentation.save(store_path)
+                self.simulation_results = open_result_store(store_path)
+                self.campaign_id += 1
+                self.output_selection['values'] = self.available_outputs
+            except Exception as e:
+                if campaign is not None:
+                    messagebox.showerror("Error", f"La campaña se interrumpió: {e}\nPuede reanudarse desde {store_path}.")
+                else:
+                    messagebox.showerror("Error", f"La simulación se interrumpió: {e}")
+                return
+            finally:
+                self.running_simulation = False
+
+            if campaign is not None and campaign.failed:
+                messagebox.showwarning("Advertencia", f"Fallaron {len(campaign.failed)} muestras, "
+                                       f"ver {os.path.join(store_path, FAILURES_FILE)}.")
 
         thread = threading.Thread(target=run_simulation)
         thread.start()
 
+    def run_adaptive_simulations(self):
+        """
+        Ejecuta una campaña adaptativa que simula por bloques hasta que el intervalo de confianza
+        de la media de la salida seleccionada (o de todas, si no hay una) es suficientemente angosto.
+
+        El ancho objetivo se pide como porcentaje del pico de la media, y num_files actúa como
+        máximo de muestras. Al terminar se informa cuántas muestras hicieron falta. La campaña usa la
+        semilla de la interfaz y queda guardada en campaign.json junto a sus resultados.
+        """
+        if not self.current_file:
+            messagebox.showwarning("Advertencia", "Por favor, carga un archivo .cir primero.")
+            return
+        if self.running_simulation:
+            messagebox.showwarning("Advertencia", "La simulación ya está en progreso.")
+            return
+        try:
+            seed = self.selected_seed()
+        except ValueError:
+            messagebox.showwarning("Advertencia", "La semilla debe ser un número entero.")
+            return
+        target = simpledialog.askfloat(
+            "Campaña Adaptativa", "Ancho objetivo del intervalo de confianza al 95% (% del pico):",
+            initialvalue=1.0, minvalue=0.0)
+        if target is None:
+            return
+
+        def run_simulation():
+            self.running_simulation = True
+            try:
+                selected_output = self.output_selection.get()
+                simulate = self.netlist_simulator()
+
+                store_path = self.new_store_path()
+                parameter_names = parameter_column_names(self.cir_dict)
+                self.instrumentation = self.new_instrumentation()
+                with instrumented(self.instrumentation), \
+                        ColumnarResultStore(store_path, parameter_names=parameter_names) as store:
+                    adaptive = run_adaptive_campaign(
+                        self.cir_dict,
+                        self.current_file,
+                        target_width=target / 100,
+                        outputs=[selected_output] if selected_output else None,
+                        num_timesteps=self.num_timesteps,
+                        max_samples=self.num_files,
+                        sampling_method=self.sampling_method.get() if self.sampling_method else 'random',
+                        simulate=simulate,
+                        sink=store,
+                        update_callback=lambda n, width: self.update_simulation_counter(n),
+                        seed=seed
+                    )
+                # La semilla y las muestras simuladas quedan junto a los resultados para repetir la campaña
+                adaptive['campaign'].save(store_path)
+                self.instrumentation.save(store_path)
+                self.simulation_results = open_result_store(store_path)
+                self.campaign_id += 1
+                self.available_outputs = self.simulation_results.available_outputs
+                self.output_selection['values'] = self.available_outputs
+            except Exception as e:
+                messagebox.showerror("Error", f"La campaña adaptativa se interrumpió: {e}")
+                return
+            finally:
+                self.running_simulation = False
+
+            width = max(adaptive['ci_width'].values()) if adaptive['ci_width'] else float('nan')
+            if adaptive['converged']:
+                messagebox.showinfo("Info", f"Convergió con {adaptive['n_samples']} muestras (ancho {width:.2%}).")
+            else:
+                messagebox.showinfo("Info", f"No convergió en {adaptive['n_samples']} muestras (ancho {width:.2%}).")
+
+        thread = threading.Thread(target=run_simulation)
+        thread.start()
+
+    def resume_simulations(self):
+        """
+        Retoma una campaña interrumpida desde su carpeta en "resultados".
+
+        Solo se simulan las muestras que no alcanzaron a guardarse; la semilla y las distribuciones
+        se leen del campaign.json de la carpeta, así las muestras retomadas son las mismas que
+        se habrían simulado sin la interrupción.
+        """
+        if self.running_simulation:
+            messagebox.showwarning("Advertencia", "La simulación ya está en progreso.")
+            return
+
+        store_path = filedialog.askdirectory(initialdir="resultados", title="Seleccionar campaña a reanudar")
+        if not store_path:
+            return
+        if not os.path.exists(os.path.join(store_path, CAMPAIGN_FILE)):
+            messagebox.showwarning("Advertencia", "La carpeta no contiene una campaña para reanudar.")
+            return
+
+        def run_simulation():
+            self.running_simulation = True
+            try:
+                self.live_statistics = None
+                self.instrumentation = self.new_instrumentation()
+                self.campaign, _ = resume_campaign(store_path, simulate=self.netlist_simulator(), prog=True,
+                                                   update_callback=self.update_simulation_counter,
+                                                   instrumentation=self.instrumentation)
+                self.simulation_results = open_result_store(store_path)
+                self.campaign_id += 1
+                self.available_outputs = self.simulation_results.available_outputs
+                self.output_selection['values'] = self.available_outputs
+            except Exception as e:
+                messagebox.showerror("Error", f"La campaña se interrumpió otra vez: {e}")
+                return
+            finally:
+                self.running_simulation = False
+            messagebox.showinfo("Info", f"Campaña completa con {len(self.simulation_results)} muestras "
+                                        f"y {len(self.campaign.failed)} fallidas.")
+
+        thread = threading.Thread(target=run_simulation)
+        thread.start()
+
+    def selected_seed(self):
+        """
+        Semilla de la próxima campaña según el campo de la interfaz.
+
+        Returns:
+            int | None: La semilla, o None si el campo está vacío (se toma de la entropía del sistema).
+
+        Raises:
+            ValueError: Si el campo no contiene un número entero.
+        """
+        seed = self.campaign_seed.get().strip() if self.campaign_seed else ""
+        return int(seed) if seed else None
+
+    def new_store_path(self):
+        """
+        Crea la carpeta del almacén de una nueva campaña dentro de "resultados".
+
+        El nombre lleva la fecha y hora más un sufijo único, así dos simulaciones en el mismo
+        segundo no comparten almacén ni se confunden sus muestras.
+
+        Returns:
+            str: Carpeta nueva y vacía.
+        """
+        os.makedirs("resultados", exist_ok=True)
+        return tempfile.mkdtemp(prefix=time.strftime("campaña_%Y%m%d_%H%M%S_"), dir="resultados")
+
+    def new_instrumentation(self):
+        """
+        Crea la medición de una nueva simulación, perfilada si la opción está activa.
+
+        Returns:
+            Instrumentation: Medición vacía.
+        """
+        profile = bool(self.profile_run and self.profile_run.get())
+        return Instrumentation(profile=profile, trace_memory=profile)
+
+    def show_performance(self):
+        """
+        Muestra una ventana con el reporte de rendimiento de la última simulación: muestras por
+        segundo y el tiempo de cada etapa del flujo, de mayor a menor.
+        """
+        if self.instrumentation is None:
+            messagebox.showwarning("Advertencia", "No se han ejecutado las simulaciones.")
+            return
+
+        performance_window = tk.Toplevel(self.root)
+        performance_window.title("Rendimiento de la Simulación")
+        performance_window.geometry("560x360")
+
+        performance_text = tk.Text(performance_window, wrap=tk.NONE, padx=10, pady=10, font=("Courier", 10))
+        performance_text.pack(fill=tk.BOTH, expand=True)
+        performance_text.insert(tk.END, self.instrumentation.summary())
+        profile = self.instrumentation.profile_summary()
+        if profile:
+            performance_text.insert(tk.END, "\n\n" + profile)
+        performance_text.config(state=tk.DISABLED)
+
+    def uses_alter(self):
+        """
+        Indica si la simulación se hará en modo alter.
+
+        Returns:
+            bool: True si la opción está activa, hay muestras y todos los objetivos admiten alter.
+            En ese caso se simula en un solo proceso, sin importar num_workers.
+        """
+        return bool(self.alter_mode and self.alter_mode.get() and self.samples is not None
+                    and supports_alter(self.cir_dict))
+
+    def netlist_simulator(self):
+        """
+        Selecciona la función que simula un diccionario de netlists, con num_workers procesos vigilados
+        y el tiempo límite por muestra de la interfaz.
+
+        Returns:
+            callable: Recibe {nombre: contenido} y entrega pares (nombre, resultados).
+        """
+        return functools.partial(iter_isolated_simulations, timeout=self.sample_timeout, n_workers=self.num_workers,
+                                 vectors=self.selected_vectors())
+
+    def selected_vectors(self):
+        """
+        Vectores que NgSpice debe guardar en cada muestra.
+
+        Returns:
+            str | None: 'all' si la opción está activa, o None para usar los del .PROBE del netlist.
+        """
+        return 'all' if self.all_vectors and self.all_vectors.get() else None
+
+    def simulation_stream(self):
+        """
+        Selecciona el motor de simulación según las opciones de la interfaz.
+
+        Returns:
+            iterable: Generador de pares (nombre, resultados).
+        """
+        # Los .PARAM perturbados no se pueden cambiar con alter, en ese caso se simulan los netlists
+        if self.uses_alter():
+            with open(self.current_file, 'r', encoding="UTF-8") as file:
+                content = file.read()
+            element_names, values = perturbed_columns(self.cir_dict, *self.samples)
+            return iter_alter_simulations(content, element_names, values, names=list(self.netlists),
+                                          vectors=self.selected_vectors())
+        return self.netlist_simulator()(self.netlists or "new_cir_files")
+
+    def load_results(self):
+        """
+        Abre un almacén de resultados guardado por una campaña anterior.
+
+        Los datos se mapean a memoria, así que abrir campañas grandes es instantáneo.
+        """
+        path = filedialog.askdirectory()
+        if not path:
+            return
+        try:
+            self.simulation_results = open_result_store(path)
+        except FileNotFoundError as e:
+            messagebox.showwarning("Advertencia", str(e))
+            return
+        self.campaign_id += 1
+        self.available_outputs = self.simulation_results.available_outputs
+        self.output_selection['values'] = self.available_outputs
+        self.update_simulation_counter(len(self.simulation_results))
+
+    def resampled_output(self, selected_output, interpolation_method='linear'):
+        """
+        Retorna la matriz interpolada de una salida, usando la caché si ya se calculó.
+
+        La llave de la caché es (campaña, salida, num_timesteps, método de interpolación),
+        así que repetir un gráfico o cambiar entre vistas no vuelve a interpolar.
+
+        Args:
+            selected_output (str): Salida a interpolar.
+            interpolation_method (str, optional): Método de interpolación. Defaults to 'linear'.
+
+        Returns:
+            tuple: (malla de tiempo, matriz (muestras, timesteps), nombre de la salida).
+        """
+        def compute():
+            filtered_results = {file: {'time': data['time'], selected_output: data[selected_output]}
+                                for file, data in self.simulation_results.items() if selected_output in data}
+            return resample_results(filtered_results, self.num_timesteps, output=selected_output,
+                                    interpolation_method=interpolation_method)
+
+        key = (self.campaign_id, selected_output, self.num_timesteps, interpolation_method)
+        return self.resample_cache.get(key, compute)
+
     def plot_distributions(self):
         """
         Genera y muestra gráficos de distribución para la salida seleccionada.
 
-        Utiliza los resultados de la simulación para crear los gráficos.
+        Utiliza los resultados de la simulación para crear los gráficos. Durante una simulación
+        usa las estadísticas acumuladas en línea hasta el momento.
         """
+        live = self.live_statistics
+        if self.running_simulation and live is not None and live.count > 0:
+            plot_distributions(live.fitted_distributions())
+            return
+
         if not self.simulation_results:
             messagebox.showwarning("Advertencia", "No se han ejecutado las simulaciones.")
             return
@@ -261,18 +653,22 @@ class UI:
             messagebox.showwarning("Advertencia", "Por favor, selecciona una salida para plotear.")
             return
 
-        filtered_results = {file: {'time': data['time'], selected_output: data[selected_output]}
-                            for file, data in self.simulation_results.items() if selected_output in data}
-
-        fitted_distributions = estimate_distribution(filtered_results, num_timesteps=self.num_timesteps)
+        resampled = self.resampled_output(selected_output)
+        fitted_distributions = estimate_distribution(None, num_timesteps=self.num_timesteps, resampled=resampled)
         plot_distributions(fitted_distributions)
 
     def plot_density(self):
         """
         Genera y muestra gráficos de densidad para la salida seleccionada.
 
-        Utiliza los resultados de la simulación para crear los gráficos.
+        Utiliza los resultados de la simulación para crear los gráficos. Durante una simulación
+        usa el histograma acumulado en línea hasta el momento.
         """
+        live = self.live_statistics
+        if self.running_simulation and live is not None and live.count > 0:
+            plot_histogram2d(live.histogram, live.output)
+            return
+
         if not self.simulation_results:
             messagebox.showwarning("Advertencia", "No se han ejecutado las simulaciones.")
             return
@@ -282,10 +678,8 @@ class UI:
             messagebox.showwarning("Advertencia", "Por favor, selecciona una salida para plotear.")
             return
 
-        filtered_results = {file: {'time': data['time'], selected_output: data[selected_output]}
-                            for file, data in self.simulation_results.items() if selected_output in data}
-
-        plot_density(filtered_results, num_timesteps=self.num_timesteps, num_bins=self.num_bins)
+        resampled = self.resampled_output(selected_output)
+        plot_density(None, num_timesteps=self.num_timesteps, num_bins=self.num_bins, resampled=resampled)
 
     def create_ui(self):
         """
@@ -322,6 +716,14 @@ class UI:
         generate_button.pack(side=tk.LEFT, padx=5)
         simulate_button = ttk.Button(top_frame, text="Simular", command=self.run_simulations)
         simulate_button.pack(side=tk.LEFT, padx=5)
+        adaptive_button = ttk.Button(top_frame, text="Simulación Adaptativa", command=self.run_adaptive_simulations)
+        adaptive_button.pack(side=tk.LEFT, padx=5)
+        resume_button = ttk.Button(top_frame, text="Reanudar Campaña", command=self.resume_simulations)
+        resume_button.pack(side=tk.LEFT, padx=5)
+        load_results_button = ttk.Button(top_frame, text="Abrir Resultados", command=self.load_results)
+        load_results_button.pack(side=tk.LEFT, padx=5)
+        performance_button = ttk.Button(top_frame, text="Rendimiento", command=self.show_performance)
+        performance_button.pack(side=tk.LEFT, padx=5)
 
         output_selection_label = ttk.Label(top_frame, text="Seleccionar Salida para Plotear:")
         output_selection_label.pack(side=tk.LEFT, padx=5)
@@ -381,6 +783,56 @@ class UI:
         num_bins_entry.grid(row=2, column=1, padx=10, pady=5)
         num_bins_entry.bind("<FocusOut>", lambda e: self.update_num_bins(num_bins_entry.get()))
 
+        num_workers_label = ttk.Label(frame, text="Procesos de Simulación:")
+        num_workers_label.grid(row=3, column=0, padx=10, pady=5, sticky=tk.E)
+        num_workers_entry = ttk.Entry(frame, width=10)
+        num_workers_entry.insert(tk.END, "1")
+        num_workers_entry.grid(row=3, column=1, padx=10, pady=5)
+        num_workers_entry.bind("<FocusOut>", lambda e: self.update_num_workers(num_workers_entry.get()))
+
+        self.write_files = tk.BooleanVar(value=False)
+        write_files_check = ttk.Checkbutton(frame, text="Guardar archivos .cir en disco", variable=self.write_files)
+        write_files_check.grid(row=4, column=0, columnspan=2, padx=10, pady=5, sticky=tk.W)
+
+        self.alter_mode = tk.BooleanVar(value=False)
+        alter_mode_check = ttk.Checkbutton(frame, text="Modo alter (cargar el circuito una sola vez)", variable=self.alter_mode)
+        alter_mode_check.grid(row=5, column=0, columnspan=2, padx=10, pady=5, sticky=tk.W)
+
+        self.extended_targets = tk.BooleanVar(value=False)
+        extended_targets_check = ttk.Checkbutton(
+            frame, text="Perturbar .PARAM y subcircuitos por instancia (al cargar)", variable=self.extended_targets)
+        extended_targets_check.grid(row=6, column=0, columnspan=2, padx=10, pady=5, sticky=tk.W)
+
+        sampling_method_label = ttk.Label(frame, text="Método de Muestreo:")
+        sampling_method_label.grid(row=7, column=0, padx=10, pady=5, sticky=tk.E)
+        self.sampling_method = tk.StringVar(value=SAMPLING_METHODS[0])
+        sampling_method_selection = ttk.Combobox(
+            frame, textvariable=self.sampling_method, values=SAMPLING_METHODS, state="readonly", width=8)
+        sampling_method_selection.grid(row=7, column=1, padx=10, pady=5)
+
+        campaign_seed_label = ttk.Label(frame, text="Semilla (vacía = aleatoria):")
+        campaign_seed_label.grid(row=8, column=0, padx=10, pady=5, sticky=tk.E)
+        self.campaign_seed = tk.StringVar(value="")
+        campaign_seed_entry = ttk.Entry(frame, textvariable=self.campaign_seed, width=10)
+        campaign_seed_entry.grid(row=8, column=1, padx=10, pady=5)
+
+        sample_timeout_label = ttk.Label(frame, text="Tiempo Límite por Muestra (s):")
+        sample_timeout_label.grid(row=9, column=0, padx=10, pady=5, sticky=tk.E)
+        sample_timeout_entry = ttk.Entry(frame, width=10)
+        sample_timeout_entry.insert(tk.END, "60")
+        sample_timeout_entry.grid(row=9, column=1, padx=10, pady=5)
+        sample_timeout_entry.bind("<FocusOut>", lambda e: self.update_sample_timeout(sample_timeout_entry.get()))
+
+        self.all_vectors = tk.BooleanVar(value=False)
+        all_vectors_check = ttk.Checkbutton(
+            frame, text="Guardar todos los vectores (no solo los del .PROBE)", variable=self.all_vectors)
+        all_vectors_check.grid(row=10, column=0, columnspan=2, padx=10, pady=5, sticky=tk.W)
+
+        self.profile_run = tk.BooleanVar(value=False)
+        profile_run_check = ttk.Checkbutton(
+            frame, text="Perfilar la simulación (cProfile y memoria, más lento)", variable=self.profile_run)
+        profile_run_check.grid(row=11, column=0, columnspan=2, padx=10, pady=5, sticky=tk.W)
+
     def show_netlist_info(self):
         """
         Muestra una ventana emergente con información detallada sobre el netlist cargado.
@@ -454,6 +906,24 @@ Timesteps mínimos recomendados: {str(round(LTSpice_to_float(sim_time)/LTSpice_t
         """
         self.num_bins = int(value)
 
+    def update_num_workers(self, value):
+        """
+        Actualiza el número de procesos que simulan en paralelo.
+
+        Args:
+            value (str): Nuevo valor para num_workers.
+        """
+        self.num_workers = max(1, int(value))
+
+    def update_sample_timeout(self, value):
+        """
+        Actualiza el tiempo límite de simulación por muestra.
+
+        Args:
+            value (str): Nuevo valor en segundos.
+        """
+        self.sample_timeout = float(value)
+
     def run(self):
         """
         Inicia la ejecución de la interfaz gráfica.
@@ -0,0 +1,92 @@
+"""unit_adaptive_campaign.py contiene las pruebas unitarias del módulo adaptive_campaign.
+Las simulaciones se reemplazan por una función que calcula la salida a partir del valor
+de R2 escrito en cada netlist, para revisar la detención por convergencia sin NgSpice.
+    """
+import sys
+import os
+import unittest
+import numpy as np
+import regex as re
+
+# Obtener la ruta del directorio actual del archivo unit_adaptive_campaign.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+from adaptive_campaign import run_adaptive_campaign
+from ltspice_converter import LTSpice_to_float
+
+def simulate_from_r2(netlists):
+    """Entrega una salida proporcional al valor de R2 de cada netlist."""
+    for name, content in netlists.items():
+        value = LTSpice_to_float(re.search(r'^R2\s+\S+\s+\S+\s+(\S+)', content, re.MULTILINE).group(1))
+        time = np.linspace(0, 1e-5, 30)
+        yield name, {'time': time, 'V(4)': value / 1000 * np.sin(time * 1e6)}
+
+class TestAdaptiveCampaign(unittest.TestCase):
+
+    def setUp(self):
+        self.input_file_name = os.path.join(current_dir, 'LINEAL.cir')
+        self.cir_dict = {
+            10: {'name': 'R2', 'value': 1000.0, 'dist': 'normal', 'scale': 0.1},
+            12: {'name': 'R1', 'value': 1000.0, 'dist': 'uniform', 'scale': 0.0}
+        }
+
+    def test_convergencia(self):
+        """Se detiene en cuanto el intervalo relativo es menor al objetivo."""
+        appended = []
+
+        class Sink:
+            def append(self, name, results, parameters=None):
+                appended.append((name, parameters))
+
+        campaign = run_adaptive_campaign(
+            self.cir_dict, self.input_file_name, target_width=0.02, batch_size=25, min_samples=50,
+            max_samples=5000, simulate=simulate_from_r2, sink=Sink())
+
+        self.assertTrue(campaign['converged'])
+        n_samples = campaign['n_samples']
+        # 2 * 1.96 * 0.1 / sqrt(n) <= 0.02 requiere unas 384 muestras
+        self.assertTrue(300 <= n_samples <= 500, n_samples)
+        self.assertEqual(n_samples % 25, 0)
+        self.assertLessEqual(campaign['ci_width']['V(4)'], 0.02)
+        self.assertEqual(len(appended), n_samples)
+        self.assertEqual(appended[0][0], 'new_cir_0.cir')
+        self.assertEqual(campaign['statistics']['V(4)'].mean.shape, (200,))
+
+    def test_maximo(self):
+        """Si el objetivo es inalcanzable se simulan max_samples muestras y se informa."""
+        campaign = run_adaptive_campaign(
+            self.cir_dict, self.input_file_name, target_width=1e-6, batch_size=40, max_samples=100,
+            num_timesteps=20, simulate=simulate_from_r2, sampling_method='sobol')
+        self.assertFalse(campaign['converged'])
+        self.assertEqual(campaign['n_samples'], 100)
+        self.assertEqual([n for n, _ in campaign['history']], [40, 80, 100])
+
+    def test_reproducible(self):
+        """La campaña entregada recuerda la semilla y las muestras simuladas, y repetirla da los mismos valores."""
+        appended = []
+
+        class Sink:
+            def append(self, name, results, parameters=None):
+                appended.append(parameters)
+
+        campaign = run_adaptive_campaign(
+            self.cir_dict, self.input_file_name, target_width=0.05, batch_size=30, min_samples=30,
+            max_samples=1000, num_timesteps=20, simulate=simulate_from_r2, sink=Sink(), seed=11)
+        record = campaign['campaign']
+        self.assertEqual(record.seed, 11)
+        self.assertEqual(record.stop, campaign['n_samples'])
+        self.assertEqual(record.next_index, campaign['n_samples'])
+        self.assertTrue(record.done)
+        np.testing.assert_array_equal(np.array(appended), record.sample_rows(range(campaign['n_samples']))[1])
+
+        again = run_adaptive_campaign(
+            self.cir_dict, self.input_file_name, target_width=0.05, batch_size=30, min_samples=30,
+            max_samples=1000, num_timesteps=20, simulate=simulate_from_r2, seed=11)
+        self.assertEqual(again['n_samples'], campaign['n_samples'])
+        np.testing.assert_array_equal(again['statistics']['V(4)'].mean, campaign['statistics']['V(4)'].mean)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+"""unit_campaign.py contiene las pruebas unitarias del módulo campaign, revisa que las muestras
+no dependan del orden ni de la partición en que se generan, y que una campaña guardada se
+reanude desde la primera muestra sin terminar.
+    """
+import sys
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+
+# Obtener la ruta del directorio actual del archivo unit_campaign.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+import campaign as campaign_module
+from campaign import Campaign, load_campaign, record_progress, run_campaign, resume_campaign, read_failures
+from result_store import open_result_store
+from file_operations import read_cir_file
+
+def simulate_until(limit):
+    """Simulación falsa que entrega una salida constante y se cae después de limit muestras.
+    La muestra 13 nunca converge y se reporta con on_failure."""
+    state = {'count': 0}
+
+    def simulate(netlists, on_failure=None):
+        for name in netlists:
+            if name == 'new_cir_13.cir':
+                on_failure(name, "timestep too small")
+                continue
+            if state['count'] == limit:
+                raise RuntimeError("NgSpice se cayó")
+            state['count'] += 1
+            yield name, {'time': np.linspace(0, 1, 5), 'V(4)': np.full(5, float(name.split('_')[-1][:-4]))}
+    return simulate
+
+class TestCampaign(unittest.TestCase):
+
+    def setUp(self):
+        self.input_file_name = os.path.join(current_dir, 'LINEAL.cir')
+        self.cir_dict = {
+            10: {'name': 'R2', 'value': 1000.0, 'dist': 'normal', 'scale': 0.1},
+            12: {'name': 'R1', 'value': 1000.0, 'dist': 'uniform', 'scale': 0.05},
+            14: {'name': 'C1', 'value': 1e-6, 'dist': 'uniform', 'scale': 0.0}
+        }
+
+    def test_muestras_por_indice(self):
+        """Cada fila depende solo de la semilla y su índice, no de cómo se reparten las muestras."""
+        for method in ('random', 'lhs'):
+            campaign = Campaign(self.cir_dict, self.input_file_name, 12, seed=42, sampling_method=method)
+            _, serial = campaign.sample_rows(range(12))
+
+            # Dos "procesos" que se reparten las muestras intercaladas
+            worker = Campaign(self.cir_dict, self.input_file_name, 12, seed=42, sampling_method=method)
+            _, even = worker.sample_rows(range(0, 12, 2))
+            _, odd = worker.sample_rows(range(1, 12, 2))
+            np.testing.assert_array_equal(serial[0::2], even)
+            np.testing.assert_array_equal(serial[1::2], odd)
+
+            _, other = Campaign(self.cir_dict, self.input_file_name, 12, seed=43, sampling_method=method).sample_rows(range(12))
+            self.assertFalse(np.array_equal(serial[:, :2], other[:, :2]))
+            self.assertTrue(np.all(serial[:, 2] == 1e-6))
+
+    def test_distribuciones_en_bloque(self):
+        """En modo 'random' el bloque completo sigue la distribución de cada elemento, sin valores negativos."""
+        _, samples = Campaign(self.cir_dict, self.input_file_name, 20000, seed=1).sample_rows(range(20000))
+        self.assertAlmostEqual(samples[:, 0].mean() / 1000.0, 1.0, places=2)
+        self.assertAlmostEqual(samples[:, 0].std() / 100.0, 1.0, places=1)
+        self.assertGreaterEqual(samples[:, 1].min(), 950.0)
+        self.assertLess(samples[:, 1].max(), 1050.0)
+        self.assertAlmostEqual(samples[:, 1].mean() / 1000.0, 1.0, places=3)
+        self.assertTrue(np.all(samples[:, 2] == 1e-6))
+
+        # Una campaña sin elementos perturbados repite el valor nominal
+        _, nominal = Campaign({14: self.cir_dict[14]}, self.input_file_name, 3, seed=1).sample_rows(range(3))
+        np.testing.assert_array_equal(nominal, [[1e-6]] * 3)
+
+    def test_reanudar(self):
+        """Las muestras terminadas en desorden se guardan y la campaña retoma solo las pendientes."""
+        campaign = Campaign(self.cir_dict, self.input_file_name, 6, seed=7)
+        simulated = [(name, {}) for name in ['new_cir_0.cir', 'new_cir_2.cir', 'new_cir_1.cir', 'new_cir_4.cir']]
+        self.assertEqual([name for name, _ in record_progress(iter(simulated), campaign)],
+                         [name for name, _ in simulated])
+        self.assertEqual(campaign.next_index, 3)
+        self.assertEqual(campaign.pending(), [3, 5])
+
+        with tempfile.TemporaryDirectory() as path:
+            campaign.save(path)
+            resumed = load_campaign(path)
+
+        self.assertEqual(resumed.seed, 7)
+        self.assertEqual(resumed.cir_dict, self.cir_dict)
+        self.assertEqual(resumed.pending(), [3, 5])
+        np.testing.assert_array_equal(resumed.sample_rows([3, 5])[1], campaign.sample_rows([3, 5])[1])
+
+        netlists = dict(resumed.netlists())
+        self.assertEqual(list(netlists), ['new_cir_3.cir', 'new_cir_5.cir'])
+        self.assertEqual(netlists, dict(campaign.netlists([3, 5])))
+
+        for index in (3, 5):
+            resumed.mark_completed(index)
+        self.assertTrue(resumed.done)
+        self.assertEqual(list(resumed.netlists()), [])
+
+    def test_llaves_de_objetivos_extendidos(self):
+        """Las llaves (línea, nombre) de los .PARAM sobreviven al paso por JSON."""
+        cir_dict = {(3, 'RBIAS'): {'name': 'RBIAS', 'value': 10.0, 'dist': 'uniform', 'scale': 0.1, 'kind': 'param'}}
+        state = json.loads(json.dumps(Campaign(cir_dict, self.input_file_name, 4, seed=1).to_dict()))
+        self.assertEqual(Campaign.from_dict(state).cir_dict, cir_dict)
+
+    def test_punto_de_control(self):
+        """Una campaña que se cae a la mitad se reanuda sin repetir ni perder muestras."""
+        with tempfile.TemporaryDirectory() as path:
+            campaign = Campaign(self.cir_dict, self.input_file_name, 23, seed=3)
+            with self.assertRaises(RuntimeError):
+                run_campaign(campaign, path, simulate=simulate_until(11), batch_size=8, chunk_size=3)
+            self.assertEqual(len(open_result_store(path)), 11)
+            self.assertEqual(load_campaign(path).next_index, 11)
+
+            counts = []
+            resumed, outputs = resume_campaign(path, simulate=simulate_until(100), batch_size=8, chunk_size=3,
+                                               update_callback=counts.append)
+            self.assertTrue(resumed.done)
+            self.assertEqual(outputs, ['V(4)'])
+            self.assertEqual(counts[0], 12)
+            self.assertEqual(counts[-1], 22)
+
+            expected = [i for i in range(23) if i != 13]
+            results = open_result_store(path)
+            self.assertEqual(list(results), [f"new_cir_{i}.cir" for i in expected])
+            self.assertEqual(results['new_cir_17.cir']['V(4)'][0], 17.0)
+            np.testing.assert_array_equal(results.parameters, campaign.sample_rows(expected)[1])
+
+            # La muestra fallida queda registrada con sus parámetros y no se vuelve a simular
+            self.assertEqual(load_campaign(path).failed, {13: "timestep too small"})
+            failures = read_failures(path)
+            self.assertEqual([failure['name'] for failure in failures], ['new_cir_13.cir'])
+            self.assertEqual(failures[0]['parameters']['R2'], campaign.sample_rows([13])[1][0, 0])
+            self.assertEqual(load_campaign(path).pending(), [])
+
+    def test_un_muestreo_por_bloque(self):
+        """Cada bloque se muestrea una sola vez y la plantilla se compila una sola vez en toda la campaña."""
+        campaign = Campaign(self.cir_dict, self.input_file_name, 10, seed=5)
+        with tempfile.TemporaryDirectory() as path, \
+                mock.patch.object(campaign, 'sample_rows', wraps=campaign.sample_rows) as sampler, \
+                mock.patch.object(campaign_module.fileopr, 'compile_cir_template',
+                                  wraps=campaign_module.fileopr.compile_cir_template) as compiler:
+            run_campaign(campaign, path, simulate=simulate_until(100), batch_size=4)
+            self.assertEqual(compiler.call_count, 1)
+            self.assertEqual(sampler.call_count, 3)
+
+            results = open_result_store(path)
+            np.testing.assert_array_equal(results.parameters, Campaign(self.cir_dict, self.input_file_name, 10,
+                                                                       seed=5).sample_rows(range(10))[1])
+
+    def test_columnas_por_instancia(self):
+        """Cada instancia de un subcircuito tiene su propia columna de parámetros y su propio valor en failures.jsonl."""
+        with tempfile.TemporaryDirectory() as path:
+            input_file_name = os.path.join(path, 'subcircuito.cir')
+            with open(input_file_name, 'w', encoding="UTF-8") as file:
+                file.write("SUBCIRCUITO\n.SUBCKT AMP IN OUT\nRD1 IN OUT 1K ; *DIST: NORMAL 0.05 *\n.ENDS\n"
+                           ".TEMP 27\nX1 1 2 AMP\nX2 2 3 AMP\n.END\n")
+            cir_dict = read_cir_file(input_file_name, incluir_subcircuitos=True)
+            campaign = Campaign(cir_dict, input_file_name, 15, seed=2)
+            store_path = os.path.join(path, 'almacen')
+            run_campaign(campaign, store_path, simulate=simulate_until(100))
+
+            self.assertEqual(open_result_store(store_path).parameter_names, ['r.x1.rd1', 'r.x2.rd1'])
+            failure, = read_failures(store_path)
+            _, row = campaign.sample_rows([13])
+            self.assertEqual(failure['parameters'], {'r.x1.rd1': row[0, 0], 'r.x2.rd1': row[0, 1]})
+
+    def test_volver_a_simular(self):
+        """Una copia con portion(0, n_samples) de una campaña terminada vuelve a simular todas sus muestras."""
+        campaign = Campaign(self.cir_dict, self.input_file_name, 6, seed=5)
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            run_campaign(campaign, first, simulate=simulate_until(100), batch_size=4, chunk_size=2)
+            self.assertEqual(campaign.pending(), [])
+
+            again = campaign.portion(0, campaign.n_samples)
+            self.assertEqual(again.pending(), list(range(6)))
+            run_campaign(again, second, simulate=simulate_until(100), batch_size=4, chunk_size=2)
+            self.assertEqual(list(open_result_store(second)), list(open_result_store(first)))
+            np.testing.assert_array_equal(open_result_store(second).parameters, open_result_store(first).parameters)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""unit_cli.py contiene las pruebas unitarias del módulo cli, revisa la lectura de las perturbaciones,
+las estadísticas escritas desde un almacén y que el ejecutor no cargue tkinter ni matplotlib.
+    """
+import sys
+import os
+import json
+import subprocess
+import tempfile
+import unittest
+import numpy as np
+
+# Obtener la ruta del directorio actual del archivo unit_cli.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+from cli import parse_override, apply_overrides, output_statistics, write_statistics, main
+from file_operations import read_cir_file
+from result_store import ColumnarResultStore, open_result_store
+
+class TestCli(unittest.TestCase):
+
+    def test_perturbaciones(self):
+        """Las perturbaciones aceptan distribución, escala en fracción o porcentaje, o ambas."""
+        self.assertEqual(parse_override("R1=normal:5%"), ('R1', {'dist': 'normal', 'scale': 0.05}))
+        self.assertEqual(parse_override("C1=0.1"), ('C1', {'scale': 0.1}))
+        self.assertEqual(parse_override(" L2 = Uniform "), ('L2', {'dist': 'uniform'}))
+        for text in ("R1", "R1=", "R1=gamma:0.1"):
+            with self.assertRaises(ValueError):
+                parse_override(text)
+
+        cir_dict = read_cir_file(os.path.join(current_dir, 'LINEAL.cir'))
+        apply_overrides(cir_dict, [parse_override("r1=normal:5%")], dist='uniform', scale=0.03)
+        by_name = {entry['name']: entry for entry in cir_dict.values()}
+        self.assertEqual((by_name['R1']['dist'], by_name['R1']['scale']), ('normal', 0.05))
+        self.assertEqual((by_name['C1']['dist'], by_name['C1']['scale']), ('uniform', 0.03))
+        with self.assertRaises(ValueError):
+            apply_overrides(cir_dict, [parse_override("X9=0.1")])
+
+    def test_estadisticas(self):
+        """Las estadísticas por timestep del almacén se escriben como CSV, una fila por timestep."""
+        rng = np.random.default_rng(0)
+        with tempfile.TemporaryDirectory() as path:
+            with ColumnarResultStore(path, chunk_size=7) as store:
+                for i in range(600):
+                    time = np.sort(rng.uniform(0, 1, 30))
+                    time[[0, -1]] = 0, 1
+                    store.append(f"new_cir_{i}.cir", {'time': time, 'V(4)': np.full(30, float(i)), 'I(VIN)': time})
+            results = open_result_store(path)
+            accumulators = output_statistics(results, num_timesteps=11, quantiles=(0.5,))
+            files = write_statistics(path, accumulators)
+            self.assertEqual(files, {'V(4)': 'statistics_V_4.csv', 'I(VIN)': 'statistics_I_VIN.csv'})
+
+            table = np.genfromtxt(os.path.join(path, files['V(4)']), delimiter=",", names=True)
+            self.assertEqual(table.dtype.names, ('time', 'mean', 'std', 'min', 'max', 'q05'))
+            self.assertEqual(len(table), 11)
+            np.testing.assert_allclose(table['mean'], 299.5)
+            np.testing.assert_allclose(table['std'], np.std(np.arange(600), ddof=1), rtol=1e-6)
+            np.testing.assert_allclose(table['max'], 599)
+            np.testing.assert_allclose(table['q05'], 299.5, atol=6)
+
+    def test_argumentos(self):
+        """Sin netlist ni --resume, o con un elemento inexistente, el ejecutor termina con un error de uso."""
+        with tempfile.TemporaryDirectory() as path, open(os.devnull, 'w') as devnull:
+            stderr, sys.stderr = sys.stderr, devnull
+            try:
+                for argv in (['--store', path],
+                             ['--resume', '--store', path],
+                             [os.path.join(current_dir, 'LINEAL.cir'), '--store', path, '--set', 'X9=0.1']):
+                    with self.assertRaises(SystemExit) as error:
+                        main(argv)
+                    self.assertEqual(error.exception.code, 2)
+            finally:
+                sys.stderr = stderr
+
+    def test_sin_muestras(self):
+        """Sin muestras completadas igual se escribe summary.json y el código de salida es 1."""
+        with tempfile.TemporaryDirectory() as path, open(os.devnull, 'w') as devnull:
+            stdout, stderr, sys.stdout, sys.stderr = sys.stdout, sys.stderr, devnull, devnull
+            try:
+                code = main([os.path.join(current_dir, 'LINEAL.cir'), '--store', path, '--samples', '0', '--quiet'])
+            finally:
+                sys.stdout, sys.stderr = stdout, stderr
+            self.assertEqual(code, 1)
+            with open(os.path.join(path, 'summary.json'), 'r', encoding="UTF-8") as file:
+                summary = json.load(file)
+            self.assertEqual((summary['completed'], summary['outputs']), (0, []))
+
+    def test_sin_interfaz(self):
+        """Importar el ejecutor no carga tkinter ni matplotlib."""
+        code = "import sys, cli; print(sorted(m for m in ('tkinter', 'matplotlib', 'seaborn') if m in sys.modules))"
+        output = subprocess.run([sys.executable, "-c", code], cwd=src_dir, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "[]")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""unit_distributed.py contiene las pruebas unitarias del módulo distributed, revisa que una campaña
+repartida en rangos, con trabajadores que se caen o pierden su trabajo a la mitad, se junte en el
+mismo almacén que produciría una sola máquina.
+    """
+import sys
+import os
+import glob
+import time
+import tempfile
+import unittest
+import numpy as np
+
+# Obtener la ruta del directorio actual del archivo unit_distributed.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+from campaign import Campaign, load_campaign, read_failures
+from distributed import submit_campaign, claim_job, run_worker, requeue_stale, queue_status, merge_results
+from result_store import open_result_store
+from unit_campaign import simulate_until
+
+class TestDistributed(unittest.TestCase):
+
+    def setUp(self):
+        self.cir_dict = {
+            10: {'name': 'R2', 'value': 1000.0, 'dist': 'normal', 'scale': 0.1},
+            12: {'name': 'R1', 'value': 1000.0, 'dist': 'uniform', 'scale': 0.05},
+            14: {'name': 'C1', 'value': 1e-6, 'dist': 'uniform', 'scale': 0.0}
+        }
+        self.campaign = Campaign(self.cir_dict, os.path.join(current_dir, 'LINEAL.cir'), 23, seed=3)
+
+    def test_cola(self):
+        """Los trabajos cubren la campaña en rangos y un trabajador que se cae devuelve el suyo a la cola."""
+        with tempfile.TemporaryDirectory() as queue, tempfile.TemporaryDirectory() as store:
+            jobs = submit_campaign(self.campaign, queue, range_size=5)
+            self.assertEqual(len(jobs), 5)
+            self.assertEqual(queue_status(queue), {'pending': 5, 'running': 0, 'done': 0})
+            with self.assertRaises(FileExistsError):
+                submit_campaign(self.campaign, queue, range_size=5)
+
+            # El primer trabajador termina dos rangos y se cae a mitad del tercero, que vuelve a pending/
+            with self.assertRaises(RuntimeError):
+                run_worker(queue, simulate=simulate_until(12), batch_size=2, chunk_size=1, worker_id="a")
+            self.assertEqual(queue_status(queue), {'pending': 3, 'running': 0, 'done': 2})
+
+            # Un trabajador tomó un rango y dejó de dar señales de vida
+            job, spec = claim_job(queue, "b")
+            self.assertEqual((spec['start'], spec['stop'], spec['worker']), (10, 15, "b"))
+            self.assertEqual(requeue_stale(queue, lease=3600), [])
+            self.assertEqual(requeue_stale(queue, lease=0), [job])
+
+            finished = run_worker(queue, simulate=simulate_until(100), batch_size=2, chunk_size=1, worker_id="c")
+            self.assertEqual(len(finished), 3)
+            self.assertEqual(queue_status(queue), {'pending': 0, 'running': 0, 'done': 5})
+
+            merged = merge_results(queue, store)
+            self.assertTrue(merged.done)
+            expected = [i for i in range(23) if i != 13]
+            results = open_result_store(store)
+            self.assertEqual(list(results), [f"new_cir_{i}.cir" for i in expected])
+            self.assertEqual(results['new_cir_17.cir']['V(4)'][0], 17.0)
+            np.testing.assert_array_equal(results.parameters, self.campaign.sample_rows(expected)[1])
+
+            self.assertEqual(load_campaign(store).failed, {13: "timestep too small"})
+            self.assertEqual(load_campaign(store).pending(), [])
+            self.assertEqual([failure['name'] for failure in read_failures(store)], ['new_cir_13.cir'])
+            with self.assertRaises(FileExistsError):
+                merge_results(queue, store)
+
+    def check_merged(self, queue, store):
+        """El almacén juntado es el de la campaña simulada en una sola máquina, con la muestra 13 fallida."""
+        merge_results(queue, store)
+        expected = [i for i in range(23) if i != 13]
+        results = open_result_store(store)
+        self.assertEqual(list(results), [f"new_cir_{i}.cir" for i in expected])
+        np.testing.assert_array_equal(results.parameters, self.campaign.sample_rows(expected)[1])
+        self.assertEqual([failure['name'] for failure in read_failures(store)], ['new_cir_13.cir'])
+
+    def test_trabajo_perdido(self):
+        """Un trabajador cuyo trabajo se reencola mientras lo simula lo suelta sin tocar la cola ni el almacén del nuevo dueño."""
+        with tempfile.TemporaryDirectory() as queue, tempfile.TemporaryDirectory() as store:
+            submit_campaign(self.campaign, queue, range_size=5)
+            base = simulate_until(100)
+            taken = {}
+
+            def simulate(netlists, on_failure=None):
+                for name, results in base(netlists, on_failure=on_failure):
+                    if name == 'new_cir_7.cir' and not taken:
+                        # El coordinador lo da por abandonado y otro trabajador lo toma
+                        self.assertEqual(requeue_stale(queue, lease=0), ['job_000000005_000000010'])
+                        taken['b'] = claim_job(queue, "b")
+                    yield name, results
+
+            finished = run_worker(queue, simulate=simulate, batch_size=2, chunk_size=1, worker_id="a")
+            self.assertEqual(finished, ['job_000000000_000000005', 'job_000000010_000000015',
+                                        'job_000000015_000000020', 'job_000000020_000000023'])
+            job, spec = taken['b']
+            self.assertEqual(queue_status(queue), {'pending': 0, 'running': 1, 'done': 4})
+            self.assertTrue(os.path.exists(os.path.join(queue, 'running', f"{job}@{spec['token']}.json")))
+
+            # El trabajador "b" se cae; su trabajo vuelve a la cola y se retoma desde la versión más avanzada
+            requeue_stale(queue, lease=0)
+            self.assertEqual(run_worker(queue, simulate=simulate_until(100), batch_size=2, chunk_size=1),
+                             ['job_000000005_000000010'])
+            self.assertEqual(len(os.listdir(os.path.join(queue, 'parts', job))), 2)
+            self.check_merged(queue, store)
+
+    def test_senal_de_vida_en_fallas(self):
+        """Las muestras fallidas también renuevan la señal de vida del trabajo."""
+        with tempfile.TemporaryDirectory() as queue, tempfile.TemporaryDirectory() as store:
+            submit_campaign(self.campaign, queue, range_size=23)
+            ages = []
+
+            def simulate(netlists, on_failure=None):
+                for name in netlists:
+                    running, = glob.glob(os.path.join(queue, 'running', '*.json'))
+                    os.utime(running, (0, 0))
+                    on_failure(name, "timestep too small")
+                    ages.append(time.time() - os.path.getmtime(running))
+                return iter(())
+
+            run_worker(queue, simulate=simulate, batch_size=8, chunk_size=1)
+            self.assertEqual(len(ages), 23)
+            self.assertLess(max(ages), 60)
+            self.assertEqual(len(merge_results(queue, store).failed), 23)
+
+if __name__ == '__main__':
+    unittest.main()
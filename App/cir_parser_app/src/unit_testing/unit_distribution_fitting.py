@@ -0,0 +1,52 @@
+"""unit_distribution_fitting.py contiene las pruebas unitarias del módulo distribution_fitting,
+compara los parámetros estimados en forma cerrada contra los de scipy.stats.fit para cada
+timestep, y revisa que los objetos congelados se construyan al pedirlos.
+    """
+import sys
+import os
+import unittest
+import numpy as np
+from scipy import stats
+
+# Obtener la ruta del directorio actual del archivo unit_distribution_fitting.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+from distribution_fitting import fit_parameters, FittedDistributions
+
+class TestDistributionFitting(unittest.TestCase):
+
+    def setUp(self):
+        """Matriz (muestras, timesteps) de prueba."""
+        rng = np.random.default_rng(0)
+        self.matrix = rng.normal(loc=np.linspace(0, 1, 40), scale=0.1, size=(200, 40))
+        self.times = np.linspace(0, 1e-3, 40)
+
+    def test_fit_parameters_matches_scipy(self):
+        """Los parámetros deben coincidir con stats.norm.fit y stats.uniform.fit."""
+        for dist_type, dist in (('normal', stats.norm), ('uniform', stats.uniform)):
+            loc, scale = fit_parameters(self.matrix, dist_type)
+            for i in range(self.matrix.shape[1]):
+                expected_loc, expected_scale = dist.fit(self.matrix[:, i])
+                self.assertAlmostEqual(loc[i], expected_loc, places=10)
+                self.assertAlmostEqual(scale[i], expected_scale, places=10)
+
+        with self.assertRaises(ValueError):
+            fit_parameters(self.matrix, 'lognormal')
+
+    def test_fitted_distributions_mapping(self):
+        """El mapeo se indexa por tiempo y construye las distribuciones congeladas al pedirlas."""
+        loc, scale = fit_parameters(self.matrix, 'normal')
+        fitted_distributions = FittedDistributions(self.times, loc, scale, 'normal')
+
+        self.assertEqual(len(fitted_distributions), 40)
+        self.assertEqual(list(fitted_distributions), self.times.tolist())
+        distribution = fitted_distributions[self.times[3]]
+        self.assertAlmostEqual(distribution.mean(), loc[3])
+        self.assertAlmostEqual(distribution.std(), scale[3])
+        self.assertEqual(fitted_distributions.rvs(10).shape, (10, 40))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -69,6 +69,70 @@ C1 4 2 1.0
         # Eliminar el archivo de prueba
         os.remove(output_file_name)
 
+    def test_render_cir_template(self):
+        """Compila la plantilla una vez y revisa que el netlist generado en memoria
+        sea idéntico al archivo escrito por create_new_cir_file."""
+        input_file_name = os.path.join(current_dir, 'LINEAL.cir')
+        output_file_name = os.path.join(current_dir, 'test_template_LINEAL.cir')
+        cir_dict = {
+            10: {'name': 'R2', 'value': 1200.0},
+            11: {'name': 'L2', 'value': 0.002},
+            12: {'name': 'R1', 'value': 900.0},
+            14: {'name': 'C1', 'value': 1e-07}
+        }
+
+        template = compile_cir_template(cir_dict, input_file_name)
+        content = render_cir_template(template, {line: item['value'] for line, item in cir_dict.items()})
+
+        create_new_cir_file(cir_dict, input_file_name, output_file_name)
+        with open(output_file_name, 'r', encoding="UTF-8") as file:
+            expected_content = file.read()
+        os.remove(output_file_name)
+
+        self.assertEqual(sorted(template['slots']), [10, 11, 12, 14])
+        self.assertEqual(content, expected_content)
+        self.assertIn("L2 2 1 2.0m IC=0\n", content)
+
+    def test_objetivos_extendidos(self):
+        """Lee los .PARAM y los elementos de un subcircuito por instancia, y revisa que el cuerpo
+        del subcircuito quede parametrizado y cada instancia reciba sus propios valores."""
+        input_file_name = os.path.join(current_dir, 'test_subckt.cir')
+        with open(input_file_name, 'w', encoding="UTF-8") as file:
+            file.write("""SUBCIRCUITO
+.SUBCKT AMP IN OUT PARAMS: GAIN=2
+RD1 IN OUT 1K ; *DIST: NORMAL 0.05 *
+EAMP OUT 0 IN 0 {GAIN}
+.ENDS
+.PARAM RBIAS = 10K
+.TEMP 27
+R1 1 0 {RBIAS}
+X1 1 2 AMP
+X2 2 3 amp PARAMS: GAIN=4
+.END
+""")
+        cir_dict = read_cir_file(input_file_name, incluir_parametros=True, incluir_subcircuitos=True)
+
+        self.assertEqual(cir_dict[(6, 'RBIAS')]['value'], 10000.0)
+        self.assertEqual(cir_dict[(3, 'X1')]['name'], 'X1.RD1')
+        self.assertEqual(cir_dict[(3, 'X2')]['alter'], 'r.x2.rd1')
+        self.assertEqual((cir_dict[(3, 'X2')]['dist'], cir_dict[(3, 'X2')]['scale']), ('normal', 0.05))
+        self.assertEqual(cir_dict[(10, 'GAIN')]['value'], 4.0)
+        self.assertNotIn(3, cir_dict)
+
+        template = compile_cir_template(cir_dict, input_file_name)
+        values = {key: item['value'] for key, item in cir_dict.items()}
+        values[(6, 'RBIAS')] = 12000.0
+        values[(3, 'X2')] = 1100.0
+        content = render_cir_template(template, values)
+        os.remove(input_file_name)
+
+        lines = content.split('\n')
+        self.assertIn("+ P_RD1=1K", lines)
+        self.assertIn("RD1 IN OUT {P_RD1} ; *DIST: NORMAL 0.05 *", lines)
+        self.assertIn(".PARAM RBIAS=12.0K", lines)
+        self.assertIn("X1 1 2 AMP PARAMS: GAIN=2.0 P_RD1=1.0K", lines)
+        self.assertIn("X2 2 3 amp PARAMS: GAIN=4.0 P_RD1=1.1K", lines)
+
     def test_existe_carpeta(self):
         """Revisa la funcionalidad de la función que revisa la existencia
         de una carpeta, eliminando lo que contenga y generándola si no existe."""
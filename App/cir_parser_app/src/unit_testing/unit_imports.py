@@ -0,0 +1,35 @@
+"""unit_imports.py contiene las pruebas del arranque en frío de los módulos: importar simulation,
+parameter_perturbation y los módulos que usan los procesos trabajadores no debe cargar matplotlib,
+seaborn, scipy ni PySpice, que se importan recién al graficar, ajustar o simular.
+    """
+import sys
+import os
+import json
+import subprocess
+import unittest
+
+# Obtener la ruta del directorio actual del archivo unit_imports.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+
+HEAVY = {'matplotlib', 'seaborn', 'scipy', 'PySpice', 'tkinter'}
+
+def loaded_packages(module):
+    """Importa module en un intérprete nuevo y retorna los paquetes pesados que quedaron cargados."""
+    code = (f"import sys, json, {module}; "
+            f"print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({sorted(HEAVY)!r}))))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=src_dir, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+class TestImports(unittest.TestCase):
+
+    def test_arranque_liviano(self):
+        """Los módulos de muestreo, simulación y análisis no cargan paquetes pesados al importarse."""
+        for module in ('simulation', 'parameter_perturbation', 'campaign', 'plotting', 'resampling',
+                       'online_statistics', 'distribution_fitting', 'cli'):
+            with self.subTest(module=module):
+                self.assertEqual(loaded_packages(module), [])
+
+if __name__ == '__main__':
+    unittest.main()
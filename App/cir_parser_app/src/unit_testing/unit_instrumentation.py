@@ -0,0 +1,87 @@
+"""unit_instrumentation.py contiene las pruebas unitarias del módulo instrumentation, revisa que las
+etapas se acumulen solo con una medición activa, que los tiempos de otros procesos se sumen y que
+una campaña deje su reporte por etapas junto a los resultados.
+    """
+import sys
+import os
+import json
+import time
+import tempfile
+import unittest
+import numpy as np
+
+# Obtener la ruta del directorio actual del archivo unit_instrumentation.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+import instrumentation
+from instrumentation import Instrumentation, instrumented, stage, count, merge, INSTRUMENTATION_FILE
+from campaign import Campaign, run_campaign
+
+def simulate(netlists, on_failure=None):
+    """Simulación falsa que mide sus etapas como lo hace simulation en los procesos trabajadores."""
+    for name in netlists:
+        with stage('ngspice_run'):
+            time.sleep(0.001)
+        yield name, {'time': np.linspace(0, 1, 5), 'V(4)': np.ones(5)}
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_etapas(self):
+        """Las etapas suman tiempo y llamadas, y sin medición activa no se registra nada."""
+        with stage('nada'):
+            count('samples')
+        self.assertIsNone(instrumentation.active())
+
+        recorder = Instrumentation()
+        with instrumented(recorder):
+            self.assertIs(instrumentation.active(), recorder)
+            for _ in range(3):
+                with stage('run'):
+                    time.sleep(0.01)
+            count('samples', 3)
+            merge({'run': [1.0, 2], 'load': [0.5, 2]})
+        self.assertIsNone(instrumentation.active())
+
+        self.assertEqual(recorder.stages['run'][1], 5)
+        self.assertGreater(recorder.stages['run'][0], 1.03)
+        self.assertEqual(recorder.stages['load'], [0.5, 2])
+
+        report = recorder.report()
+        self.assertEqual(list(report['stages']), ['run', 'load'])
+        self.assertEqual(report['samples'], 3)
+        self.assertAlmostEqual(report['samples_per_second'], 3 / report['wall_seconds'])
+        self.assertEqual(recorder.drain()['load'], [0.5, 2])
+        self.assertEqual(recorder.stages, {})
+
+    def test_perfil_y_memoria(self):
+        """Con profile y trace_memory el reporte incluye el pico de memoria y el perfil de cProfile."""
+        recorder = Instrumentation(profile=True, trace_memory=True)
+        with instrumented(recorder):
+            data = np.ones(2**16)
+            del data
+        self.assertGreater(recorder.report()['peak_memory_kib'], 2**16 * 8 / 1024)
+        self.assertIn('cumulative', recorder.profile_summary())
+
+    def test_reporte_de_campaña(self):
+        """run_campaign escribe instrumentation.json con las etapas de la campaña y de la simulación."""
+        cir_dict = {10: {'name': 'R2', 'value': 1000.0, 'dist': 'normal', 'scale': 0.1}}
+        campaign = Campaign(cir_dict, os.path.join(current_dir, 'LINEAL.cir'), 10, seed=0)
+        with tempfile.TemporaryDirectory() as path:
+            run_campaign(campaign, path, simulate=simulate, batch_size=4, chunk_size=2,
+                         instrumentation=Instrumentation())
+            with open(os.path.join(path, INSTRUMENTATION_FILE), 'r', encoding="UTF-8") as file:
+                report = json.load(file)
+
+        self.assertEqual(report['samples'], 10)
+        self.assertGreater(report['samples_per_second'], 0)
+        for name in ('sample_parameters', 'render_netlists', 'ngspice_run', 'store_write', 'checkpoint'):
+            self.assertIn(name, report['stages'])
+        self.assertEqual(report['stages']['ngspice_run']['calls'], 10)
+        self.assertEqual(report['stages']['checkpoint']['calls'], 3)
+        self.assertIsNone(instrumentation.active())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ import sys
 import os
 import unittest
 import math
+import numpy as np
 
 # Obtiene la ruta del directorio actual del archivo unit_ltspice_converter.py
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -42,6 +43,30 @@ class TestLTSpiceConverter(unittest.TestCase):
         self.assertTrue(math.isclose(LTSpice_to_float(float_to_LTSpice(1000000000000)), LTSpice_to_float("1T"), rel_tol=1e-9))
         self.assertEqual(float_to_LTSpice(0.000000000001), "1.0p")
 
+    def test_LTSpice_to_float_sufijos(self):
+        """Revisa que 'Meg' y 'mil' no se confundan con 'm', las unidades al final y los errores.
+        """
+        self.assertEqual(LTSpice_to_float("1Meg"), 1e6)
+        self.assertEqual(LTSpice_to_float("1M"), 1e-3)
+        self.assertTrue(math.isclose(LTSpice_to_float("2mil"), 50.8e-6, rel_tol=1e-12))
+        self.assertEqual(LTSpice_to_float("1kohm"), 1000.0)
+        self.assertEqual(LTSpice_to_float("10uF"), 1e-5)
+        self.assertEqual(LTSpice_to_float("12E-3"), 0.012)
+        self.assertEqual(LTSpice_to_float("-.5p"), -5e-13)
+        with self.assertRaises(ValueError):
+            LTSpice_to_float("{R1}")
+
+    def test_versiones_vectorizadas(self):
+        """Revisa que las versiones para arreglos coincidan con las funciones escalares.
+        """
+        values = np.array([[1234.567, 1e-7, 3.3e12], [47.0, 0.0, -2200.0]])
+        strings = float_to_LTSpice_array(values)
+        self.assertEqual(strings.shape, values.shape)
+        self.assertEqual(strings.ravel().tolist(), [float_to_LTSpice(value) for value in values.ravel()])
+
+        parsed = LTSpice_to_float_array([["10K", "1Meg"], ["10K", "5M"]])
+        np.testing.assert_array_equal(parsed, [[1e4, 1e6], [1e4, 5e-3]])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+"""unit_netlist_parser.py contiene las pruebas unitarias del módulo netlist_parser, revisa
+las líneas de continuación, los comentarios, los bloques .SUBCKT, los .PARAM e .INCLUDE y
+los índices por nombre, tipo, nodo y línea.
+    """
+import sys
+import os
+import unittest
+
+# Obtener la ruta del directorio actual del archivo unit_netlist_parser.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+from netlist_parser import parse_netlist, read_netlist, probe_vectors
+
+NETLIST = """PRUEBA
+.INCLUDE "modelos.lib"
+.PARAM RBIAS = 10K GAIN=2
+.SUBCKT AMP IN OUT
++ PARAMS: RF=1K
+RD1 IN 1 {RF}
+* comentario dentro de un subcircuito
+EAMP OUT 0 1 0 {GAIN}
+.ENDS
+.TEMP 27
+VIN 3 0 DC 0 AC 1 0
++ PULSE ( 0 1 0 0 0 1e19 1e20 )
+R1 3 2 1K ; *DIST: NORMAL 0.1 *
+C1 2 0 10N IC=0
+X1 2 4 AMP PARAMS: RF=2K
+D1 4 0 DMOD
+.END
+R9 9 9 9
+"""
+
+class TestNetlistParser(unittest.TestCase):
+
+    def setUp(self):
+        self.netlist = parse_netlist(NETLIST)
+
+    def test_elementos(self):
+        """Revisa nombres, nodos, valores, parámetros y comentarios del circuito principal."""
+        netlist = self.netlist
+        self.assertEqual(netlist.title, "PRUEBA")
+        self.assertEqual(list(netlist.elements), ['VIN', 'R1', 'C1', 'X1', 'D1'])
+        self.assertEqual(netlist.elements['R1'].nodes, ['3', '2'])
+        self.assertEqual(netlist.elements['R1'].value, '1K')
+        self.assertEqual(netlist.elements['R1'].comment, '*DIST: NORMAL 0.1 *')
+        self.assertEqual(netlist.elements['C1'].params, {'IC': '0'})
+        self.assertEqual(netlist.elements['D1'].model, 'DMOD')
+        self.assertIsNone(netlist.elements['D1'].value)
+
+        instance = netlist.elements['X1']
+        self.assertEqual((instance.nodes, instance.model, instance.params), (['2', '4'], 'AMP', {'RF': '2K'}))
+
+    def test_continuacion(self):
+        """La fuente con '+' es una sola sentencia que ocupa dos líneas."""
+        source = self.netlist.elements['VIN']
+        self.assertEqual(source.span, (11, 12))
+        self.assertIn('PULSE', source.args)
+        self.assertIs(self.netlist.by_line[12], source)
+
+    def test_subcircuitos_y_parametros(self):
+        """Revisa el ámbito de los subcircuitos, sus PARAMS: y los .PARAM globales."""
+        netlist = self.netlist
+        amp = netlist.subcircuits['AMP']
+        self.assertEqual(amp.ports, ['IN', 'OUT'])
+        self.assertEqual(amp.span, (4, 9))
+        self.assertEqual(amp.params['RF'].value, '1K')
+        self.assertEqual(list(amp.elements), ['RD1', 'EAMP'])
+        self.assertEqual(amp.elements['EAMP'].nodes, ['OUT', '0', '1', '0'])
+        self.assertIsNone(netlist.find('RD1'))
+        self.assertIs(netlist.find('RD1', 'AMP'), amp.elements['RD1'])
+
+        self.assertEqual({name: p.value for name, p in netlist.params.items()}, {'RBIAS': '10K', 'GAIN': '2'})
+        self.assertEqual(netlist.includes, [('.INCLUDE', 'modelos.lib', 2)])
+        self.assertEqual(netlist.directive_line('.temp'), 10)
+
+    def test_indices(self):
+        """Revisa los índices por tipo, nodo, subcircuito y línea, y que se ignore lo que sigue a .END."""
+        netlist = self.netlist
+        self.assertEqual([e.name for e in netlist.by_type['R']], ['R1'])
+        self.assertEqual(sorted(e.name for e in netlist.by_node['2']), ['C1', 'R1', 'X1'])
+        self.assertEqual([e.name for e in netlist.by_subckt['AMP']], ['RD1', 'EAMP'])
+        self.assertEqual(netlist.by_line[13].name, 'R1')
+        self.assertNotIn('R9', netlist.elements)
+
+    def test_archivo(self):
+        """Un modelo de fabricante con subcircuitos se interpreta completo."""
+        file_name = os.path.join(current_dir, '..', '..', 'archivos_cir', '10MHZ_ACTIVE_LPF_FOR_PSPICE.cir')
+        netlist = read_netlist(file_name)
+        self.assertIn('OPA380_0', netlist.subcircuits)
+        self.assertEqual(netlist.elements['XU1'].model, 'OPA380_0')
+        self.assertEqual(netlist.elements['R2'].value, '1.37K')
+
+    def test_probe(self):
+        """Los vectores del .PROBE quedan con la sintaxis de save, sin la tierra ni los corchetes."""
+        text = "PRUEBA\n.probe V(140, 0) V([Vout])\n+ I(VIN) V(V+) v(140)\nR1 1 0 1K\n"
+        self.assertEqual(probe_vectors(text), ['v(140)', 'v(vout)', 'i(vin)', 'v(v+)'])
+        self.assertEqual(probe_vectors(NETLIST), [])
+
+if __name__ == '__main__':
+    unittest.main()
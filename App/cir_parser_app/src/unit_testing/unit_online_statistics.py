@@ -0,0 +1,112 @@
+"""unit_online_statistics.py contiene las pruebas unitarias del módulo online_statistics,
+compara los momentos, cuantiles, histogramas y distribuciones acumulados en línea contra NumPy y
+distribution_fitting sobre la matriz completa.
+    """
+import sys
+import os
+import unittest
+import numpy as np
+
+# Obtener la ruta del directorio actual del archivo unit_online_statistics.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+from online_statistics import RunningMoments, P2Quantile, StreamingHistogram2D, OutputAccumulator, accumulate, normal_quantile
+from resampling import resample_results
+from distribution_fitting import fit_parameters
+
+class TestOnlineStatistics(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.matrix = 5.0 + rng.normal(0, 1e-3, (500, 40)) * np.linspace(1, 3, 40)
+
+    def test_bloques(self):
+        """Acumular por muestra y por bloques de distinto tamaño da la media y varianza de NumPy."""
+        moments = RunningMoments(40)
+        moments.update(self.matrix[0])
+        for start, stop in [(1, 7), (7, 200), (200, 201), (201, 500)]:
+            moments.update(self.matrix[start:stop])
+
+        self.assertEqual(moments.count, 500)
+        np.testing.assert_allclose(moments.mean, self.matrix.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(moments.variance, self.matrix.var(axis=0, ddof=1), rtol=1e-9)
+
+    def test_merge_e_intervalo(self):
+        """Combinar dos acumulados equivale a uno solo, y el ancho del intervalo usa z * std / sqrt(n)."""
+        first, second = RunningMoments(40), RunningMoments(40)
+        first.update(self.matrix[:123])
+        second.update(self.matrix[123:])
+        first.merge(second)
+        np.testing.assert_allclose(first.std, self.matrix.std(axis=0, ddof=1), rtol=1e-9)
+
+        self.assertAlmostEqual(normal_quantile(0.95), 1.959964, places=5)
+        expected = 2 * 1.959964 * self.matrix.std(axis=0, ddof=1) / np.sqrt(500)
+        np.testing.assert_allclose(first.ci_width(0.95), expected, rtol=1e-6)
+
+    def test_cuantiles_p2(self):
+        """El estimador P² se acerca al cuantil exacto y es exacto con menos de cinco muestras."""
+        rng = np.random.default_rng(1)
+        data = rng.normal(0, 1, (5000, 3))
+        for p in (0.05, 0.5, 0.95):
+            estimator = P2Quantile(p, 3)
+            for row in data:
+                estimator.update(row)
+            np.testing.assert_allclose(estimator.value, np.quantile(data, p, axis=0), atol=0.05)
+
+        estimator = P2Quantile(0.5, 40)
+        for row in self.matrix[:3]:
+            estimator.update(row)
+        np.testing.assert_allclose(estimator.value, np.median(self.matrix[:3], axis=0))
+
+    def test_acumulador_de_salida(self):
+        """Acumular muestra por muestra equivale a interpolar y ajustar la matriz completa."""
+        rng = np.random.default_rng(2)
+        simulations = []
+        for i in range(50):
+            time = np.sort(np.concatenate([[0.0, 1e-3], rng.uniform(0, 1e-3, 30)]))
+            simulations.append((f"cir_{i}", {'time': time, 'V(OUT)': rng.normal(1, 0.1) * np.sin(time * 1e3)}))
+
+        accumulator = OutputAccumulator('V(OUT)', num_timesteps=25)
+        passed = list(accumulate(iter(simulations), accumulator))
+        self.assertEqual([name for name, _ in passed], [name for name, _ in simulations])
+        self.assertEqual(accumulator.count, 50)
+
+        time_grid, matrix, _ = resample_results(dict(simulations), 25, output='V(OUT)')
+        np.testing.assert_allclose(accumulator.time_grid, time_grid)
+        np.testing.assert_allclose(accumulator.moments.mean, matrix.mean(axis=0), atol=1e-12)
+        np.testing.assert_allclose(accumulator.minimum, matrix.min(axis=0))
+        np.testing.assert_allclose(accumulator.maximum, matrix.max(axis=0))
+        for dist_type in ('normal', 'uniform'):
+            fitted = accumulator.fitted_distributions(dist_type)
+            loc, scale = fit_parameters(matrix, dist_type)
+            np.testing.assert_allclose(fitted.loc, loc, atol=1e-12)
+            np.testing.assert_allclose(fitted.scale, scale, atol=1e-12)
+
+    def test_histograma_extendido(self):
+        """Extender el rango en ambos sentidos conserva las cuentas de un histograma hecho de una vez."""
+        rng = np.random.default_rng(3)
+        matrix = rng.normal(0, 1, (2000, 6)) * np.arange(1, 7)
+        histogram = StreamingHistogram2D(np.linspace(0, 1, 6), num_bins=31)
+        self.assertEqual(histogram.num_bins, 32)
+        histogram.update(matrix[:10] * 0.1)
+        histogram.update(matrix[10:])
+        histogram.update(matrix[:10] * 0.1 - 40)
+
+        data = np.concatenate([matrix[:10] * 0.1, matrix[10:], matrix[:10] * 0.1 - 40])
+        self.assertEqual(histogram.count, data.shape[0])
+        self.assertLessEqual(histogram.value_edges[0], data.min())
+        self.assertGreaterEqual(histogram.value_edges[-1], data.max())
+        # Un valor justo en un borde unido puede cambiar de bin por redondeo, pero no se pierde ninguno
+        for column in range(6):
+            expected, _ = np.histogram(data[:, column], bins=histogram.value_edges)
+            self.assertEqual(histogram.counts[:, column].sum(), expected.sum())
+            self.assertLessEqual(np.abs(histogram.counts[:, column] - expected).sum(), 2)
+
+        area = np.outer(np.diff(histogram.value_edges), np.diff(histogram.time_edges))
+        self.assertAlmostEqual(float((histogram.density() * area).sum()), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ lo esperado para el parámetro de escala (0.03).
 import sys
 import os
 import unittest
+import numpy as np
 
 # Obtener la ruta del directorio actual del archivo unit_simulation.py
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,8 +14,9 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
 sys.path.append(src_dir)
 
-from parameter_perturbation import parameter_perturbator
+from parameter_perturbation import parameter_perturbator, sample_parameter_matrix, perturbed_netlists, perturbed_columns, supports_alter
 from file_operations import read_cir_file
+from ltspice_converter import LTSpice_to_float
 
 class TestParameterPerturbator(unittest.TestCase):
 
@@ -47,5 +49,102 @@ class TestParameterPerturbator(unittest.TestCase):
                 value = element_data['value']
                 self.assertTrue(0.97 * cir_dict[element_id]['value'] <= value <= 1.03 * cir_dict[element_id]['value'])
 
+    def test_sample_parameter_matrix(self):
+        """Revisa la forma de la matriz muestreada en lote, que respete las cotas
+        de la distribución uniforme, que no haya valores negativos y que los elementos
+        con escala 0 conserven su valor nominal.
+        """
+        cir_dict = {
+            10: {'name': 'R2', 'value': 1000, 'dist': 'uniform', 'scale': 0.03},
+            11: {'name': 'L2', 'value': 0.001, 'dist': 'normal', 'scale': 0.5},
+            12: {'name': 'R1', 'value': 1000, 'dist': 'uniform', 'scale': 0.0},
+            14: {'name': 'C1', 'value': 1e-06, 'dist': 'normal', 'scale': 0.05}
+        }
+        lines, samples = sample_parameter_matrix(cir_dict, n_files=2000)
+
+        self.assertEqual(lines, [10, 11, 12, 14])
+        self.assertEqual(samples.shape, (2000, 4))
+        self.assertTrue(np.all(samples >= 0))
+        self.assertTrue(np.all((samples[:, 0] >= 970) & (samples[:, 0] <= 1030)))
+        self.assertTrue(np.all(samples[:, 2] == 1000))
+
+    def test_perturbed_netlists(self):
+        """Genera los netlists en memoria y revisa sus nombres y que cada uno
+        contenga los valores perturbados en el rango esperado, sin escribir archivos.
+        """
+        input_file_name = os.path.join(current_dir, 'LINEAL.cir')
+        cir_dict = read_cir_file(input_file_name)
+        for item in cir_dict.values():
+            item['scale'] = 0.03
+
+        netlists = dict(perturbed_netlists(cir_dict, input_file_name, n_files=4))
+
+        self.assertEqual(list(netlists), [f"new_cir_{i}.cir" for i in range(4)])
+        for content in netlists.values():
+            lines = content.split('\n')
+            for line_number, item in cir_dict.items():
+                value = LTSpice_to_float(lines[line_number - 1].split()[3])
+                self.assertTrue(0.97 * item['value'] <= value <= 1.03 * item['value'])
+
+    def test_metodos_de_muestreo(self):
+        """Revisa el hipercubo latino (un punto por estrato) y que Sobol y Halton respeten las
+        distribuciones y no generen valores negativos."""
+        cir_dict = {
+            10: {'name': 'R2', 'value': 1000.0, 'dist': 'uniform', 'scale': 0.1},
+            11: {'name': 'L2', 'value': 1e-3, 'dist': 'normal', 'scale': 0.05},
+            12: {'name': 'R1', 'value': 1000.0, 'dist': 'uniform', 'scale': 0.0},
+            14: {'name': 'C1', 'value': 1e-6, 'dist': 'normal', 'scale': 0.8}
+        }
+
+        lines, samples = sample_parameter_matrix(cir_dict, 64, sampling_method='lhs', seed=0)
+        strata = np.floor((samples[:, 0] - 900.0) / 200.0 * 64).astype(int)
+        self.assertEqual(sorted(strata.tolist()), list(range(64)))
+        self.assertTrue(np.all(samples[:, 2] == 1000.0))
+
+        for method in ('sobol', 'halton'):
+            lines, samples = sample_parameter_matrix(cir_dict, 1024, sampling_method=method, seed=0)
+            self.assertEqual(samples.shape, (1024, 4))
+            self.assertTrue(np.all(samples > 0))
+            self.assertAlmostEqual(samples[:, 0].mean(), 1000.0, delta=0.5)
+            self.assertAlmostEqual(samples[:, 1].std() / 1e-3, 0.05, delta=0.002)
+
+        with self.assertRaises(ValueError):
+            sample_parameter_matrix(cir_dict, 10, sampling_method='montecarlo')
+
+    def test_normal_con_nominal_negativo(self):
+        """Una normal con valor nominal negativo se rechaza igual con todos los métodos de muestreo."""
+        cir_dict = {
+            10: {'name': 'V1', 'value': -5.0, 'dist': 'normal', 'scale': 0.1},
+            12: {'name': 'R1', 'value': 1000.0, 'dist': 'uniform', 'scale': 0.05}
+        }
+        for method in ('random', 'sobol', 'halton', 'lhs'):
+            with self.subTest(method=method), self.assertRaisesRegex(ValueError, 'V1'):
+                sample_parameter_matrix(cir_dict, 16, sampling_method=method, seed=0)
+
+        # Sin perturbación el valor negativo se conserva como nominal
+        cir_dict[10]['scale'] = 0.0
+        for method in ('random', 'sobol', 'halton', 'lhs'):
+            _, samples = sample_parameter_matrix(cir_dict, 16, sampling_method=method, seed=0)
+            self.assertTrue(np.all(samples[:, 0] == -5.0))
+
+    def test_perturbed_columns(self):
+        """Los elementos internos usan su nombre de NgSpice y los parámetros no admiten alter."""
+        cir_dict = {
+            10: {'name': 'R2', 'value': 1000.0, 'dist': 'uniform', 'scale': 0.1},
+            (3, 'X1'): {'name': 'X1.RD1', 'value': 1000.0, 'dist': 'normal', 'scale': 0.05,
+                        'kind': 'instance', 'alter': 'r.x1.rd1'},
+            (6, 'RBIAS'): {'name': 'RBIAS', 'value': 1e4, 'dist': 'uniform', 'scale': 0.0, 'kind': 'param'}
+        }
+        lines, samples = sample_parameter_matrix(cir_dict, 5)
+        names, values = perturbed_columns(cir_dict, lines, samples)
+        self.assertEqual(names, ['R2', 'r.x1.rd1'])
+        self.assertEqual(values.shape, (5, 2))
+        self.assertTrue(supports_alter(cir_dict))
+
+        cir_dict[(6, 'RBIAS')]['scale'] = 0.1
+        self.assertFalse(supports_alter(cir_dict))
+        with self.assertRaises(ValueError):
+            perturbed_columns(cir_dict, lines, samples)
+
 if __name__ == '__main__':
     unittest.main()
@@ -77,5 +77,14 @@ class TestPlottingFunctions(unittest.TestCase):
         plot_density(self.simulation_results, self.num_timesteps, num_bins=20, interpolation_method=self.interpolation_method)
         # Verificar que los gráficos se generen sin errores
 
+    def test_plot_density_constante(self):
+        """Una salida idéntica en todas las muestras, como la de un circuito sin *DIST, se grafica sin errores.
+        """
+        constant_results = {
+            name: {'time': [0, 1, 2, 3], 'output1': [2.5, 2.5, 2.5, 2.5]}
+            for name in ('sim1', 'sim2', 'sim3')
+        }
+        plot_density(constant_results, self.num_timesteps, num_bins=20, interpolation_method=self.interpolation_method)
+
 if __name__ == '__main__':
     unittest.main()
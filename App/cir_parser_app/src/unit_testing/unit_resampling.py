@@ -0,0 +1,84 @@
+"""unit_resampling.py contiene las pruebas unitarias del módulo resampling, compara la
+interpolación vectorizada contra scipy.interpolate.interp1d para muestras de distinta
+longitud y con extrapolación en los extremos.
+    """
+import sys
+import os
+import unittest
+import numpy as np
+from scipy import interpolate
+
+# Obtener la ruta del directorio actual del archivo unit_resampling.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+from resampling import time_bounds, resample_results, ResampleCache
+
+class TestResampling(unittest.TestCase):
+
+    def setUp(self):
+        """Construye resultados con pasos de tiempo no uniformes y distintos extremos."""
+        rng = np.random.default_rng(0)
+        self.simulation_results = {}
+        for i in range(30):
+            n = rng.integers(20, 60)
+            times = np.sort(rng.uniform(rng.uniform(0, 1e-7), 1e-5 * (1 + rng.uniform(0, 0.1)), n))
+            self.simulation_results[f'new_cir_{i}.cir'] = {
+                'time': times,
+                'V(4)': np.sin(times * 1e6),
+                'V(2)': np.cos(times * 1e6)
+            }
+
+    def test_time_bounds(self):
+        """Los extremos deben ser el menor inicio y el mayor final."""
+        min_time, max_time = time_bounds(self.simulation_results)
+        self.assertEqual(min_time, min(r['time'][0] for r in self.simulation_results.values()))
+        self.assertEqual(max_time, max(r['time'][-1] for r in self.simulation_results.values()))
+
+    def test_linear_matches_interp1d(self):
+        """La pasada vectorizada debe coincidir con interp1d, incluida la extrapolación."""
+        grid, matrix, value_key = resample_results(self.simulation_results, 200)
+
+        self.assertEqual(value_key, 'V(4)')
+        self.assertEqual(matrix.shape, (30, 200))
+        for row, result in zip(matrix, self.simulation_results.values()):
+            f = interpolate.interp1d(result['time'], result['V(4)'], fill_value='extrapolate')
+            np.testing.assert_allclose(row, f(grid), rtol=1e-12, atol=1e-12)
+
+    def test_output_and_cubic(self):
+        """Permite elegir la salida y usar interpolación cúbica."""
+        grid, matrix, value_key = resample_results(self.simulation_results, 50, output='V(2)',
+                                                   interpolation_method='cubic')
+        result = self.simulation_results['new_cir_0.cir']
+        f = interpolate.interp1d(result['time'], result['V(2)'], kind='cubic', fill_value='extrapolate')
+
+        self.assertEqual(value_key, 'V(2)')
+        np.testing.assert_allclose(matrix[0], f(grid))
+
+    def test_resample_cache(self):
+        """La caché evita recalcular llaves repetidas y desaloja la menos usada al llenarse."""
+        calls = []
+        def compute(output):
+            calls.append(output)
+            return resample_results(self.simulation_results, 100, output=output)
+
+        # Cada matriz ocupa 30 * 100 * 8 bytes más la malla, caben dos
+        cache = ResampleCache(max_bytes=2 * (30 * 100 * 8 + 100 * 8))
+        first = cache.get((0, 'V(4)', 100, 'linear'), lambda: compute('V(4)'))
+        again = cache.get((0, 'V(4)', 100, 'linear'), lambda: compute('V(4)'))
+        self.assertIs(first, again)
+        self.assertEqual(calls, ['V(4)'])
+
+        cache.get((0, 'V(2)', 100, 'linear'), lambda: compute('V(2)'))
+        cache.get((0, 'V(4)', 100, 'linear'), lambda: compute('V(4)'))
+        cache.get((1, 'V(4)', 100, 'linear'), lambda: compute('V(4)'))
+
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn((0, 'V(2)', 100, 'linear'), cache)
+        self.assertIn((0, 'V(4)', 100, 'linear'), cache)
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""unit_result_sink.py contiene las pruebas unitarias del módulo result_sink, escribe
+resultados sintéticos de forma incremental en un almacén columnar y revisa que se lean
+de vuelta sin cambios, y que las funciones de plotting puedan trabajar directamente sobre ellos.
+    """
+import sys
+import os
+import shutil
+import unittest
+import numpy as np
+
+# Obtener la ruta del directorio actual del archivo unit_result_sink.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+from result_sink import write_stream
+from result_store import ColumnarResultStore, open_result_store
+from plotting import estimate_distribution
+
+class TestResultSink(unittest.TestCase):
+
+    def setUp(self):
+        """Define la carpeta de prueba y un generador de resultados sintéticos."""
+        self.folder = os.path.join(current_dir, 'test_result_sink')
+        self.simulations = [
+            (f'new_cir_{i}.cir', {'time': np.linspace(0, 1, 10 + i), 'V(4)': np.linspace(0, 1, 10 + i) * (i + 1)})
+            for i in range(5)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_write_and_read_stream(self):
+        """Escribe las muestras una a una y revisa que se lean iguales y en orden."""
+        progress = []
+        with ColumnarResultStore(self.folder, chunk_size=2) as sink:
+            outputs = write_stream(iter(self.simulations), sink, update_callback=progress.append)
+
+        results = open_result_store(self.folder)
+        self.assertEqual(outputs, ['V(4)'])
+        self.assertEqual(progress, [1, 2, 3, 4, 5])
+        self.assertEqual(list(results), [name for name, _ in self.simulations])
+        for name, expected in self.simulations:
+            for key, array in expected.items():
+                np.testing.assert_array_equal(results[name][key], array)
+
+    def test_parameters(self):
+        """Los parámetros de cada muestra se buscan por su nombre y se guardan con sus resultados."""
+        parameters = {name: [float(i)] for i, (name, _) in enumerate(self.simulations)}
+        with ColumnarResultStore(self.folder, parameter_names=['R1']) as sink:
+            write_stream(reversed(self.simulations), sink, parameters=parameters)
+
+        np.testing.assert_array_equal(open_result_store(self.folder).parameters, [[4.0], [3.0], [2.0], [1.0], [0.0]])
+
+    def test_estimate_distribution_from_disk(self):
+        """estimate_distribution debe aceptar los resultados leídos bajo demanda."""
+        with ColumnarResultStore(self.folder) as sink:
+            write_stream(iter(self.simulations), sink)
+
+        fitted_distributions = estimate_distribution(open_result_store(self.folder), 20)
+        self.assertEqual(len(fitted_distributions), 20)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""unit_result_store.py contiene las pruebas unitarias del módulo result_store, escribe
+muestras de distinta longitud en el almacén columnar, las lee mapeadas a memoria y revisa
+que un bloque sin confirmar se descarte al reabrir el almacén.
+    """
+import sys
+import os
+import shutil
+import unittest
+import numpy as np
+
+# Obtener la ruta del directorio actual del archivo unit_result_store.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Agregar la ruta del directorio 'src' al path de Python
+src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
+sys.path.append(src_dir)
+
+from result_store import ColumnarResultStore, open_result_store
+from result_sink import write_stream
+from plotting import estimate_distribution
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        """Define la carpeta de prueba y muestras con distinta cantidad de timesteps."""
+        self.path = os.path.join(current_dir, 'test_result_store')
+        self.simulations = [
+            (f'new_cir_{i}.cir', {'time': np.linspace(0, 1, 10 + i), 'V(4)': np.linspace(0, 1, 10 + i) * (i + 1)})
+            for i in range(7)
+        ]
+        self.parameters = {name: [1000.0 + i, 1e-6 * i] for i, (name, _) in enumerate(self.simulations)}
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def test_write_and_read(self):
+        """Las muestras y parámetros leídos deben ser iguales a los escritos."""
+        with ColumnarResultStore(self.path, parameter_names=['R1', 'C1'], chunk_size=3) as store:
+            outputs = write_stream(iter(self.simulations), store, parameters=self.parameters)
+
+        reader = open_result_store(self.path)
+        self.assertEqual(outputs, ['V(4)'])
+        self.assertEqual(reader.available_outputs, ['V(4)'])
+        self.assertEqual(list(reader), [name for name, _ in self.simulations])
+        for name, expected in self.simulations:
+            for key, array in expected.items():
+                np.testing.assert_array_equal(reader[name][key], array)
+        np.testing.assert_array_equal(reader.parameters, np.array(list(self.parameters.values())))
+        self.assertIsInstance(reader.column('time'), np.memmap)
+
+    def test_uncommitted_chunk_is_discarded(self):
+        """Si el proceso muere antes de confirmar un bloque, al reabrir solo quedan
+        las muestras confirmadas y se puede seguir agregando."""
+        store = ColumnarResultStore(self.path, chunk_size=2)
+        for name, results in self.simulations[:3]:
+            store.append(name, results)
+        # Simulamos datos a medio escribir que nunca llegaron al índice
+        with open(os.path.join(self.path, 'vector_0.f64'), 'ab') as file:
+            np.ones(5).tofile(file)
+
+        with ColumnarResultStore(self.path, chunk_size=2) as store:
+            self.assertEqual(store.count, 2)
+            for name, results in self.simulations[2:]:
+                store.append(name, results)
+
+        reader = open_result_store(self.path)
+        self.assertEqual(len(reader), 7)
+        np.testing.assert_array_equal(reader['new_cir_6.cir']['V(4)'], self.simulations[6][1]['V(4)'])
+
+    def test_new_vector_is_backfilled(self):
+        """Un vector que aparece después se rellena con NaN en las muestras anteriores."""
+        with ColumnarResultStore(self.path, chunk_size=1) as store:
+            store.append('a', {'time': np.arange(3.0), 'V(1)': np.arange(3.0)})
+            store.append('b', {'time': np.arange(4.0), 'V(1)': np.arange(4.0), 'V(2)': np.ones(4)})
+
+        reader = open_result_store(self.path)
+        self.assertTrue(np.all(np.isnan(reader['a']['V(2)'])))
+        np.testing.assert_array_equal(reader['b']['V(2)'], np.ones(4))
+
+    def test_empty_store_can_be_opened(self):
+        """Un almacén sin muestras confirmadas se abre vacío, con sus nombres de parámetros."""
+        ColumnarResultStore(self.path, parameter_names=['R1', 'C1']).close()
+        reader = open_result_store(self.path)
+        self.assertEqual(len(reader), 0)
+        self.assertEqual(reader.available_outputs, [])
+        self.assertEqual(reader.parameters.shape, (0, 2))
+
+    def test_parameters_length_is_checked(self):
+        """Una fila de parámetros de otro largo se rechaza antes de escribir nada."""
+        with ColumnarResultStore(self.path, parameter_names=['R1', 'C1'], chunk_size=2) as store:
+            store.append('a', {'time': np.arange(3.0)}, parameters=[1.0, 2.0])
+            for row in ([1.0], [1.0, 2.0, 3.0], [[1.0, 2.0]]):
+                with self.assertRaises(ValueError):
+                    store.append('b', {'time': np.arange(3.0)}, parameters=row)
+            store.append('c', {'time': np.arange(3.0)}, parameters=[3.0, 4.0])
+
+        reader = open_result_store(self.path)
+        self.assertEqual(list(reader), ['a', 'c'])
+        np.testing.assert_array_equal(reader.parameters, [[1.0, 2.0], [3.0, 4.0]])
+
+    def test_estimate_distribution_from_store(self):
+        """estimate_distribution debe trabajar directamente sobre el lector mapeado a memoria."""
+        with ColumnarResultStore(self.path) as store:
+            write_stream(iter(self.simulations), store)
+
+        fitted_distributions = estimate_distribution(open_result_store(self.path), 20)
+        self.assertEqual(len(fitted_distributions), 20)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,11 @@ una cota de error la diferencia entre el valor esperado y el obtenido.
     """
 import sys
 import os
+import time
 import unittest
+from types import SimpleNamespace
+from unittest import mock
+import numpy as np
 from numpy import array
 
 # Obtener la ruta del directorio actual del archivo unit_simulation.py
@@ -17,7 +21,66 @@ src_dir = os.path.abspath(os.path.join(current_dir, '..', '..', 'src'))
 sys.path.append(src_dir)
 
 # Importar la función de simulation.py
-from simulation import run_simulations
+import simulation
+from simulation import run_simulations, iter_netlist_simulations, iter_isolated_simulations
+from simulation import run_parallel_simulations, iter_alter_simulations, run_alter_simulations
+from instrumentation import Instrumentation, instrumented
+
+class FakeNgSpice:
+    """NgSpice falso para probar los motores sin la librería: cada netlist es "* <valor> <segundos>",
+    su simulación espera esos segundos y entrega v(1) constante igual al valor, o un vector por
+    elemento con el último valor aplicado con alter. Anota en commands cada comando recibido."""
+
+    def __init__(self):
+        self.commands = []
+        self.content = None
+        self.altered = {}
+        self.plots = 0
+
+    def exec_command(self, command):
+        self.commands.append(command)
+        if command.startswith('alter '):
+            name, value = command[len('alter '):].split(' = ')
+            self.altered[name] = float(value)
+
+    def load_circuit(self, content):
+        self.content = content
+
+    def run(self):
+        self.commands.append('run')
+        time.sleep(float(self.content.split()[2]))
+        self.plots += 1
+
+    @property
+    def last_plot(self):
+        return f"tran{self.plots}"
+
+    def plot(self, simulation, plot_name):
+        vectors = {'time': np.linspace(0, 1, 3)}
+        if self.altered:
+            vectors.update({name: np.full(3, value) for name, value in self.altered.items()})
+        else:
+            vectors['v(1)'] = np.full(3, float(self.content.split()[1]))
+        return {key: SimpleNamespace(_data=data) for key, data in vectors.items()}
+
+    def destroy(self, plot_name):
+        self.commands.append(f"destroy {plot_name}")
+
+    def remove_circuit(self):
+        self.commands.append("remcirc")
+
+def missing_ngspice():
+    raise OSError("cannot load library 'libngspice.so'")
+
+def worker_without_ngspice(conn, *args):
+    """Proceso vigilado en el que NgSpice no puede iniciar."""
+    simulation._new_ngspice = missing_ngspice
+    simulation._isolated_worker(conn, *args)
+
+def worker_with_fake_ngspice(conn, *args):
+    """Proceso vigilado que simula con FakeNgSpice."""
+    simulation._new_ngspice = FakeNgSpice
+    simulation._isolated_worker(conn, *args)
 
 
 class TestSimulation(unittest.TestCase):
@@ -278,5 +341,125 @@ class TestSimulation(unittest.TestCase):
                     #Revisamos que la diferencia entre los arrays sea pequeña.
                     self.assertTrue(bool(abs(x) < tolerancia))
 
+    def test_isolated_simulations(self):
+        """Un netlist que NgSpice no puede simular se reporta como falla sin detener a los demás."""
+        with open(os.path.join(current_dir, 'LINEAL.cir'), 'r', encoding="UTF-8") as file:
+            content = file.read()
+        netlists = {'a.cir': content, 'roto.cir': "ROTO\nR1 1\n.TRAN 1N 1U\n.END\n", 'b.cir': content}
+
+        failures = []
+        results = dict(iter_isolated_simulations(netlists, timeout=30, on_failure=lambda name, error: failures.append(name)))
+        self.assertEqual(sorted(results), ['a.cir', 'b.cir'])
+        self.assertEqual(failures, ['roto.cir'])
+
+    def test_vectors_del_probe(self):
+        """Por defecto solo se guardan el tiempo y los vectores del .PROBE (V(4,0) en LINEAL.cir)."""
+        with open(os.path.join(current_dir, 'LINEAL.cir'), 'r', encoding="UTF-8") as file:
+            content = file.read()
+        _, probed = next(iter_netlist_simulations({'LINEAL.cir': content}))
+        _, everything = next(iter_netlist_simulations({'LINEAL.cir': content}, vectors='all'))
+        self.assertEqual(len(probed), 2)
+        self.assertIn('time', probed)
+        self.assertGreater(len(everything), len(probed))
+
+
+class TestIsolatedStartup(unittest.TestCase):
+
+    def test_ngspice_no_inicia(self):
+        """Si NgSpice no inicia en el proceso vigilado la campaña se detiene con el error, sin culpar a las muestras."""
+        failures = []
+        with mock.patch.object(simulation, '_isolated_worker', worker_without_ngspice):
+            with self.assertRaises(RuntimeError) as error:
+                list(iter_isolated_simulations({'a.cir': "* 0 0", 'b.cir': "* 1 0"}, timeout=30, n_workers=2,
+                                               on_failure=lambda name, error: failures.append(name)))
+        self.assertIn("libngspice", str(error.exception))
+        self.assertEqual(failures, [])
+
+class TestNetlistSimulations(unittest.TestCase):
+    """Prueba la simulación de netlists en memoria con FakeNgSpice, sin la librería de NgSpice."""
+
+    def test_libera_cada_muestra(self):
+        """Después de copiar los vectores de cada muestra se destruye su plot y se quita su circuito."""
+        ngspice = FakeNgSpice()
+        with mock.patch.object(simulation, '_new_ngspice', lambda: ngspice):
+            results = dict(iter_netlist_simulations({'a.cir': "* 1 0", 'b.cir': "* 2 0"}))
+        self.assertEqual(ngspice.commands, ["run", "destroy tran1", "remcirc", "run", "destroy tran2", "remcirc"])
+        np.testing.assert_array_equal(results['b.cir']['v(1)'], 2.0)
+
+class TestAlterSimulations(unittest.TestCase):
+    """Prueba el modo alter con FakeNgSpice, sin la librería de NgSpice."""
+
+    def setUp(self):
+        self.ngspice = FakeNgSpice()
+        patcher = mock.patch.object(simulation, '_new_ngspice', lambda: self.ngspice)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_comandos(self):
+        """El circuito se carga una vez y cada muestra es alter por elemento, run y destroy de su plot."""
+        samples = np.array([[1000.0, 1e-06], [1100.0, 2.5e-06]])
+        list(iter_alter_simulations("* 0 0", ['R1', 'C1'], samples))
+        self.assertEqual(self.ngspice.commands, [
+            "alter R1 = 1000.0", "alter C1 = 1e-06", "run", "destroy tran1",
+            "alter R1 = 1100.0", "alter C1 = 2.5e-06", "run", "destroy tran2"])
+
+    def test_nombres(self):
+        """Cada fila de samples queda bajo su nombre en names, o new_cir_<i>.cir por defecto."""
+        samples = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+        results, outputs = run_alter_simulations("* 0 0", ['R1', 'C1'], samples, names=['a.cir', 'b.cir', 'c.cir'],
+                                                 debug=False)
+        self.assertEqual(list(results), ['a.cir', 'b.cir', 'c.cir'])
+        self.assertEqual(sorted(outputs), ['C1', 'R1'])
+        self.assertEqual((results['b.cir']['R1'][0], results['b.cir']['C1'][0]), (3.0, 4.0))
+
+        names = [name for name, _ in iter_alter_simulations("* 0 0", ['R1'], [[1.0], [2.0]])]
+        self.assertEqual(names, ['new_cir_0.cir', 'new_cir_1.cir'])
+
+class TestParallelSimulations(unittest.TestCase):
+    """Prueba el reparto entre procesos vigilados con FakeNgSpice, sin la librería de NgSpice."""
+
+    def setUp(self):
+        patcher = mock.patch.object(simulation, '_isolated_worker', worker_with_fake_ngspice)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_orden_de_entrada(self):
+        """Las primeras muestras tardan más y terminan al final, pero el diccionario sigue el orden de entrada."""
+        netlists = {f"s{i}.cir": f"* {i} {0.1 * (6 - i)}" for i in range(6)}
+        finished = [name for name, _ in iter_isolated_simulations(netlists, n_workers=6)]
+        self.assertNotEqual(finished, list(netlists))
+
+        progress = []
+        results, outputs = run_parallel_simulations(netlists, n_workers=3, update_callback=progress.append)
+        self.assertEqual(list(results), list(netlists))
+        self.assertEqual(outputs, ['v(1)'])
+        self.assertEqual(progress, [1, 2, 3, 4, 5, 6])
+        for i in range(6):
+            np.testing.assert_array_equal(results[f"s{i}.cir"]['v(1)'], float(i))
+
+    def test_ventana_acotada(self):
+        """Cada proceso recibe una muestra a la vez, así que se consumen a lo sumo n_workers por delante de lo producido."""
+        n_workers, total = 2, 12
+        consumed = []
+
+        def netlists():
+            for i in range(total):
+                consumed.append(i)
+                yield f"s{i}.cir", f"* {i} 0.01"
+
+        produced = []
+        for name, results in iter_isolated_simulations(netlists(), n_workers=n_workers):
+            self.assertLessEqual(len(consumed) - len(produced), n_workers)
+            produced.append(name)
+        self.assertEqual(sorted(produced), sorted(f"s{i}.cir" for i in range(total)))
+
+    def test_etapas_de_los_procesos(self):
+        """Las etapas medidas en los procesos se suman a la Instrumentation activa del proceso principal."""
+        netlists = {f"s{i}.cir": f"* {i} 0" for i in range(5)}
+        with instrumented(Instrumentation()) as recorder:
+            run_parallel_simulations(netlists, n_workers=2)
+        for name in ('ngspice_load', 'ngspice_run', 'copy_vectors'):
+            self.assertEqual(recorder.stages[name][1], 5)
+
 if __name__ == '__main__':
     unittest.main()